@@ -0,0 +1,97 @@
+"""
+Measure memory per row of Bitquery trade, transfer and holder rows held as
+parsed JSON (nested dicts of hex strings) against the interned
+struct-of-arrays containers in services.columns.
+
+Rows are generated as a Bitquery response body with addresses drawn from a
+fixed wallet pool, parsed with json.loads, then converted. Memory is what
+tracemalloc reports as still allocated, so the "after" figure includes the
+AddressTable entries the rows added. Run from the repository root:
+
+    python -m benchmarks.address_interning --rows 200000 --wallets 20000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from services.addresses import AddressTable
+from services.columns import HolderColumns, TradeColumns, TransferColumns
+
+
+def wallet(rng: random.Random, wallets: int) -> str:
+    return f"0x{rng.randrange(wallets):040x}"
+
+
+def trade_row(rng: random.Random, wallets: int, i: int) -> dict:
+    return {
+        "Block": {"Time": "2025-01-01T00:00:00Z", "Number": str(20_000_000 + i // 4)},
+        "Transaction": {"Hash": f"0x{rng.getrandbits(256):064x}"},
+        "Trade": {
+            "Buy": {"Amount": f"{rng.uniform(1, 1e6):.6f}", "AmountInUSD": f"{rng.uniform(1, 1e4):.2f}",
+                    "Buyer": wallet(rng, wallets), "Price": "0.000123", "PriceInUSD": "0.41",
+                    "Currency": {"Symbol": "TKN", "SmartContract": "0x" + "ab" * 20}},
+            "Sell": {"Amount": f"{rng.uniform(0, 5):.6f}", "AmountInUSD": f"{rng.uniform(1, 1e4):.2f}",
+                     "Seller": wallet(rng, wallets),
+                     "Currency": {"Symbol": "WETH", "SmartContract": "0x" + "42" * 20}},
+            "Dex": {"ProtocolName": "uniswap_v3", "ProtocolFamily": "Uniswap"},
+        },
+    }
+
+
+def transfer_row(rng: random.Random, wallets: int, i: int) -> dict:
+    return {
+        "Block": {"Time": "2025-01-01T00:00:00Z", "Number": str(20_000_000 + i // 4)},
+        "Transaction": {"Hash": f"0x{rng.getrandbits(256):064x}"},
+        "Transfer": {"Amount": f"{rng.uniform(1, 1e6):.6f}", "AmountInUSD": f"{rng.uniform(1, 1e4):.2f}",
+                     "Sender": wallet(rng, wallets), "Receiver": wallet(rng, wallets),
+                     "Currency": {"Name": "Token", "Symbol": "TKN"}},
+    }
+
+
+def holder_row(rng: random.Random, wallets: int, i: int) -> dict:
+    return {"Holder": {"Address": f"0x{i:040x}"}, "Balance": {"Amount": f"{rng.uniform(0, 1e9):.9f}"}}
+
+
+def retained(func):
+    """Result of func and the bytes it left allocated"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def measure(name: str, make_row, containers, rows: int, wallets: int) -> None:
+    rng = random.Random(7)
+    body = json.dumps({"data": {"EVM": {"Rows": [make_row(rng, wallets, i) for i in range(rows)]}}})
+
+    parsed, dict_bytes = retained(lambda: json.loads(body)["data"]["EVM"]["Rows"])
+    addresses = AddressTable()
+    start = time.perf_counter()
+    columns, column_bytes = retained(lambda: containers.from_bitquery(parsed, addresses))
+    elapsed = time.perf_counter() - start
+    del parsed
+    gc.collect()
+
+    print(f"{name:<10} {rows:>9,} rows  dicts {dict_bytes / rows:8.0f} B/row  "
+          f"columns {column_bytes / rows:6.1f} B/row ({columns.nbytes / rows:.0f} in arrays, "
+          f"{len(addresses):,} addresses)  {dict_bytes / column_bytes:5.1f}x smaller  "
+          f"convert {elapsed * 1000:.0f} ms")
+
+
+def run(args) -> None:
+    tracemalloc.start()
+    measure("trades", trade_row, TradeColumns, args.rows, args.wallets)
+    measure("transfers", transfer_row, TransferColumns, args.rows, args.wallets)
+    measure("holders", holder_row, HolderColumns, args.rows, args.wallets)
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--wallets", type=int, default=20_000)
+    run(parser.parse_args())
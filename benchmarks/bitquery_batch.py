@@ -0,0 +1,80 @@
+"""
+Compare tokens/second for batched Bitquery DEX trade queries against the
+per-token loop.
+
+Bitquery is stubbed with an httpx mock transport that charges a fixed
+round-trip latency per request plus a small cost per returned row. Run from
+the repository root:
+
+    python -m benchmarks.bitquery_batch --tokens 300 --chunk-size 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+# The stub upstream has no rate limit; keep the client-side limiter out of the numbers
+os.environ.setdefault("BITQUERY_RATE_LIMIT", "0")
+
+from services.bitq import AsyncBitqueryAPI
+
+
+def make_transport(latency: float, row_cost: float, rows_per_token: int) -> httpx.MockTransport:
+    def trade_row(token: str, i: int) -> dict:
+        return {
+            "Block": {"Time": "2025-01-01T00:00:00Z", "Number": i},
+            "Transaction": {"Hash": f"0x{i:064x}"},
+            "Trade": {
+                "Buy": {"Amount": "1", "Buyer": "0xbuyer", "Price": 1.0,
+                        "Currency": {"Name": "T", "Symbol": "T", "SmartContract": token}},
+                "Sell": {"Amount": "1", "Seller": "0xseller", "Price": 1.0,
+                         "Currency": {"Name": "WETH", "Symbol": "WETH"}},
+                "Dex": {"ProtocolName": "uniswap_v3", "ProtocolFamily": "Uniswap"},
+            },
+        }
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        variables = json.loads(request.content)["variables"]
+        tokens = variables.get("tokens") or [variables["token"]]
+        rows = [trade_row(t, i) for t in tokens for i in range(rows_per_token)]
+        await asyncio.sleep(latency + row_cost * len(rows))
+        return httpx.Response(200, json={"data": {"EVM": {"DEXTrades": rows}}})
+
+    return httpx.MockTransport(handler)
+
+
+async def run(args) -> None:
+    tokens = [f"0x{i:040x}" for i in range(args.tokens)]
+    transport = make_transport(args.latency, args.row_cost, args.rows)
+
+    async with httpx.AsyncClient(transport=transport) as http_client:
+        client = AsyncBitqueryAPI(api_key="bench", oauth_token="bench", client=http_client)
+
+        start = time.perf_counter()
+        for token in tokens:
+            await client.get_dex_trades(token, "base", limit=args.rows)
+        loop_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = await client.get_dex_trades_batch(
+            tokens, "base", limit=args.rows, chunk_size=args.chunk_size
+        )
+        batch_elapsed = time.perf_counter() - start
+
+    assert all(len(r.data["data"]["EVM"]["DEXTrades"]) == args.rows for r in batched.values())
+    requests = -(-args.tokens // args.chunk_size)
+    print(f"per-token loop: {args.tokens} requests, {args.tokens / loop_elapsed:8.1f} tokens/s")
+    print(f"batched:        {requests} requests, {args.tokens / batch_elapsed:8.1f} tokens/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--row-cost", type=float, default=0.00001)
+    asyncio.run(run(parser.parse_args()))
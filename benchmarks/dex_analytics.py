@@ -0,0 +1,98 @@
+"""
+Time the DEX analytics engine on synthetic trade history.
+
+Trades are generated straight into an Arrow table with the trade store's
+schema (spread over two analytics windows, wallets drawn from a fixed
+pool), written to a temporary TradeStore and read back memory-mapped as
+TradeColumns, then analyzed repeatedly. Run from the repository root:
+
+    python -m benchmarks.dex_analytics --trades 1000000 --addresses 50000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from services.addresses import AddressTable
+from services.columns import TX_HASH_BYTES, TradeColumns
+from services.dex_analytics import DEX_ANALYTICS_WINDOW, compute_dex_analytics
+from services.ingest import TRADE_SCHEMA, TradeStore
+
+TOKEN = "0x" + "ab" * 20
+WETH = "0x" + "42" * 20
+
+
+def synthetic_trades(
+    count: int,
+    addresses: AddressTable,
+    wallets: int,
+    now: float,
+    seed: int = 7,
+    token_address: str = TOKEN,
+    first_block: int = 0
+) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    pool = addresses.intern_many(f"0x{i:040x}" for i in range(wallets))
+    token, weth = addresses.intern_many([token_address, WETH])
+    times = np.sort(rng.uniform(now - 2 * DEX_ANALYTICS_WINDOW, now, count)).astype(np.int64)
+    usd = rng.lognormal(mean=5, sigma=1.5, size=count)
+    is_buy = rng.random(count) < 0.55
+    trades = TradeColumns(
+        block_number=first_block + np.arange(count, dtype=np.int64) // 4,
+        time=times,
+        tx_hash=rng.integers(0, 256, size=(count, TX_HASH_BYTES), dtype=np.uint8),
+        buyer=pool[rng.integers(0, wallets, count)],
+        seller=pool[rng.integers(0, wallets, count)],
+        buy_currency=np.where(is_buy, token, weth).astype(np.uint32),
+        sell_currency=np.where(is_buy, weth, token).astype(np.uint32),
+        buy_amount=usd / 2,
+        buy_amount_usd=usd,
+        sell_amount=usd / 2000,
+        sell_amount_usd=usd,
+        price=np.full(count, 2.0),
+        price_usd=np.full(count, 2.0),
+    )
+    columns = trades.arrow_columns()
+    columns.update({
+        "buy_symbol": pa.array(np.where(is_buy, "TKN", "WETH")),
+        "sell_symbol": pa.array(np.where(is_buy, "WETH", "TKN")),
+        "protocol": pa.array(np.full(count, "uniswap_v3", dtype=object)),
+        "protocol_family": pa.array(np.full(count, "Uniswap", dtype=object)),
+    })
+    return pa.table(columns, schema=TRADE_SCHEMA)
+
+
+def run(args) -> None:
+    now = time.time()
+    start = time.perf_counter()
+    store = TradeStore(tempfile.mkdtemp(prefix="trades-"))
+    addresses = store.addresses("eth")
+    table = synthetic_trades(args.trades, addresses, args.addresses, now)
+    print(f"generated {table.num_rows:,} trades in {time.perf_counter() - start:.2f}s")
+    store.append("eth", TOKEN, "dex_trades", table)
+
+    start = time.perf_counter()
+    stored = TradeColumns.from_arrow(store.read("eth", TOKEN, "dex_trades", columns=TradeColumns.columns()))
+    print(f"memory-mapped read: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        stats = compute_dex_analytics(stored, addresses.lookup(TOKEN), now=now)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"analytics over {len(stored):,} trades: "
+          f"median {timings[len(timings) // 2] * 1000:.1f} ms, worst {timings[-1] * 1000:.1f} ms")
+    print(f"window: {stats['trades']:,} trades, ${stats['volume_usd']:,.0f} volume "
+          f"({stats['volume_change']:+.2f}%), {stats['unique_traders']:,} traders, "
+          f"whale threshold ${stats['whale_threshold_usd']:,.0f}, {len(stats['whales'])} whales shown")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trades", type=int, default=1_000_000)
+    parser.add_argument("--addresses", type=int, default=50_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    run(parser.parse_args())
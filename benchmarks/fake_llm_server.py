@@ -0,0 +1,82 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint. Replies
+with a fixed answer, one word per `delay` seconds, streamed as server-sent
+events when the request asks for it.
+
+Point the agents at it with LLM_BASE_URL=<yielded url>.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "Price is up 4.2% over 24h on rising buy volume. Liquidity is stable at "
+    "$245K and the top 10 holders own 18.4% of supply. Sentiment: positive. "
+    "Signal: Hold."
+)
+
+
+@contextmanager
+def serve_fake_llm(answer: str = ANSWER, delay: float = 0.02, status: int = 200):
+    """Serve POST /chat/completions (failing with `status` if not 200); yields the base URL"""
+    words = [word + " " for word in answer.split(" ")]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            model = request.get("model", "fake")
+            if status != 200:
+                body = json.dumps({"error": {"message": "fake failure", "type": "server_error"}}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if not request.get("stream"):
+                time.sleep(delay * len(words))
+                body = json.dumps({
+                    "object": "chat.completion",
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                                 "finish_reason": "stop"}],
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for word in words:
+                time.sleep(delay)
+                chunk = {"object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": word}}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text: str):
+            data = text.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,67 @@
+"""
+Compare GMGN lookups that launch a browser each time with lookups served by
+the shared GMGNCrawlerManager, against a saved GMGN page served locally.
+
+Requires a Playwright Chromium install. Run from the repository root:
+
+    python -m benchmarks.gmgn_crawler --lookups 20 --concurrency 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from crawl4ai import AsyncWebCrawler, CacheMode, CrawlerRunConfig
+
+from benchmarks.fixture_server import serve_fixture
+from services.gmgn_crawler import GMGNCrawlerManager
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "gmgn_token.html")
+
+
+async def cold_lookup(url: str) -> None:
+    async with AsyncWebCrawler() as crawler:
+        result = await crawler.arun(url, config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS))
+        assert result.markdown
+
+
+async def measure(label: str, lookup, urls, concurrency: int) -> None:
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def timed(url):
+        async with limit:
+            start = time.perf_counter()
+            await lookup(url)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[timed(url) for url in urls])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{label:>8}: {len(urls) / elapsed:6.2f} lookups/s  "
+        f"p50={statistics.median(latencies) * 1000:7.1f}ms  "
+        f"p95={latencies[int(0.95 * (len(latencies) - 1))] * 1000:7.1f}ms"
+    )
+
+
+async def run(args) -> None:
+    with serve_fixture(FIXTURE) as base_url:
+        urls = [f"{base_url}/base/token/0x{i:040x}" for i in range(args.lookups)]
+        await measure("cold", cold_lookup, urls, args.concurrency)
+
+        manager = GMGNCrawlerManager(max_pages=args.concurrency)
+        await manager.start()
+        try:
+            await measure("shared", manager.crawl, urls, args.concurrency)
+        finally:
+            await manager.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
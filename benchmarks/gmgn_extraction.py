@@ -0,0 +1,93 @@
+"""
+Compare the deterministic GMGN extractor with the Gemini prompt it replaces,
+on the saved GMGN page.
+
+The page is flattened to text the way the crawler's markdown lays it out
+(one line per block, table cells separated by pipes). Token counts are
+estimated at ~4 characters per token unless --gemini is given, in which case
+they come from Gemini's count_tokens and the prompt is also sent once to
+time a real round-trip (needs GEMINI_API_KEY). Run from the repository root:
+
+    python -m benchmarks.gmgn_extraction --iterations 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from html.parser import HTMLParser
+
+from services.gmgn_crawler import extract_gmgn_security
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "gmgn_token.html")
+BLOCK_TAGS = {"div", "p", "h1", "h2", "tr", "section", "nav", "footer"}
+
+
+class PageText(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.lines = [""]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.lines.append("")
+        elif tag in ("td", "th"):
+            self.lines[-1] += "| "
+
+    def handle_data(self, data):
+        if data.strip():
+            self.lines[-1] += data.strip() + " "
+
+    def text(self) -> str:
+        return "\n".join(line.strip() for line in self.lines if line.strip())
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+async def run(args) -> None:
+    with open(FIXTURE, encoding="utf-8") as f:
+        parser = PageText()
+        parser.feed(f.read())
+    page = parser.text()
+
+    security = extract_gmgn_security(page)
+    fields = json.dumps(security.model_dump(exclude_none=True), separators=(",", ":"))
+    print(f"extracted: {fields}")
+
+    per_call = time_per_call(lambda: extract_gmgn_security(page), args.iterations)
+    print(f"extract: {per_call * 1e6:8.1f}us per page")
+
+    if args.gemini:
+        from services.gemini import model
+
+        def count(text):
+            return model.count_tokens(text).total_tokens
+    else:
+        count = estimate_tokens
+
+    raw_tokens, compact_tokens = count(page), count(fields)
+    print(f"prompt payload: raw page {raw_tokens} tokens, structured fields {compact_tokens} tokens "
+          f"({raw_tokens / compact_tokens:.1f}x smaller)")
+
+    if args.gemini:
+        from services.gemini import analyze_gmgn_data
+
+        start = time.perf_counter()
+        await analyze_gmgn_data(security, use_llm=True)
+        print(f"gemini over structured fields: {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--gemini", action="store_true")
+    asyncio.run(run(parser.parse_args()))
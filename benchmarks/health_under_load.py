@@ -0,0 +1,119 @@
+"""
+Measure /health latency while token analyses are in flight.
+
+Moralis is stubbed with an httpx mock transport and the crew with an object
+whose kickoff blocks its thread, like a real LLM round-trip. Run from the
+repository root:
+
+    python -m benchmarks.health_under_load --analyses 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+# The stub upstream has no rate limit; keep the client-side limiter out of the numbers
+os.environ.setdefault("MORALIS_RATE_LIMIT", "0")
+# The stub pair stats have no volume; every request should still reach the crew
+os.environ.setdefault("PRESCREEN_ENABLED", "0")
+
+import main
+from services import http_client, moralis
+
+STUB_PAIR_STATS = {
+    "tokenAddress": "0x0000000000000000000000000000000000000001",
+    "tokenName": "Stub",
+    "tokenSymbol": "STUB",
+    "pairAddress": "0xpair",
+    "currentUsdPrice": "1.0",
+    "totalLiquidityUsd": "100000",
+}
+
+
+class StubCrew:
+    agents = []
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def copy(self) -> "StubCrew":
+        # kickoff_async runs a copy of the crew; the stub holds no per-run state
+        return self
+
+    def kickoff(self, inputs):
+        time.sleep(self.latency)
+        return "stub analysis"
+
+
+def install_stubs(moralis_latency: float, crew_latency: float) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(moralis_latency)
+        # Distinct pairs must produce distinct analysis-cache fingerprints
+        pair_address = request.url.path.split("/")[-2]
+        return httpx.Response(200, json={**STUB_PAIR_STATS, "pairAddress": pair_address})
+
+    moralis.MORALIS_API_KEY = "bench"
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    main.moralis_crew = StubCrew(crew_latency)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(args) -> None:
+    install_stubs(args.moralis_latency, args.crew_latency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        idle_probe = asyncio.create_task(probe_health(client, stop, args.interval))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        idle = await idle_probe
+
+        stop = asyncio.Event()
+        loaded_probe = asyncio.create_task(probe_health(client, stop, args.interval))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.get(f"/api/analyze-token/0xpair{i}", timeout=None)
+            for i in range(args.analyses)
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        loaded = await loaded_probe
+
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json().get("success"))
+    print(f"analyses: {ok}/{args.analyses} succeeded in {elapsed:.2f}s")
+    for label, samples in (("idle", idle), ("loaded", loaded)):
+        print(
+            f"/health {label:>6}: n={len(samples):4d} "
+            f"p50={statistics.median(samples):7.2f}ms "
+            f"p99={percentile(samples, 99):7.2f}ms "
+            f"max={max(samples):7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=50)
+    parser.add_argument("--moralis-latency", type=float, default=0.2)
+    parser.add_argument("--crew-latency", type=float, default=0.5)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
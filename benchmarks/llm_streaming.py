@@ -0,0 +1,41 @@
+"""
+Compare time-to-first-token of the streamed Moralis crew analysis with the
+time until the full answer is available, against the local fake LLM server
+(so only the generation pacing is measured). Run from the repository root:
+
+    python -m benchmarks.llm_streaming --runs 5 --delay 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.fake_llm_server import serve_fake_llm
+from services.agents import moralis_crew, stream_crew_analysis
+from services.http_client import close_async_client
+
+
+async def run(args) -> None:
+    first, total = [], []
+    with serve_fake_llm(delay=args.delay) as base_url:
+        for i in range(args.runs):
+            start = time.perf_counter()
+            first_at = None
+            async for _ in stream_crew_analysis(
+                moralis_crew, {"data": {"run": i}}, bypass_cache=True, base_url=base_url
+            ):
+                if first_at is None:
+                    first_at = time.perf_counter() - start
+            first.append(first_at)
+            total.append(time.perf_counter() - start)
+    await close_async_client()
+
+    print(f"first token: p50={statistics.median(first) * 1000:7.1f}ms")
+    print(f"full answer: p50={statistics.median(total) * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.02)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,170 @@
+"""
+Compare tweet collection cost for the previous per-element extraction loop
+and the batched execute_script path in TwitterScraper.search_tweets.
+
+The browser is replaced by a fake WebDriver that charges a fixed latency per
+WebDriver round-trip and renders 20 more tweets per scroll, so the numbers
+isolate round-trips and de-duplication from page load and scroll waits.
+Run from the repository root:
+
+    python -m benchmarks.tweet_collection --tweets 500
+"""
+import argparse
+import time
+import types
+
+from selenium.webdriver.common.by import By
+
+from services import x
+from services.x import EXTRACT_TWEETS_SCRIPT, SearchType, TwitterScraper
+
+
+class FakeElement:
+    def __init__(self, driver, tweet):
+        self.driver = driver
+        self.tweet = tweet
+        self.text = ""
+
+    def _child(self, text):
+        self.driver.round_trip()
+        child = FakeElement(self.driver, self.tweet)
+        child.text = text
+        return child
+
+    def is_displayed(self):
+        self.driver.round_trip()
+        return True
+
+    def find_element(self, by, selector):
+        if by == By.TAG_NAME:
+            return self._child("")
+        if "tweetText" in selector:
+            return self._child(self.tweet["text"])
+        return self._child(f"{self.tweet['name']}\n@{self.tweet['screen_name']}")
+
+    def find_elements(self, by, selector):
+        self.driver.round_trip()
+        return [self._child(self.tweet[k]) for k in ("reply_count", "retweet_count", "favorite_count")]
+
+    def get_attribute(self, name):
+        self.driver.round_trip()
+        return self.tweet["created_at"]
+
+
+class FakeDriver:
+    def __init__(self, total: int, per_scroll: int, latency: float):
+        self.latency = latency
+        self.per_scroll = per_scroll
+        self.rendered = per_scroll
+        self.seen = 0
+        self.round_trips = 0
+        self.current_url = "http://fixture/search"
+        self.tweets = [
+            {
+                "text": f"tweet {i}", "name": f"User {i % 50}", "screen_name": f"user{i % 50}",
+                "created_at": "2025-01-01T00:00:00.000Z",
+                "reply_count": "1", "retweet_count": "2", "favorite_count": "3",
+            }
+            for i in range(total)
+        ]
+
+    def round_trip(self):
+        self.round_trips += 1
+        deadline = time.perf_counter() + self.latency
+        while time.perf_counter() < deadline:
+            pass
+
+    def get(self, url):
+        self.round_trip()
+
+    def find_element(self, by, selector):
+        self.round_trip()
+        return FakeElement(self, self.tweets[0])
+
+    def find_elements(self, by, selector):
+        self.round_trip()
+        return [FakeElement(self, t) for t in self.tweets[:self.rendered]]
+
+    def execute_script(self, script, *args):
+        self.round_trip()
+        if script == EXTRACT_TWEETS_SCRIPT:
+            rows = self.tweets[self.seen:self.rendered]
+            self.seen = self.rendered
+            return [dict(row) for row in rows]
+        if script.startswith("window.scrollTo"):
+            self.rendered = min(len(self.tweets), self.rendered + self.per_scroll)
+            return None
+        return self.rendered * 100
+
+
+def legacy_extract(tweet_element):
+    """Per-element extraction as search_tweets did it before batching"""
+    tweet_element.is_displayed()
+    text = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]').text
+    stats = tweet_element.find_elements(By.CSS_SELECTOR, '[role="group"] [data-testid$="-count"]')
+    user_texts = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]').text.split('\n')
+    timestamp = tweet_element.find_element(By.TAG_NAME, 'time').get_attribute('datetime')
+    return {
+        'text': text,
+        'created_at': timestamp,
+        'reply_count': stats[0].text,
+        'retweet_count': stats[1].text,
+        'favorite_count': stats[2].text,
+        'user': {'name': user_texts[0], 'screen_name': user_texts[1].replace('@', '')},
+    }
+
+
+def legacy_collect(driver, max_tweets: int):
+    tweets = []
+    while len(tweets) < max_tweets:
+        for tweet_element in driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]'):
+            if len(tweets) >= max_tweets:
+                break
+            tweet_data = legacy_extract(tweet_element)
+            if not any(
+                t['text'] == tweet_data['text'] and
+                t['user']['screen_name'] == tweet_data['user']['screen_name']
+                for t in tweets
+            ):
+                tweets.append(tweet_data)
+        if len(tweets) >= max_tweets:
+            break
+        driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+    return tweets
+
+
+def make_scraper(driver) -> TwitterScraper:
+    scraper = TwitterScraper.__new__(TwitterScraper)
+    scraper.driver = driver
+    scraper.wait = types.SimpleNamespace(until=lambda condition: True)
+    scraper.base_url = "http://fixture"
+    scraper.logged_in_as = None
+    return scraper
+
+
+def run(args) -> None:
+    # Skip the fixed page-load and scroll sleeps; they are identical for both paths
+    x.time = types.SimpleNamespace(sleep=lambda seconds: None)
+
+    driver = FakeDriver(args.tweets, args.per_scroll, args.latency)
+    start = time.perf_counter()
+    legacy = legacy_collect(driver, args.tweets)
+    legacy_elapsed = time.perf_counter() - start
+    legacy_trips = driver.round_trips
+
+    driver = FakeDriver(args.tweets, args.per_scroll, args.latency)
+    start = time.perf_counter()
+    response = make_scraper(driver).search_tweets("STUB", SearchType.LATEST, args.tweets, close=False)
+    batched_elapsed = time.perf_counter() - start
+
+    assert len(legacy) == len(response.tweets) == args.tweets, response.error
+    print(f"per-element loop: {legacy_elapsed:7.2f}s, {legacy_trips:6d} WebDriver round-trips")
+    print(f"batched script:   {batched_elapsed:7.2f}s, {driver.round_trips:6d} WebDriver round-trips")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tweets", type=int, default=500)
+    parser.add_argument("--per-scroll", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0005)
+    run(parser.parse_args())
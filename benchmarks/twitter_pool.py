@@ -0,0 +1,62 @@
+"""
+Compare per-search browser cold starts with leased sessions from
+TwitterScraperPool, using a saved search page served locally.
+
+Requires Chrome/chromedriver. Run from the repository root:
+
+    python -m benchmarks.twitter_pool --searches 10 --pool-size 2
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixture_server import serve_fixture
+from services.x import SearchType, TwitterScraper, TwitterScraperPool
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "twitter_search.html")
+
+
+def run(args) -> None:
+    profile_root = tempfile.mkdtemp(prefix="hypescan-bench-")
+    with serve_fixture(FIXTURE) as base_url:
+        start = time.perf_counter()
+        for i in range(args.searches):
+            scraper = TwitterScraper(
+                headless=True,
+                user_data_dir=os.path.join(profile_root, "cold"),
+                base_url=base_url
+            )
+            response = scraper.search_tweets("STUB", SearchType.LATEST, args.max_tweets)
+            assert response.status == "success", response.error
+        cold = time.perf_counter() - start
+
+        pool = TwitterScraperPool(
+            size=args.pool_size, headless=True, base_url=base_url,
+            profile_root=os.path.join(profile_root, "pool")
+        )
+        pool.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.pool_size) as executor:
+            responses = list(executor.map(
+                lambda _: pool.search("STUB", SearchType.LATEST, args.max_tweets),
+                range(args.searches)
+            ))
+        pooled = time.perf_counter() - start
+        stats = pool.stats()
+        pool.close()
+
+    assert all(r.status == "success" for r in responses)
+    print(f"cold start per search: {cold / args.searches:6.2f}s/search")
+    print(f"pooled ({args.pool_size} sessions):  {pooled / args.searches:6.2f}s/search")
+    print(f"lease wait avg={stats['lease_wait_avg'] * 1000:.1f}ms "
+          f"p95={stats['lease_wait_p95'] * 1000:.1f}ms recycled={stats['recycled']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--searches", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-tweets", type=int, default=10)
+    run(parser.parse_args())
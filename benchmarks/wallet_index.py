@@ -0,0 +1,75 @@
+"""
+Time the cross-token wallet index on synthetic trade history.
+
+Each token gets its own synthetic trades (wallets drawn from one shared
+pool, see benchmarks.dex_analytics) in a temporary TradeStore. The index is
+built from scratch, then a small batch of new trades is appended to one
+token and folded in incrementally, and finally smart-money queries and
+wallet lookups are timed. Run from the repository root:
+
+    python -m benchmarks.wallet_index --tokens 50 --trades 20000 --addresses 100000
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.dex_analytics import synthetic_trades
+from services.holders import HolderStore
+from services.ingest import TradeStore
+from services.wallets import WalletIndex
+
+
+def token_address(i: int) -> str:
+    return f"0x{0xab << 152 | i:040x}"
+
+
+def timed(func, iterations: int = 1):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return result, timings[len(timings) // 2] * 1000, timings[-1] * 1000
+
+
+def run(args) -> None:
+    now = time.time()
+    root = tempfile.mkdtemp(prefix="wallets-")
+    store = TradeStore(root)
+    addresses = store.addresses("eth")
+    start = time.perf_counter()
+    for i in range(args.tokens):
+        table = synthetic_trades(args.trades, addresses, args.addresses, now, seed=i, token_address=token_address(i))
+        store.append("eth", token_address(i), "dex_trades", table)
+    print(f"generated {args.tokens} tokens x {args.trades:,} trades in {time.perf_counter() - start:.2f}s")
+
+    index = WalletIndex(store, HolderStore(root))
+    read, build_ms, _ = timed(lambda: index.update_all("eth"))
+    print(f"full build: {read:,} trades in {build_ms:.0f} ms "
+          f"({index.stats()['networks']['eth']['positions']:,} positions)")
+
+    target = token_address(0)
+    table = synthetic_trades(args.new_trades, addresses, args.addresses, now, seed=args.tokens,
+                             token_address=target, first_block=args.trades)
+    store.append("eth", target, "dex_trades", table)
+    read, update_ms, _ = timed(lambda: index.update_all("eth"))
+    print(f"incremental update: {read:,} new trades in {update_ms:.1f} ms")
+
+    index.smart_money(target, "eth")  # per-wallet totals are cached after the first query
+    result, median_ms, worst_ms = timed(lambda: index.smart_money(target, "eth"), args.iterations)
+    print(f"smart-money query over {result['wallets']:,} wallets: median {median_ms:.1f} ms, worst {worst_ms:.1f} ms "
+          f"({result['early_wallets']:,} early elsewhere, {result['smart_wallets']:,} smart, score {result['score']})")
+    wallet = addresses.address(0)
+    record, median_ms, worst_ms = timed(lambda: index.wallet(wallet, "eth"), args.iterations)
+    print(f"wallet lookup ({record['tokens']} tokens): median {median_ms:.1f} ms, worst {worst_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--trades", type=int, default=20_000, help="trades per token")
+    parser.add_argument("--addresses", type=int, default=100_000, help="wallet pool size")
+    parser.add_argument("--new-trades", type=int, default=1_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    run(parser.parse_args())
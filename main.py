@@ -1,17 +1,53 @@
+import asyncio
 import json
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List
 import uvicorn
-from services.moralis import fetch_token_price
-from services.agents import moralis_crew
-from services.models import TokenAnalysisResponse
+from services.moralis import fetch_token_price_async
+from services.agents import moralis_crew, run_crew_analysis, stream_crew_analysis
+from services.models import TokenAnalysisResponse, CombinedTokenData, DexAnalyticsResponse, SmartMoneyResponse, BlockchainRecognition
+from services.report import build_token_report, TokenReport, REPORT_NETWORK
+from services.x import close_scraper_pools
+from services.jobs import job_queue, Job
+from services.prewarm import prewarmer
+from services.ingest import trade_ingestor
+from services.dex_analytics import get_dex_analytics
+from services.holders import holder_tracker
+from services.wallets import wallet_index, get_smart_money, WALLET_MAX_RESULTS
+from services.bulk import analyze_tokens, BULK_BATCH_SIZE, BULK_MAX_TOKENS
+from services.prescreen import prescreen, PRESCREEN_ENABLED
+from services.http_client import close_async_client
+from services.executor import shutdown_executors
+from services.cache import cache_stats
+from services.upstream import upstream_stats
+from services.gmgn_crawler import crawler_manager, get_gmgn_info
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await crawler_manager.start()
+    except Exception as e:
+        # GMGN lookups retry the launch on first use
+        print(f"Failed to start GMGN crawler: {str(e)}")
+    await job_queue.start()
+    await prewarmer.start()
+    yield
+    await prewarmer.stop()
+    await job_queue.stop()
+    await crawler_manager.stop()
+    await close_async_client()
+    close_scraper_pools()
+    shutdown_executors()
 
 app = FastAPI(
     title="HypeScan Token Analysis API",
     description="API for analyzing cryptocurrency tokens using Moralis data and CrewAI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,36 +59,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def event_stream_response(events: AsyncIterator[Dict[str, Any]], format: str) -> StreamingResponse:
+    """
+    Send `{"section", "data", "error"}` events as server-sent events (event
+    name = section) or as newline-delimited JSON
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+
+    async def encode():
+        async for event in events:
+            payload = json.dumps(event, default=str)
+            if format == "sse":
+                yield f"event: {event['section']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/analyze-token/{token_address}", response_model=TokenAnalysisResponse)
-async def analyze_token(token_address: str):
+async def analyze_token(token_address: str, bypass_cache: bool = False, force: bool = False):
     """
     Analyze a token's data using Moralis and CrewAI
     
+    Tokens that fail the numeric pre-screen (no liquidity, volume or buyers)
+    are returned with their pre-screen features and no LLM analysis.
+
     - **token_address**: The token's address or pair address to analyze
+    - **bypass_cache**: Re-run the analysis even if a cached one matches the current data
+    - **force**: Run the analysis even if the token fails the pre-screen
     """
+    prewarmer.record_request(token_address)
     try:
         # 1️⃣ Fetch token data from Moralis
         print(f"Fetching token data for: {token_address} ...")
-        price_data = fetch_token_price(token_address)
+        price_data = await fetch_token_price_async(token_address)
 
         if "error" in price_data:
             error_msg = f"Error fetching token data: {price_data['error']}"
             print(error_msg)
             return TokenAnalysisResponse(success=False, error=error_msg)
 
+        screen = prescreen([price_data])[0] if PRESCREEN_ENABLED else None
+        if screen is not None and not screen["passed"] and not force:
+            print(f"Skipping analysis, pre-screen failed: {', '.join(screen['reasons'])}")
+            return TokenAnalysisResponse(
+                success=True,
+                data={
+                    "token_data": price_data,
+                    "analysis": None,
+                    "prescreen": screen
+                }
+            )
+
         print("\nRunning CrewAI Moralis analysis...")
-        analysis_result = moralis_crew.kickoff(inputs={"data": price_data})
-        
-        # Convert to dict if it's a raw object
-        if hasattr(analysis_result, 'raw'):
-            analysis_result = analysis_result.raw
+        analysis_result = await run_crew_analysis(
+            moralis_crew, {"data": price_data}, bypass_cache=bypass_cache
+        )
 
         # 3️⃣ Return the analysis output
         return TokenAnalysisResponse(
             success=True,
             data={
                 "token_data": price_data,
-                "analysis": analysis_result
+                "analysis": analysis_result,
+                "prescreen": screen
             }
         )
 
@@ -61,6 +137,323 @@ async def analyze_token(token_address: str):
         print(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.get("/api/analyze-token/{token_address}/stream")
+async def analyze_token_stream(
+    token_address: str,
+    bypass_cache: bool = False,
+    force: bool = False,
+    format: str = "sse"
+):
+    """
+    Streaming variant of analyze-token
+
+    Sends the Moralis data as a `token_data` event and the pre-screen result
+    as a `prescreen` event, then (if the token passed, or with force) the
+    analysis as it is generated in `token` events (`data` is the text
+    delta), and finally the full text in an `analysis` event.
+
+    - **format**: `sse` (text/event-stream, event name = section) or `ndjson`
+    """
+    prewarmer.record_request(token_address)
+
+    async def events():
+        price_data = await fetch_token_price_async(token_address)
+        if "error" in price_data:
+            yield {"section": "token_data", "data": None, "error": f"Error fetching token data: {price_data['error']}"}
+            return
+        yield {"section": "token_data", "data": price_data, "error": None}
+
+        if PRESCREEN_ENABLED:
+            screen = prescreen([price_data])[0]
+            yield {"section": "prescreen", "data": screen, "error": None}
+            if not screen["passed"] and not force:
+                return
+
+        parts = []
+        try:
+            async for delta in stream_crew_analysis(moralis_crew, {"data": price_data}, bypass_cache=bypass_cache):
+                parts.append(delta)
+                yield {"section": "token", "data": delta, "error": None}
+        except Exception as e:
+            yield {"section": "analysis", "data": None, "error": f"Error processing token analysis: {str(e)}"}
+            return
+        yield {"section": "analysis", "data": "".join(parts), "error": None}
+
+    return event_stream_response(events(), format)
+
+@app.get("/api/gmgn-analysis/{token_address}/stream")
+async def gmgn_analysis_stream(token_address: str, refresh: bool = False, format: str = "sse"):
+    """
+    Stream Gemini's analysis of a token's GMGN.ai security fields
+
+    Sends the structured fields as a `security` event, then the analysis as
+    it is generated in `token` events (`data` is the text chunk), and
+    finally the full text in an `analysis` event.
+
+    - **refresh**: Crawl the GMGN page again instead of using the cached one
+    - **format**: `sse` (text/event-stream, event name = section) or `ndjson`
+    """
+    # Imported here because the Gemini client needs GEMINI_API_KEY at import;
+    # the rest of the API runs without it
+    from services.gemini import stream_gmgn_analysis
+
+    async def events():
+        gmgn = await get_gmgn_info(token_address, refresh=refresh)
+        if gmgn.status != "success":
+            yield {"section": "security", "data": None, "error": f"Error fetching GMGN data: {gmgn.error}"}
+            return
+        yield {"section": "security", "data": gmgn.security.model_dump(exclude_none=True), "error": None}
+
+        parts = []
+        try:
+            async for chunk in stream_gmgn_analysis(gmgn.security):
+                parts.append(chunk)
+                yield {"section": "token", "data": chunk, "error": None}
+        except Exception as e:
+            yield {"section": "analysis", "data": None, "error": f"Error processing GMGN analysis: {str(e)}"}
+            return
+        yield {"section": "analysis", "data": "".join(parts), "error": None}
+
+    return event_stream_response(events(), format)
+
+class BulkAnalyzeRequest(BaseModel):
+    pair_addresses: List[str]
+    batch_size: int = Field(BULK_BATCH_SIZE, ge=1, le=100)
+    bypass_cache: bool = False
+
+@app.post("/api/analyze-tokens")
+async def analyze_tokens_bulk(request: BulkAnalyzeRequest, format: str = "ndjson"):
+    """
+    Screen many pairs at once
+
+    Moralis stats are fetched with bounded concurrency and the tokens are
+    scored `batch_size` per LLM prompt. One `token` event is streamed per
+    pair as soon as its batch is scored, then a `done` event with counts.
+
+    - **format**: `ndjson` or `sse`
+    """
+    if len(request.pair_addresses) > BULK_MAX_TOKENS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_TOKENS} pair addresses per request")
+    return event_stream_response(
+        analyze_tokens(request.pair_addresses, batch_size=request.batch_size, bypass_cache=request.bypass_cache),
+        format
+    )
+
+@app.get("/api/token-report/{pair_address}", response_model=CombinedTokenData)
+async def token_report(
+    pair_address: str,
+    token_address: Optional[str] = None,
+    query: Optional[str] = None,
+    bypass_cache: bool = False
+):
+    """
+    Combined report from Moralis, Bitquery, GMGN and Twitter plus their crew analyses
+
+    All sources are fetched concurrently and each crew starts as soon as its
+    input arrives. Sources that fail or time out are listed in `errors`.
+
+    - **pair_address**: The DEX pair address
+    - **token_address**: The token contract (looked up from the pair if omitted)
+    - **query**: Twitter search query (the token's $SYMBOL if omitted)
+    - **bypass_cache**: Re-run the analyses even if cached ones match the current data
+    """
+    prewarmer.record_request(pair_address, token_address)
+    try:
+        return await build_token_report(
+            pair_address, token_address=token_address, query=query, bypass_cache=bypass_cache
+        )
+    except Exception as e:
+        error_msg = f"Error building token report: {str(e)}"
+        print(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/dex-analytics", response_model=DexAnalyticsResponse)
+async def dex_analytics(coinAddress: str, pairAddress: str):
+    """
+    24h DEX volume, unique traders and whale trades from the token's stored
+    trade history, plus the pair's liquidity
+
+    Trades newer than the stored history are ingested from Bitquery first.
+
+    - **coinAddress**: The token contract address
+    - **pairAddress**: The DEX pair address (for liquidity)
+    """
+    prewarmer.record_request(pairAddress, coinAddress)
+    try:
+        return await get_dex_analytics(coinAddress, pairAddress, REPORT_NETWORK)
+    except Exception as e:
+        error_msg = f"Error computing DEX analytics: {str(e)}"
+        print(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/api/holder-metrics/{token_address}")
+async def holder_metrics(token_address: str, days: int = 7):
+    """
+    Holder concentration (Gini, Nakamoto, Theil, top-holder shares) and its
+    day-over-day changes, computed from stored daily holder snapshots
+
+    Yesterday's snapshot is taken first if it is missing; later requests that
+    day cost no Bitquery credits.
+
+    - **token_address**: The token contract address
+    - **days**: Number of daily snapshots to return (up to 90)
+    """
+    days = max(1, min(days, 90))
+    snapshot = await holder_tracker.snapshot(token_address, REPORT_NETWORK)
+    trend = await asyncio.to_thread(holder_tracker.trends, token_address, REPORT_NETWORK, days)
+    if not trend:
+        raise HTTPException(status_code=502, detail=f"No holder snapshot available: {snapshot['error']}")
+    return {
+        "token_address": token_address,
+        "network": REPORT_NETWORK,
+        "latest": trend[-1],
+        "trend": trend,
+        "snapshot": snapshot,
+    }
+
+@app.get("/api/smart-money/{token_address}", response_model=SmartMoneyResponse)
+async def smart_money(token_address: str, limit: int = WALLET_MAX_RESULTS):
+    """
+    Wallets trading or holding a token that were early in other tracked
+    tokens, with their realized PnL and hit rate there, and the token's
+    smart-money score
+
+    Answered from the local wallet index after ingesting the token's new
+    trades; the index covers every token in the trade store.
+
+    - **token_address**: The token contract address
+    - **limit**: Most wallets listed (up to 500)
+    """
+    limit = max(0, min(limit, 500))
+    try:
+        return await get_smart_money(token_address, REPORT_NETWORK, limit)
+    except Exception as e:
+        error_msg = f"Error querying smart money: {str(e)}"
+        print(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.get("/api/wallets/{address}")
+async def wallet_record(address: str):
+    """
+    A wallet's realized PnL, hit rate and early entries across the tokens in
+    the wallet index, with its position in each
+
+    - **address**: The wallet address
+    """
+    try:
+        record = await asyncio.to_thread(wallet_index.wallet, address, REPORT_NETWORK)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Wallet has no indexed trades: {address}")
+    return record
+
+@app.get("/blockchain-recognition", response_model=List[BlockchainRecognition])
+async def blockchain_recognition(coinAddress: str, pairAddress: str):
+    """
+    On-chain pattern signals for the AI signals panel; currently the
+    "Smart Money Movement" signal from the wallet index
+
+    - **coinAddress**: The token contract address
+    - **pairAddress**: The DEX pair address
+    """
+    prewarmer.record_request(pairAddress, coinAddress)
+    try:
+        response = await get_smart_money(coinAddress, REPORT_NETWORK, limit=0)
+    except Exception as e:
+        error_msg = f"Error querying smart money: {str(e)}"
+        print(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    return [response.signal]
+
+@app.get("/api/token-report/{pair_address}/stream")
+async def token_report_stream(
+    pair_address: str,
+    token_address: Optional[str] = None,
+    query: Optional[str] = None,
+    bypass_cache: bool = False,
+    format: str = "sse"
+):
+    """
+    Streaming variant of the token report
+
+    Each source (moralis, bitquery, gmgn, twitter, smart_money, dex_analytics) and each crew analysis
+    (`<source>_analysis`, `prediction_analysis`) is sent as soon as it is
+    ready, as `{"section", "data", "error"}`. A final `done` event carries
+    the errors and timings.
+
+    - **format**: `sse` (text/event-stream, event name = section) or `ndjson`
+    """
+    prewarmer.record_request(pair_address, token_address)
+    report = TokenReport(pair_address, token_address, query, bypass_cache=bypass_cache)
+    return event_stream_response(report.stream(), format)
+
+class TokenReportJobRequest(BaseModel):
+    pair_address: str
+    token_address: Optional[str] = None
+    query: Optional[str] = None
+    bypass_cache: bool = False
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+    deduplicated: bool
+
+@app.post("/api/jobs", response_model=JobSubmitted, status_code=202)
+async def submit_job(request: TokenReportJobRequest):
+    """
+    Queue a token report and return its job id right away
+
+    Submitting the same request while an identical job is queued or running
+    returns that job.
+    """
+    prewarmer.record_request(request.pair_address, request.token_address)
+    job, deduplicated = await job_queue.submit("token-report", request.model_dump())
+    return JobSubmitted(job_id=job.id, status=job.status, deduplicated=deduplicated)
+
+@app.get("/api/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Job status, and its result once it has succeeded
+
+    - **wait**: Long-poll for up to this many seconds for the job to finish
+    """
+    job = await job_queue.wait(job_id, min(wait, 60)) if wait > 0 else await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, format: str = "sse"):
+    """
+    Subscribe to a job: one `status` event per status change; the last one
+    (succeeded or failed) carries the result or error
+
+    - **format**: `sse` (text/event-stream) or `ndjson`
+    """
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    async def events():
+        async for job in job_queue.watch(job_id):
+            yield {"section": "status", "data": job.model_dump(mode="json"), "error": job.error}
+
+    return event_stream_response(events(), format)
+
+@app.get("/api/metrics")
+async def metrics():
+    """Cache, upstream limiter, GMGN crawler, job queue, pre-warm, ingest, holder snapshot and wallet index counters"""
+    return {
+        "caches": cache_stats(),
+        "upstream": upstream_stats(),
+        "gmgn_crawler": crawler_manager.stats(),
+        "jobs": job_queue.stats(),
+        "prewarm": prewarmer.stats(),
+        "ingest": trade_ingestor.stats(),
+        "holders": holder_tracker.stats(),
+        "wallets": wallet_index.stats(),
+    }
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,143 @@
+import os
+import threading
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.locks import file_lock
+
+ADDRESS_BYTES = 20
+# Id stored where a row has no address
+NO_ADDRESS = 0xFFFFFFFF
+
+
+def address_bytes(address: str) -> bytes:
+    """The 20 raw bytes of a 0x-prefixed hex address"""
+    raw = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+    if len(raw) != ADDRESS_BYTES:
+        raise ValueError(f"Not a {ADDRESS_BYTES}-byte address: {address}")
+    return raw
+
+
+class AddressTable:
+    """
+    Interns 20-byte addresses as dense uint32 ids
+
+    Addresses are kept back to back in one bytearray (id i at bytes
+    [20i, 20i + 20)) with a dict from the raw bytes to the id, so each
+    distinct address is stored once however many rows refer to it. With a
+    path, new addresses are appended to that file, which keeps ids stable
+    across restarts. Processes sharing the file (uvicorn workers on one
+    INGEST_DIR) assign ids under a lock on it and first pick up what the
+    others appended, so an address has the same id in every process.
+    """
+
+    __slots__ = ("path", "_buffer", "_ids", "_persisted", "_lock")
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._buffer = bytearray()
+        self._ids: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self._persisted = 0
+        with self._lock, self._file_lock():
+            self._sync(repair=True)
+
+    def __len__(self) -> int:
+        return len(self._buffer) // ADDRESS_BYTES
+
+    def _file_lock(self):
+        return file_lock(self.path) if self.path else nullcontext()
+
+    def _sync(self, repair: bool = False) -> None:
+        """
+        Read addresses appended to the file since it was last read (by this
+        or another process); thread lock held. With repair (file lock held),
+        a record cut short by an interrupted append is truncated away so the
+        next append starts on a record boundary.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        if os.path.getsize(self.path) == self._persisted:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._persisted)
+            data = f.read()
+        whole = len(data) - len(data) % ADDRESS_BYTES
+        if repair and whole < len(data):
+            os.truncate(self.path, self._persisted + whole)
+        for start in range(0, whole, ADDRESS_BYTES):
+            raw = data[start:start + ADDRESS_BYTES]
+            self._ids.setdefault(raw, len(self))
+            self._buffer += raw
+        self._persisted += whole
+
+    def _add(self, raw: bytes) -> int:
+        address_id = self._ids.get(raw)
+        if address_id is None:
+            address_id = self._ids[raw] = len(self)
+            self._buffer += raw
+        return address_id
+
+    def intern(self, address: Optional[str]) -> int:
+        """Id of an address, assigning the next id if it is new"""
+        return self.intern_many([address])[0]
+
+    def intern_many(self, addresses: Iterable[Optional[str]]) -> np.ndarray:
+        """uint32 ids of many addresses (NO_ADDRESS for empty ones), then flush new ones"""
+        with self._lock, self._file_lock():
+            self._sync(repair=True)
+            ids = np.fromiter(
+                (self._add(address_bytes(address)) if address else NO_ADDRESS for address in addresses),
+                dtype=np.uint32,
+            )
+            self._flush()
+        return ids
+
+    def lookup(self, address: str) -> Optional[int]:
+        """Id of an address if it has been interned (by any process sharing the file)"""
+        raw = address_bytes(address)
+        address_id = self._ids.get(raw)
+        if address_id is None and self.path:
+            with self._lock:
+                self._sync()
+            address_id = self._ids.get(raw)
+        return address_id
+
+    def address(self, address_id: int) -> Optional[str]:
+        if address_id != NO_ADDRESS and address_id >= len(self) and self.path:
+            with self._lock:
+                self._sync()
+        if address_id == NO_ADDRESS or address_id >= len(self):
+            return None
+        start = int(address_id) * ADDRESS_BYTES
+        return "0x" + self._buffer[start:start + ADDRESS_BYTES].hex()
+
+    def addresses(self, ids: Iterable[int]) -> List[Optional[str]]:
+        return [self.address(address_id) for address_id in ids]
+
+    def _flush(self) -> None:
+        if not self.path or self._persisted == len(self._buffer):
+            return
+        with open(self.path, "ab") as f:
+            f.write(self._buffer[self._persisted:])
+        self._persisted = len(self._buffer)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+
+_tables: Dict[str, AddressTable] = {}
+_tables_lock = threading.Lock()
+
+
+def address_table(root: str, network: str) -> AddressTable:
+    """The shared address table of one network in a local store directory"""
+    key = os.path.join(root, network, "addresses.bin")
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = AddressTable(key)
+        return table
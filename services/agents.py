@@ -1,12 +1,24 @@
 from crewai import Agent, LLM, Crew, Task
+import asyncio
 import os
+import hashlib
+import json
+import math
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
 from dotenv import load_dotenv
+from services.executor import run_blocking
+from services.cache import ResponseCache
+from services.http_client import get_async_client
 
 load_dotenv()
 
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# OpenAI-compatible endpoint used for every model instead of the provider's
+# own, e.g. a local stand-in server during tests and benchmarks
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
 
 # ----------------------------
 # LLM Instances
@@ -15,13 +27,15 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 llm = LLM(
     model="groq/llama-3.3-70b-versatile",
     temperature=0.3,
-    api_key=OPENAI_API_KEY
+    api_key=OPENAI_API_KEY,
+    base_url=LLM_BASE_URL
 )
 
 llm_groq = LLM(
     model="groq/llama3-8b-8192",
     temperature=0.3,
-    api_key=GROQ_API_KEY
+    api_key=GROQ_API_KEY,
+    base_url=LLM_BASE_URL
 )
 
 # ----------------------------
@@ -57,9 +71,9 @@ moralis_crew = Crew(
 
 api_key = os.getenv("OPENAI_API_KEY")
 api_key2 = os.getenv("GROQ_API_KEY")
-llm = LLM(model="groq/llama-3.3-70b-versatile", temperature=0.3, api_key=api_key)
-llm1=LLM(model="groq/deepseek-r1-distill-llama-70b", temperature=0.3, api_key=api_key2)
-llm2=LLM(model="groq/llama3-8b-8192", temperature=0.3, api_key=api_key2)
+llm = LLM(model="groq/llama-3.3-70b-versatile", temperature=0.3, api_key=api_key, base_url=LLM_BASE_URL)
+llm1=LLM(model="groq/deepseek-r1-distill-llama-70b", temperature=0.3, api_key=api_key2, base_url=LLM_BASE_URL)
+llm2=LLM(model="groq/llama3-8b-8192", temperature=0.3, api_key=api_key2, base_url=LLM_BASE_URL)
 # Data Analyzer Agent
 analyzer = Agent(
     role="Data Analyzer",
@@ -176,3 +190,246 @@ predict_crew=Crew(
     memory=True
 )
 
+# ----------------------------
+# Bulk screening: many tokens per prompt
+# ----------------------------
+bulk_screener = Agent(
+    role="Bulk Token Screener",
+    goal="Score every cryptocurrency token in the list {data} on price momentum, liquidity, volume, buyer/seller activity and, where given, smartMoneyScore (share of buy volume from wallets with a profitable early-entry record).",
+    backstory="A quantitative crypto analyst who triages large token universes quickly and consistently.",
+    verbose=True,
+    llm=llm
+)
+
+bulk_screening_task = Task(
+    description=(
+        "Score every token in {data} from 0 (avoid) to 100 (very strong) and give each an action signal "
+        "from [Strong Buy, Buy, Hold, Sell, Strong Sell] with a one sentence summary. "
+        "Answer with only a JSON array containing one object per token, "
+        'with the keys "pairAddress", "score", "signal" and "summary".'
+    ),
+    agent=bulk_screener,
+    expected_output="A JSON array with one object per input token"
+)
+
+bulk_crew = Crew(
+    agents=[bulk_screener,],
+    tasks=[bulk_screening_task,],
+    verbose=True
+)
+
+
+# ----------------------------
+# Async execution
+# ----------------------------
+def _kickoff(crew: Crew, inputs: Dict[str, Any]) -> Any:
+    # kickoff interpolates inputs into the crew's tasks and agents and keeps
+    # their outputs and memory on them, so concurrent runs of one of the
+    # module-level crews each get a copy
+    return crew.copy().kickoff(inputs=inputs)
+
+
+async def kickoff_async(crew: Crew, inputs: Dict[str, Any]) -> Any:
+    """
+    Run a copy of a crew on the bounded LLM pool so the event loop stays
+    responsive and concurrent runs do not share state.
+
+    Args:
+        crew: One of the crews defined above
+        inputs: Inputs passed to crew.kickoff
+
+    Returns:
+        The crew output
+    """
+    return await run_blocking("llm", _kickoff, crew, inputs)
+
+
+# ----------------------------
+# Analysis cache
+# ----------------------------
+# Inputs are fingerprinted with price and volume fields rounded to
+# ANALYSIS_CACHE_PRECISION significant digits, so near-identical snapshots
+# reuse the prior analysis.
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "300"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+ANALYSIS_CACHE_PRECISION = int(os.getenv("ANALYSIS_CACHE_PRECISION", "3"))
+
+analysis_cache = ResponseCache("crew_analysis", ttl=ANALYSIS_CACHE_TTL, maxsize=ANALYSIS_CACHE_SIZE)
+
+# A field is rounded if a word of its name (split on case and punctuation,
+# e.g. usdPrice, 24hrPercentChange, AmountInUSD, market_cap) is one of these,
+# and so is everything nested under it (e.g. pricePercentChange["24h"]); ids,
+# block numbers, timestamps, decimals and counts are hashed exactly
+QUANTIZED_WORDS = {
+    "price", "prices", "volume", "liquidity", "usd", "cap", "mcap", "marketcap", "fdv",
+    "change", "percent", "percentage", "amount", "balance", "supply", "reserve", "reserves",
+}
+_NUMBER = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+def _quantized_key(key: Any) -> bool:
+    words = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", str(key))
+    return any(word.lower() in QUANTIZED_WORDS for word in words)
+
+
+def _quantize(value: Any, precision: int, quantize: bool = False) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, str):
+        # Only plain decimal strings (e.g. "0.0001234"); never "inf", "nan" or ids
+        if not quantize or not _NUMBER.fullmatch(value.strip()):
+            return value
+        return _quantize(float(value), precision, quantize)
+    if isinstance(value, (int, float)):
+        if not quantize or not math.isfinite(value):
+            return value if math.isfinite(value) else str(value)
+        return float(f"{value:.{precision}g}")
+    if isinstance(value, dict):
+        return {str(k): _quantize(v, precision, quantize or _quantized_key(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_quantize(v, precision, quantize) for v in value]
+    if hasattr(value, "model_dump"):
+        return _quantize(value.model_dump(), precision, quantize)
+    return str(value)
+
+
+def input_fingerprint(inputs: Dict[str, Any], precision: int = ANALYSIS_CACHE_PRECISION) -> str:
+    """
+    Hash crew inputs with price and volume fields (see QUANTIZED_WORDS),
+    including plain decimal strings, rounded to `precision` significant digits
+    """
+    quantized = _quantize(inputs, precision)
+    encoded = json.dumps(quantized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+async def run_crew_analysis(crew: Crew, inputs: Dict[str, Any], bypass_cache: bool = False) -> Any:
+    """
+    Run a crew and return its raw output, reusing a cached analysis for
+    inputs with the same fingerprint
+
+    Args:
+        crew: One of the crews defined above
+        inputs: Inputs passed to crew.kickoff
+        bypass_cache: Always run the crew (the fresh result replaces the cached one)
+
+    Returns:
+        The crew's raw output
+    """
+    crew_key = "|".join(agent.role for agent in crew.agents)
+
+    async def analyze():
+        result = await kickoff_async(crew, inputs)
+        return result.raw if hasattr(result, "raw") else result
+
+    return await analysis_cache.get_or_fetch(
+        (crew_key, input_fingerprint(inputs)),
+        analyze,
+        refresh=bypass_cache
+    )
+
+
+# ----------------------------
+# Token streaming
+# ----------------------------
+# Every crew above is a single tool-less agent with a single task, so its
+# answer can be streamed by sending the agent's prompt straight to the
+# model's OpenAI-compatible chat completions endpoint.
+PROVIDER_BASE_URLS = {
+    "groq": "https://api.groq.com/openai/v1",
+    "openai": "https://api.openai.com/v1",
+}
+
+
+def crew_messages(crew: Crew, inputs: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Chat messages equivalent to the crew's agent prompt with inputs interpolated"""
+    agent, task = crew.agents[0], crew.tasks[0]
+
+    def fill(text: str) -> str:
+        for name, value in inputs.items():
+            rendered = value if isinstance(value, str) else json.dumps(value, default=str)
+            text = text.replace("{" + name + "}", rendered)
+        return text
+
+    system = f"You are {fill(agent.role)}. {fill(agent.backstory)}\nYour personal goal is: {fill(agent.goal)}"
+    user = f"{fill(task.description)}\n\nThis is the expected criteria for your final answer: {task.expected_output}"
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+async def stream_completion(
+    model: LLM,
+    messages: List[Dict[str, str]],
+    base_url: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion as text deltas
+
+    Args:
+        model: One of the LLM instances above (provider/model name, key, temperature)
+        messages: Chat messages
+        base_url: OpenAI-compatible endpoint (defaults to the model's, then its provider's)
+
+    Yields:
+        Text deltas in generation order
+    """
+    provider, _, model_name = model.model.partition("/")
+    if not model_name:
+        provider, model_name = "openai", provider
+    url = (base_url or model.base_url or PROVIDER_BASE_URLS[provider]).rstrip("/")
+    payload = {
+        "model": model_name,
+        "messages": messages,
+        "temperature": model.temperature,
+        "stream": True,
+    }
+    headers = {"Authorization": f"Bearer {model.api_key}"} if model.api_key else {}
+
+    async with get_async_client().stream("POST", f"{url}/chat/completions", json=payload, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def stream_crew_analysis(
+    crew: Crew,
+    inputs: Dict[str, Any],
+    bypass_cache: bool = False,
+    base_url: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a crew's analysis token by token
+
+    A cached analysis for the same input fingerprint is yielded whole; a
+    completed stream is stored in the cache shared with run_crew_analysis.
+
+    Args:
+        crew: One of the crews defined above
+        inputs: Inputs the crew would be kicked off with
+        bypass_cache: Always generate (the result replaces the cached one)
+        base_url: OpenAI-compatible endpoint override
+
+    Yields:
+        Text deltas of the analysis
+    """
+    crew_key = "|".join(agent.role for agent in crew.agents)
+    key = (crew_key, input_fingerprint(inputs))
+
+    if not bypass_cache:
+        cached = await asyncio.to_thread(analysis_cache.get, key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    async for delta in stream_completion(crew.agents[0].llm, crew_messages(crew, inputs), base_url):
+        parts.append(delta)
+        yield delta
+    await asyncio.to_thread(analysis_cache.set, key, "".join(parts))
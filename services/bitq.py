@@ -1,8 +1,13 @@
 import os
+import asyncio
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 import requests
-from datetime import datetime
+import httpx
+from datetime import datetime, timedelta
+from services.http_client import get_async_client
+from services.cache import ResponseCache
+from services import upstream
 
 
 class BitqueryResponse(BaseModel):
@@ -11,191 +16,753 @@ class BitqueryResponse(BaseModel):
     error: Optional[str] = None
 
 
+TOKEN_HOLDERS_FIELD = """
+    TokenHolders(
+      date: $date
+      tokenSmartContract: $token
+      limit: {count: $limit}
+      orderBy: {descending: Balance_Amount}
+      where: {Balance: {Amount: {gt: "0"}}}
+    ) {
+      Holder {
+        Address
+      }
+      Balance {
+        Amount
+      }
+    }
+"""
+
+# Every holder on a date, page by page for services.holders. Ordered by
+# address so offsets stay stable across pages of a finished day.
+TOKEN_HOLDERS_PAGE_FIELD = """
+    TokenHolders(
+      date: $date
+      tokenSmartContract: $token
+      limit: {count: $limit, offset: $offset}
+      orderBy: {ascending: Holder_Address}
+      where: {Balance: {Amount: {gt: "0"}}}
+    ) {
+      Holder {
+        Address
+      }
+      Balance {
+        Amount
+      }
+    }
+"""
+
+TOKEN_HOLDER_STATS_FIELD = """
+    TokenHolders(
+      tokenSmartContract: $token
+      date: $date
+      where: {Balance: {Amount: {gt: "0"}}}
+    ) {
+      gini(of: Balance_Amount)
+      nakamoto(of: Balance_Amount, percent: 0.51)
+      theil(of: Balance_Amount)
+      uniq(of: Holder_Address)
+      sum(of: Balance_Amount)
+      average(of: Balance_Amount)
+      median(of: Balance_Amount)
+    }
+"""
+
+TOKEN_TRANSFERS_FIELD = """
+    Transfers(
+      limit: {count: $limit}
+      orderBy: {descending: Block_Time}
+      where: {
+        Transfer: {Currency: {SmartContract: {is: $token}}}
+        Block: {Date: {since: $since}}
+      }
+    ) {
+      Transfer {
+        Amount
+        Sender
+        Receiver
+        Currency {
+          Name
+          Symbol
+        }
+      }
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+    }
+"""
+
+DEX_TRADES_FIELD = """
+    DEXTrades(
+      limit: {count: $limit}
+      orderBy: {descending: Block_Time}
+      where: {
+        Trade: {
+          Buy: {Currency: {SmartContract: {is: $token}}}
+        }
+        Block: {Date: {since: $since}}
+      }
+    ) {
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+      Trade {
+        Buy {
+          Amount
+          Buyer
+          Currency {
+            Name
+            Symbol
+          }
+          Price
+        }
+        Sell {
+          Amount
+          Seller
+          Currency {
+            Name
+            Symbol
+          }
+          Price
+        }
+        Dex {
+          ProtocolName
+          ProtocolFamily
+        }
+      }
+    }
+"""
+
+# Incremental variants for services.ingest: oldest first, only rows after a
+# block number, with USD amounts for analytics. Trades on either side of the
+# token are included, so sells are not missed.
+TRANSFERS_AFTER_FIELD = """
+    Transfers(
+      limit: {count: $limit}
+      orderBy: {ascending: Block_Number}
+      where: {
+        Transfer: {Currency: {SmartContract: {is: $token}}}
+        Block: {Number: {gt: $after}, Date: {since: $since}}
+      }
+    ) {
+      Transfer {
+        Amount
+        AmountInUSD
+        Sender
+        Receiver
+        Currency {
+          Symbol
+        }
+      }
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+    }
+"""
+
+DEX_TRADES_AFTER_FIELD = """
+    DEXTrades(
+      limit: {count: $limit}
+      orderBy: {ascending: Block_Number}
+      where: {
+        any: [
+          {Trade: {Buy: {Currency: {SmartContract: {is: $token}}}}}
+          {Trade: {Sell: {Currency: {SmartContract: {is: $token}}}}}
+        ]
+        Block: {Number: {gt: $after}, Date: {since: $since}}
+      }
+    ) {
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+      Trade {
+        Buy {
+          Amount
+          AmountInUSD
+          Buyer
+          Currency {
+            Symbol
+            SmartContract
+          }
+          Price
+          PriceInUSD
+        }
+        Sell {
+          Amount
+          AmountInUSD
+          Seller
+          Currency {
+            Symbol
+            SmartContract
+          }
+        }
+        Dex {
+          ProtocolName
+          ProtocolFamily
+        }
+      }
+    }
+"""
+
+VARIABLE_TYPES = {
+    "limit": "Int!",
+    "date": "String!",
+    "since": "String!",
+    "after": "String!",
+    "offset": "Int!",
+}
+
+# Section key -> (dataset, variables used, field fragment, label used in errors)
+TOKEN_SECTIONS = {
+    "top_holders": ("archive", ("limit", "date"), TOKEN_HOLDERS_FIELD, "Holders"),
+    "holder_statistics": ("archive", ("date",), TOKEN_HOLDER_STATS_FIELD, "Stats"),
+    "recent_transfers": ("combined", ("limit", "since"), TOKEN_TRANSFERS_FIELD, "Transfers"),
+    "dex_trades": ("combined", ("limit", "since"), DEX_TRADES_FIELD, "Trades"),
+}
+
+
+def _variable_declarations(names) -> str:
+    declarations = ["$network: evm_network!", "$token: String!"]
+    declarations += [f"${name}: {VARIABLE_TYPES[name]}" for name in names]
+    return ", ".join(declarations)
+
+
+def _single_query(section: str) -> str:
+    dataset, variables, field, _ = TOKEN_SECTIONS[section]
+    return (
+        f"query ({_variable_declarations(variables)}) {{\n"
+        f"  EVM(dataset: {dataset}, network: $network) {{{field}  }}\n"
+        f"}}\n"
+    )
+
+
+def build_combined_query(sections) -> str:
+    """
+    Build one GraphQL document containing the requested token sections.
+
+    Each section becomes an aliased field named after its result key, grouped
+    under one aliased EVM field per dataset, so the response can be split back
+    into the same shape the per-section queries return.
+    """
+    unknown = set(sections) - set(TOKEN_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown Bitquery sections: {sorted(unknown)}")
+
+    variables = []
+    by_dataset: Dict[str, list] = {}
+    for section in TOKEN_SECTIONS:
+        if section not in sections:
+            continue
+        dataset, section_variables, field, _ = TOKEN_SECTIONS[section]
+        variables += [v for v in section_variables if v not in variables]
+        by_dataset.setdefault(dataset, []).append(f"\n    {section}: {field.strip()}\n")
+
+    blocks = [
+        f"  {dataset}: EVM(dataset: {dataset}, network: $network) {{{''.join(fields)}  }}\n"
+        for dataset, fields in by_dataset.items()
+    ]
+    return f"query ({_variable_declarations(variables)}) {{\n{''.join(blocks)}}}\n"
+
+
+TOKEN_HOLDERS_QUERY = _single_query("top_holders")
+TOKEN_HOLDER_STATS_QUERY = _single_query("holder_statistics")
+TOKEN_TRANSFERS_QUERY = _single_query("recent_transfers")
+DEX_TRADES_QUERY = _single_query("dex_trades")
+TOKEN_HOLDERS_PAGE_QUERY = (
+    f"query ({_variable_declarations(('limit', 'date', 'offset'))}) {{\n"
+    f"  EVM(dataset: archive, network: $network) {{{TOKEN_HOLDERS_PAGE_FIELD}  }}\n"
+    f"}}\n"
+)
+TOKEN_TRANSFERS_AFTER_QUERY = (
+    f"query ({_variable_declarations(('limit', 'since', 'after'))}) {{\n"
+    f"  EVM(dataset: combined, network: $network) {{{TRANSFERS_AFTER_FIELD}  }}\n"
+    f"}}\n"
+)
+DEX_TRADES_AFTER_QUERY = (
+    f"query ({_variable_declarations(('limit', 'since', 'after'))}) {{\n"
+    f"  EVM(dataset: combined, network: $network) {{{DEX_TRADES_AFTER_FIELD}  }}\n"
+    f"}}\n"
+)
+
+BITQUERY_BATCH_SIZE = int(os.getenv("BITQUERY_BATCH_SIZE", "50"))
+
+# get_bitquery_info results, keyed by (network, token, sections)
+BITQUERY_CACHE_TTL = float(os.getenv("BITQUERY_CACHE_TTL", "120"))
+BITQUERY_CACHE_SIZE = int(os.getenv("BITQUERY_CACHE_SIZE", "512"))
+token_info_cache = ResponseCache("bitquery_token_info", ttl=BITQUERY_CACHE_TTL, maxsize=BITQUERY_CACHE_SIZE)
+
+# Multi-token variants: `in` filters over a token list, `limitBy` so every
+# token gets up to $limit rows, and the currency contract selected so rows
+# can be demultiplexed back to their token.
+BATCH_TOKEN_TRANSFERS_QUERY = """
+query ($network: evm_network!, $tokens: [String!], $limit: Int!, $total: Int!, $since: String!) {
+  EVM(dataset: combined, network: $network) {
+    Transfers(
+      limit: {count: $total}
+      limitBy: {by: Transfer_Currency_SmartContract, count: $limit}
+      orderBy: {descending: Block_Time}
+      where: {
+        Transfer: {Currency: {SmartContract: {in: $tokens}}}
+        Block: {Date: {since: $since}}
+      }
+    ) {
+      Transfer {
+        Amount
+        Sender
+        Receiver
+        Currency {
+          Name
+          Symbol
+          SmartContract
+        }
+      }
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+    }
+  }
+}
+"""
+
+BATCH_DEX_TRADES_QUERY = """
+query ($network: evm_network!, $tokens: [String!], $limit: Int!, $total: Int!, $since: String!) {
+  EVM(dataset: combined, network: $network) {
+    DEXTrades(
+      limit: {count: $total}
+      limitBy: {by: Trade_Buy_Currency_SmartContract, count: $limit}
+      orderBy: {descending: Block_Time}
+      where: {
+        Trade: {
+          Buy: {Currency: {SmartContract: {in: $tokens}}}
+        }
+        Block: {Date: {since: $since}}
+      }
+    ) {
+      Block {
+        Time
+        Number
+      }
+      Transaction {
+        Hash
+      }
+      Trade {
+        Buy {
+          Amount
+          Buyer
+          Currency {
+            Name
+            Symbol
+            SmartContract
+          }
+          Price
+        }
+        Sell {
+          Amount
+          Seller
+          Currency {
+            Name
+            Symbol
+          }
+          Price
+        }
+        Dex {
+          ProtocolName
+          ProtocolFamily
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def build_batch_holder_stats_query(count: int) -> str:
+    """
+    Build a holder statistics document covering `count` tokens.
+
+    TokenHolders only accepts a single contract, so each token gets its own
+    aliased field (t0, t1, ...) bound to its own $tokenN variable.
+    """
+    declarations = ["$network: evm_network!", "$date: String!"]
+    declarations += [f"$token{i}: String!" for i in range(count)]
+    field = TOKEN_HOLDER_STATS_FIELD.strip()
+    fields = "".join(
+        f"\n    t{i}: {field.replace('$token', f'$token{i}')}\n" for i in range(count)
+    )
+    return (
+        f"query ({', '.join(declarations)}) {{\n"
+        f"  EVM(dataset: archive, network: $network) {{{fields}  }}\n"
+        f"}}\n"
+    )
+
+
+def _chunks(items, size: int):
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _days_ago(days: int = 7) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
 class BitqueryAPI:
     """
     Bitquery API client for fetching token information
     """
-    
+
     def __init__(self, api_key: Optional[str] = None, oauth_token: Optional[str] = None):
         """
         Initialize Bitquery API client
-        
+
         Args:
             api_key: API key for V1 API (from X-API-KEY header)
             oauth_token: OAuth token for V2 Streaming API
         """
         self.api_key = api_key or os.getenv("BITQUERY_API_KEY")
         self.oauth_token = oauth_token or os.getenv("BITQUERY_OAUTH_TOKEN")
-        
+
         # V1 API endpoint
         self.v1_endpoint = "https://graphql.bitquery.io/"
-        
+
         # V2 Streaming API endpoint
         self.v2_endpoint = "https://streaming.bitquery.io/graphql"
-    
+
     def get_v1_headers(self) -> Dict[str, str]:
         """Get headers for V1 API"""
         return {
             "Content-Type": "application/json",
             "X-API-KEY": self.api_key
         }
-    
+
     def get_v2_headers(self) -> Dict[str, str]:
         """Get headers for V2 API"""
         return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.oauth_token}"
         }
-    
-    def get_token_holders(
-        self, 
-        token_address: str, 
-        network: str = "eth",
-        limit: int = 100,
-        date: Optional[str] = None
-    ) -> BitqueryResponse:
-        """
-        Fetch top token holders using V2 API
-        
-        Args:
-            token_address: The token contract address
-            network: Blockchain network (eth, bsc, polygon, etc.)
-            limit: Number of top holders to fetch
-            date: Date for historical data (YYYY-MM-DD format)
-        """
-        try:
-            if date is None:
-                date = datetime.now().strftime("%Y-%m-%d")
-            
-            query = """
-            query ($network: evm_network!, $token: String!, $limit: Int!, $date: String!) {
-              EVM(dataset: archive, network: $network) {
-                TokenHolders(
-                  date: $date
-                  tokenSmartContract: $token
-                  limit: {count: $limit}
-                  orderBy: {descending: Balance_Amount}
-                  where: {Balance: {Amount: {gt: "0"}}}
-                ) {
-                  Holder {
-                    Address
-                  }
-                  Balance {
-                    Amount
-                  }
-                }
-              }
+
+    # ----------------------------
+    # Payload builders
+    # ----------------------------
+    def _token_holders_payload(
+        self, token_address: str, network: str, limit: int, date: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "query": TOKEN_HOLDERS_QUERY,
+            "variables": {
+                "network": network,
+                "token": token_address,
+                "limit": limit,
+                "date": date or _today()
+            }
+        }
+
+    def _token_holder_stats_payload(
+        self, token_address: str, network: str, date: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "query": TOKEN_HOLDER_STATS_QUERY,
+            "variables": {
+                "network": network,
+                "token": token_address,
+                "date": date or _today()
             }
-            """
-            
-            variables = {
+        }
+
+    def _token_transfers_payload(
+        self, token_address: str, network: str, limit: int, since_date: Optional[str]
+    ) -> Dict[str, Any]:
+        # Last 7 days by default
+        return {
+            "query": TOKEN_TRANSFERS_QUERY,
+            "variables": {
                 "network": network,
                 "token": token_address,
                 "limit": limit,
-                "date": date
+                "since": since_date or _days_ago(7)
             }
-            
-            payload = {
-                "query": query,
-                "variables": variables
+        }
+
+    def _dex_trades_payload(
+        self, token_address: str, network: str, limit: int, since_date: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "query": DEX_TRADES_QUERY,
+            "variables": {
+                "network": network,
+                "token": token_address,
+                "limit": limit,
+                "since": since_date or _days_ago(7)
             }
-            
-            response = requests.post(
-                self.v2_endpoint,
-                headers=self.get_v2_headers(),
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return BitqueryResponse(
-                    data=data,
-                    status="success"
-                )
+        }
+
+    def _token_holders_page_payload(
+        self, token_address: str, network: str, date: str, limit: int, offset: int
+    ) -> Dict[str, Any]:
+        return {
+            "query": TOKEN_HOLDERS_PAGE_QUERY,
+            "variables": {
+                "network": network,
+                "token": token_address,
+                "date": date,
+                "limit": limit,
+                "offset": offset
+            }
+        }
+
+    def _rows_after_payload(
+        self, query: str, token_address: str, network: str, after_block: int, limit: int, since_date: str
+    ) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "variables": {
+                "network": network,
+                "token": token_address,
+                "limit": limit,
+                "since": since_date,
+                "after": str(after_block)
+            }
+        }
+
+    def _token_info_payload(
+        self,
+        token_address: str,
+        network: str,
+        sections,
+        limit: int,
+        date: Optional[str],
+        since_date: Optional[str]
+    ) -> Dict[str, Any]:
+        query = build_combined_query(sections)
+        values = {
+            "limit": limit,
+            "date": date or _today(),
+            "since": since_date or _days_ago(7)
+        }
+        variables = {"network": network, "token": token_address}
+        variables.update({name: value for name, value in values.items() if f"${name}:" in query})
+        return {"query": query, "variables": variables}
+
+    @staticmethod
+    def _split_token_info(response: BitqueryResponse, sections) -> Dict[str, BitqueryResponse]:
+        """
+        Split a combined-query response into one BitqueryResponse per section,
+        shaped like the response of the matching single-section query
+        """
+        if response.status != "success":
+            return {section: response for section in sections}
+
+        data = response.data.get("data") or {}
+        failed: Dict[str, list] = {}
+        unattributed = []
+        for error in response.data.get("errors") or []:
+            path = error.get("path") or []
+            if len(path) > 1 and path[1] in sections:
+                failed.setdefault(path[1], []).append(error.get("message", str(error)))
             else:
-                return BitqueryResponse(
+                unattributed.append(error.get("message", str(error)))
+
+        result = {}
+        for section in sections:
+            dataset, _, field, _ = TOKEN_SECTIONS[section]
+            value = (data.get(dataset) or {}).get(section)
+            messages = failed.get(section) or (unattributed if value is None else [])
+            if messages or value is None:
+                result[section] = BitqueryResponse(
                     data={},
                     status="error",
-                    error=f"HTTP {response.status_code}: {response.text}"
+                    error="; ".join(messages) or "No data returned"
                 )
-                
-        except Exception as e:
-            return BitqueryResponse(
+            else:
+                field_name = field.strip().split("(", 1)[0]
+                result[section] = BitqueryResponse(
+                    data={"data": {"EVM": {field_name: value}}},
+                    status="success"
+                )
+        return result
+
+    def _batch_rows_payload(
+        self, query: str, tokens, network: str, limit: int, since_date: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "variables": {
+                "network": network,
+                "tokens": list(tokens),
+                "limit": limit,
+                "total": limit * len(tokens),
+                "since": since_date or _days_ago(7)
+            }
+        }
+
+    def _batch_holder_stats_payload(
+        self, tokens, network: str, date: Optional[str]
+    ) -> Dict[str, Any]:
+        variables = {"network": network, "date": date or _today()}
+        variables.update({f"token{i}": token for i, token in enumerate(tokens)})
+        return {
+            "query": build_batch_holder_stats_query(len(tokens)),
+            "variables": variables
+        }
+
+    @staticmethod
+    def _batch_failure(response: BitqueryResponse, tokens) -> Optional[Dict[str, BitqueryResponse]]:
+        """Return a per-token error mapping if the whole batch request failed"""
+        if response.status != "success":
+            return {token: response for token in tokens}
+        if not response.data.get("data"):
+            messages = [e.get("message", str(e)) for e in response.data.get("errors") or []]
+            error = BitqueryResponse(
                 data={},
                 status="error",
-                error=str(e)
+                error="; ".join(messages) or "No data returned"
             )
-    
-    def get_token_holder_stats(
-        self,
-        token_address: str,
-        network: str = "eth",
-        date: Optional[str] = None
-    ) -> BitqueryResponse:
+            return {token: error for token in tokens}
+        return None
+
+    @classmethod
+    def _demux_rows(
+        cls, response: BitqueryResponse, tokens, field_name: str, contract_path
+    ) -> Dict[str, BitqueryResponse]:
         """
-        Get token holder statistics including Gini coefficient and Nakamoto coefficient
+        Split the rows of a multi-token query back into one response per token,
+        shaped like the response of the single-token query
         """
+        failure = cls._batch_failure(response, tokens)
+        if failure is not None:
+            return failure
+
+        rows_by_token: Dict[str, list] = {token.lower(): [] for token in tokens}
+        for row in (response.data["data"].get("EVM") or {}).get(field_name) or []:
+            contract = row
+            for key in contract_path:
+                contract = (contract or {}).get(key)
+            if isinstance(contract, str) and contract.lower() in rows_by_token:
+                rows_by_token[contract.lower()].append(row)
+
+        return {
+            token: BitqueryResponse(
+                data={"data": {"EVM": {field_name: rows_by_token[token.lower()]}}},
+                status="success"
+            )
+            for token in tokens
+        }
+
+    @classmethod
+    def _demux_holder_stats(cls, response: BitqueryResponse, tokens) -> Dict[str, BitqueryResponse]:
+        failure = cls._batch_failure(response, tokens)
+        if failure is not None:
+            return failure
+
+        failed: Dict[str, list] = {}
+        for error in response.data.get("errors") or []:
+            path = error.get("path") or []
+            if len(path) > 1:
+                failed.setdefault(path[1], []).append(error.get("message", str(error)))
+
+        evm = response.data["data"].get("EVM") or {}
+        result = {}
+        for i, token in enumerate(tokens):
+            alias = f"t{i}"
+            if alias in failed or evm.get(alias) is None:
+                result[token] = BitqueryResponse(
+                    data={},
+                    status="error",
+                    error="; ".join(failed.get(alias, [])) or "No data returned"
+                )
+            else:
+                result[token] = BitqueryResponse(
+                    data={"data": {"EVM": {"TokenHolders": evm[alias]}}},
+                    status="success"
+                )
+        return result
+
+    @staticmethod
+    def _parse_response(response) -> BitqueryResponse:
+        """Convert a requests/httpx response into a BitqueryResponse"""
+        if response.status_code == 200:
+            return BitqueryResponse(
+                data=response.json(),
+                status="success"
+            )
+        return BitqueryResponse(
+            data={},
+            status="error",
+            error=f"HTTP {response.status_code}: {response.text}"
+        )
+
+    def _post(self, payload: Dict[str, Any]) -> BitqueryResponse:
         try:
-            if date is None:
-                date = datetime.now().strftime("%Y-%m-%d")
-            
-            query = """
-            query ($network: evm_network!, $token: String!, $date: String!) {
-              EVM(dataset: archive, network: $network) {
-                TokenHolders(
-                  tokenSmartContract: $token
-                  date: $date
-                  where: {Balance: {Amount: {gt: "0"}}}
-                ) {
-                  gini(of: Balance_Amount)
-                  nakamoto(of: Balance_Amount, percent: 0.51)
-                  theil(of: Balance_Amount)
-                  uniq(of: Holder_Address)
-                  sum(of: Balance_Amount)
-                  average(of: Balance_Amount)
-                  median(of: Balance_Amount)
-                }
-              }
-            }
-            """
-            
-            variables = {
-                "network": network,
-                "token": token_address,
-                "date": date
-            }
-            
-            payload = {
-                "query": query,
-                "variables": variables
-            }
-            
-            response = requests.post(
+            response = upstream.bitquery.request_sync(
+                "POST",
                 self.v2_endpoint,
                 headers=self.get_v2_headers(),
                 json=payload
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return BitqueryResponse(
-                    data=data,
-                    status="success"
-                )
-            else:
-                return BitqueryResponse(
-                    data={},
-                    status="error",
-                    error=f"HTTP {response.status_code}: {response.text}"
-                )
-                
+            return self._parse_response(response)
         except Exception as e:
             return BitqueryResponse(
                 data={},
                 status="error",
                 error=str(e)
             )
-    
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def get_token_holders(
+        self,
+        token_address: str,
+        network: str = "eth",
+        limit: int = 100,
+        date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """
+        Fetch top token holders using V2 API
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, etc.)
+            limit: Number of top holders to fetch
+            date: Date for historical data (YYYY-MM-DD format)
+        """
+        return self._post(self._token_holders_payload(token_address, network, limit, date))
+
+    def get_token_holder_stats(
+        self,
+        token_address: str,
+        network: str = "eth",
+        date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """
+        Get token holder statistics including Gini coefficient and Nakamoto coefficient
+        """
+        return self._post(self._token_holder_stats_payload(token_address, network, date))
+
     def get_token_transfers(
         self,
         token_address: str,
@@ -206,83 +773,8 @@ class BitqueryAPI:
         """
         Get recent token transfers
         """
-        try:
-            if since_date is None:
-                # Last 7 days by default
-                from datetime import timedelta
-                since = datetime.now() - timedelta(days=7)
-                since_date = since.strftime("%Y-%m-%d")
-            
-            query = """
-            query ($network: evm_network!, $token: String!, $limit: Int!, $since: String!) {
-              EVM(dataset: combined, network: $network) {
-                Transfers(
-                  limit: {count: $limit}
-                  orderBy: {descending: Block_Time}
-                  where: {
-                    Transfer: {Currency: {SmartContract: {is: $token}}}
-                    Block: {Date: {since: $since}}
-                  }
-                ) {
-                  Transfer {
-                    Amount
-                    Sender
-                    Receiver
-                    Currency {
-                      Name
-                      Symbol
-                    }
-                  }
-                  Block {
-                    Time
-                    Number
-                  }
-                  Transaction {
-                    Hash
-                  }
-                }
-              }
-            }
-            """
-            
-            variables = {
-                "network": network,
-                "token": token_address,
-                "limit": limit,
-                "since": since_date
-            }
-            
-            payload = {
-                "query": query,
-                "variables": variables
-            }
-            
-            response = requests.post(
-                self.v2_endpoint,
-                headers=self.get_v2_headers(),
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return BitqueryResponse(
-                    data=data,
-                    status="success"
-                )
-            else:
-                return BitqueryResponse(
-                    data={},
-                    status="error",
-                    error=f"HTTP {response.status_code}: {response.text}"
-                )
-                
-        except Exception as e:
-            return BitqueryResponse(
-                data={},
-                status="error",
-                error=str(e)
-            )
-    
+        return self._post(self._token_transfers_payload(token_address, network, limit, since_date))
+
     def get_dex_trades(
         self,
         token_address: str,
@@ -293,92 +785,186 @@ class BitqueryAPI:
         """
         Get DEX trades for a token
         """
+        return self._post(self._dex_trades_payload(token_address, network, limit, since_date))
+
+    def get_token_holders_page(
+        self,
+        token_address: str,
+        network: str = "eth",
+        date: Optional[str] = None,
+        limit: int = 10000,
+        offset: int = 0
+    ) -> BitqueryResponse:
+        """
+        Fetch one page of all holders on a date, ordered by address
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, etc.)
+            date: Date of the balances (YYYY-MM-DD), today by default
+            limit: Holders per page
+            offset: Holders to skip
+        """
+        return self._post(self._token_holders_page_payload(token_address, network, date or _today(), limit, offset))
+
+    def get_token_transfers_after(
+        self,
+        token_address: str,
+        network: str = "eth",
+        after_block: int = 0,
+        limit: int = 1000,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """
+        Get transfers in blocks after `after_block`, oldest first
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, etc.)
+            after_block: Only rows from later blocks are returned
+            limit: Maximum rows in the page
+            since_date: Lower bound on the block date (YYYY-MM-DD), which lets
+                Bitquery skip older partitions; 7 days ago by default
+        """
+        return self._post(self._rows_after_payload(
+            TOKEN_TRANSFERS_AFTER_QUERY, token_address, network, after_block, limit, since_date or _days_ago(7)
+        ))
+
+    def get_dex_trades_after(
+        self,
+        token_address: str,
+        network: str = "eth",
+        after_block: int = 0,
+        limit: int = 1000,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """
+        Get DEX trades in blocks after `after_block`, oldest first (see get_token_transfers_after)
+        """
+        return self._post(self._rows_after_payload(
+            DEX_TRADES_AFTER_QUERY, token_address, network, after_block, limit, since_date or _days_ago(7)
+        ))
+
+    def get_token_info(
+        self,
+        token_address: str,
+        network: str = "eth",
+        sections=None,
+        limit: int = 100,
+        date: Optional[str] = None,
+        since_date: Optional[str] = None
+    ) -> Dict[str, BitqueryResponse]:
+        """
+        Fetch several token sections with a single GraphQL request
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, etc.)
+            sections: Keys of TOKEN_SECTIONS to fetch (all by default)
+            limit: Row limit for the holders, transfers and trades sections
+            date: Date for holder data (YYYY-MM-DD format)
+            since_date: Start date for transfers and trades (YYYY-MM-DD format)
+
+        Returns:
+            Mapping of section key to the same BitqueryResponse the matching
+            single-section method would return
+        """
+        sections = list(sections or TOKEN_SECTIONS)
+        payload = self._token_info_payload(token_address, network, sections, limit, date, since_date)
+        return self._split_token_info(self._post(payload), sections)
+
+    def get_token_holder_stats_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """
+        Get holder statistics for many tokens, one request per chunk
+
+        Args:
+            token_addresses: Token contract addresses
+            network: Blockchain network (eth, bsc, polygon, etc.)
+            date: Date for holder data (YYYY-MM-DD format)
+            chunk_size: Maximum number of tokens per request
+
+        Returns:
+            Mapping of token address to its BitqueryResponse
+        """
+        result = {}
+        for chunk in _chunks(list(token_addresses), chunk_size):
+            response = self._post(self._batch_holder_stats_payload(chunk, network, date))
+            result.update(self._demux_holder_stats(response, chunk))
+        return result
+
+    def get_token_transfers_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """
+        Get recent transfers for many tokens, up to `limit` rows per token
+        """
+        result = {}
+        for chunk in _chunks(list(token_addresses), chunk_size):
+            payload = self._batch_rows_payload(BATCH_TOKEN_TRANSFERS_QUERY, chunk, network, limit, since_date)
+            result.update(self._demux_rows(
+                self._post(payload), chunk, "Transfers", ("Transfer", "Currency", "SmartContract")
+            ))
+        return result
+
+    def get_dex_trades_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """
+        Get DEX trades for many tokens, up to `limit` rows per token
+        """
+        result = {}
+        for chunk in _chunks(list(token_addresses), chunk_size):
+            payload = self._batch_rows_payload(BATCH_DEX_TRADES_QUERY, chunk, network, limit, since_date)
+            result.update(self._demux_rows(
+                self._post(payload), chunk, "DEXTrades", ("Trade", "Buy", "Currency", "SmartContract")
+            ))
+        return result
+
+
+class AsyncBitqueryAPI(BitqueryAPI):
+    """
+    Async Bitquery API client
+
+    Requests go through a pooled keep-alive httpx client (the shared one from
+    services.http_client unless another is passed), so concurrent queries reuse
+    connections instead of opening a new TCP/TLS session each.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        oauth_token: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        super().__init__(api_key=api_key, oauth_token=oauth_token)
+        self.client = client or get_async_client()
+
+    async def _post(self, payload: Dict[str, Any]) -> BitqueryResponse:
         try:
-            if since_date is None:
-                from datetime import timedelta
-                since = datetime.now() - timedelta(days=7)
-                since_date = since.strftime("%Y-%m-%d")
-            
-            query = """
-            query ($network: evm_network!, $token: String!, $limit: Int!, $since: String!) {
-              EVM(dataset: combined, network: $network) {
-                DEXTrades(
-                  limit: {count: $limit}
-                  orderBy: {descending: Block_Time}
-                  where: {
-                    Trade: {
-                      Buy: {Currency: {SmartContract: {is: $token}}}
-                    }
-                    Block: {Date: {since: $since}}
-                  }
-                ) {
-                  Block {
-                    Time
-                    Number
-                  }
-                  Transaction {
-                    Hash
-                  }
-                  Trade {
-                    Buy {
-                      Amount
-                      Buyer
-                      Currency {
-                        Name
-                        Symbol
-                      }
-                      Price
-                    }
-                    Sell {
-                      Amount
-                      Seller
-                      Currency {
-                        Name
-                        Symbol
-                      }
-                      Price
-                    }
-                    Dex {
-                      ProtocolName
-                      ProtocolFamily
-                    }
-                  }
-                }
-              }
-            }
-            """
-            
-            variables = {
-                "network": network,
-                "token": token_address,
-                "limit": limit,
-                "since": since_date
-            }
-            
-            payload = {
-                "query": query,
-                "variables": variables
-            }
-            
-            response = requests.post(
+            response = await upstream.bitquery.request(
+                self.client,
+                "POST",
                 self.v2_endpoint,
                 headers=self.get_v2_headers(),
                 json=payload
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return BitqueryResponse(
-                    data=data,
-                    status="success"
-                )
-            else:
-                return BitqueryResponse(
-                    data={},
-                    status="error",
-                    error=f"HTTP {response.status_code}: {response.text}"
-                )
-                
+            return self._parse_response(response)
         except Exception as e:
             return BitqueryResponse(
                 data={},
@@ -386,61 +972,240 @@ class BitqueryAPI:
                 error=str(e)
             )
 
+    async def get_token_holders(
+        self,
+        token_address: str,
+        network: str = "eth",
+        limit: int = 100,
+        date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_token_holders"""
+        return await self._post(self._token_holders_payload(token_address, network, limit, date))
+
+    async def get_token_holder_stats(
+        self,
+        token_address: str,
+        network: str = "eth",
+        date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_token_holder_stats"""
+        return await self._post(self._token_holder_stats_payload(token_address, network, date))
+
+    async def get_token_transfers(
+        self,
+        token_address: str,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_token_transfers"""
+        return await self._post(self._token_transfers_payload(token_address, network, limit, since_date))
+
+    async def get_dex_trades(
+        self,
+        token_address: str,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_dex_trades"""
+        return await self._post(self._dex_trades_payload(token_address, network, limit, since_date))
+
+    async def get_token_holders_page(
+        self,
+        token_address: str,
+        network: str = "eth",
+        date: Optional[str] = None,
+        limit: int = 10000,
+        offset: int = 0
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_token_holders_page"""
+        return await self._post(
+            self._token_holders_page_payload(token_address, network, date or _today(), limit, offset)
+        )
+
+    async def get_token_transfers_after(
+        self,
+        token_address: str,
+        network: str = "eth",
+        after_block: int = 0,
+        limit: int = 1000,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_token_transfers_after"""
+        return await self._post(self._rows_after_payload(
+            TOKEN_TRANSFERS_AFTER_QUERY, token_address, network, after_block, limit, since_date or _days_ago(7)
+        ))
+
+    async def get_dex_trades_after(
+        self,
+        token_address: str,
+        network: str = "eth",
+        after_block: int = 0,
+        limit: int = 1000,
+        since_date: Optional[str] = None
+    ) -> BitqueryResponse:
+        """Async variant of BitqueryAPI.get_dex_trades_after"""
+        return await self._post(self._rows_after_payload(
+            DEX_TRADES_AFTER_QUERY, token_address, network, after_block, limit, since_date or _days_ago(7)
+        ))
+
+    async def get_token_info(
+        self,
+        token_address: str,
+        network: str = "eth",
+        sections=None,
+        limit: int = 100,
+        date: Optional[str] = None,
+        since_date: Optional[str] = None
+    ) -> Dict[str, BitqueryResponse]:
+        """Async variant of BitqueryAPI.get_token_info"""
+        sections = list(sections or TOKEN_SECTIONS)
+        payload = self._token_info_payload(token_address, network, sections, limit, date, since_date)
+        return self._split_token_info(await self._post(payload), sections)
+
+    async def get_token_holder_stats_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """Async variant of BitqueryAPI.get_token_holder_stats_batch; chunks run concurrently"""
+        chunks = _chunks(list(token_addresses), chunk_size)
+        responses = await asyncio.gather(*[
+            self._post(self._batch_holder_stats_payload(chunk, network, date)) for chunk in chunks
+        ])
+        result = {}
+        for chunk, response in zip(chunks, responses):
+            result.update(self._demux_holder_stats(response, chunk))
+        return result
+
+    async def get_token_transfers_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """Async variant of BitqueryAPI.get_token_transfers_batch; chunks run concurrently"""
+        chunks = _chunks(list(token_addresses), chunk_size)
+        responses = await asyncio.gather(*[
+            self._post(self._batch_rows_payload(BATCH_TOKEN_TRANSFERS_QUERY, chunk, network, limit, since_date))
+            for chunk in chunks
+        ])
+        result = {}
+        for chunk, response in zip(chunks, responses):
+            result.update(self._demux_rows(response, chunk, "Transfers", ("Transfer", "Currency", "SmartContract")))
+        return result
+
+    async def get_dex_trades_batch(
+        self,
+        token_addresses,
+        network: str = "eth",
+        limit: int = 100,
+        since_date: Optional[str] = None,
+        chunk_size: int = BITQUERY_BATCH_SIZE
+    ) -> Dict[str, BitqueryResponse]:
+        """Async variant of BitqueryAPI.get_dex_trades_batch; chunks run concurrently"""
+        chunks = _chunks(list(token_addresses), chunk_size)
+        responses = await asyncio.gather(*[
+            self._post(self._batch_rows_payload(BATCH_DEX_TRADES_QUERY, chunk, network, limit, since_date))
+            for chunk in chunks
+        ])
+        result = {}
+        for chunk, response in zip(chunks, responses):
+            result.update(self._demux_rows(response, chunk, "DEXTrades", ("Trade", "Buy", "Currency", "SmartContract")))
+        return result
+
 
 async def get_bitquery_info(
-    token_address: str, 
+    token_address: str,
     network: str = "eth",
     api_key: Optional[str] = None,
-    oauth_token: Optional[str] = None
+    oauth_token: Optional[str] = None,
+    combined: bool = False,
+    sections=None,
+    refresh: bool = False
 ) -> Dict[str, Any]:
     """
     Fetch comprehensive token information from Bitquery
-    
+
+    By default the sections are requested concurrently, so latency is that of
+    the slowest query rather than the sum of all of them. With combined=True
+    they are sent as one GraphQL document instead, which costs one request
+    and one round of API credits. Complete results are cached for
+    BITQUERY_CACHE_TTL seconds.
+
     Args:
         token_address: The token address to look up
         network: Blockchain network (eth, bsc, polygon, base, etc.)
         api_key: Bitquery API key (optional, will use env var)
         oauth_token: Bitquery OAuth token (optional, will use env var)
-        
+        combined: Fetch all sections with a single batched query
+        sections: Keys of TOKEN_SECTIONS to fetch (all by default)
+        refresh: Skip the cached result and replace it
+
     Returns:
         Dictionary containing all token data
     """
+    sections = [section for section in TOKEN_SECTIONS if section in (sections or TOKEN_SECTIONS)]
+    return await token_info_cache.get_or_fetch(
+        (network, token_address.lower(), tuple(sections)),
+        lambda: _fetch_bitquery_info(token_address, network, api_key, oauth_token, combined, sections),
+        should_cache=lambda result: not result.get("errors") and "error" not in result,
+        refresh=refresh
+    )
+
+
+async def _fetch_bitquery_info(
+    token_address: str,
+    network: str,
+    api_key: Optional[str],
+    oauth_token: Optional[str],
+    combined: bool,
+    sections
+) -> Dict[str, Any]:
     try:
-        client = BitqueryAPI(api_key=api_key, oauth_token=oauth_token)
-        
+        client = AsyncBitqueryAPI(api_key=api_key, oauth_token=oauth_token)
+
         # Fetch all data
-        holders_response = client.get_token_holders(token_address, network)
-        stats_response = client.get_token_holder_stats(token_address, network)
-        transfers_response = client.get_token_transfers(token_address, network)
-        trades_response = client.get_dex_trades(token_address, network)
-        
+        if combined:
+            responses = await client.get_token_info(token_address, network, sections)
+        else:
+            fetchers = {
+                "top_holders": client.get_token_holders,
+                "holder_statistics": client.get_token_holder_stats,
+                "recent_transfers": client.get_token_transfers,
+                "dex_trades": client.get_dex_trades,
+            }
+            results = await asyncio.gather(
+                *[fetchers[section](token_address, network) for section in sections]
+            )
+            responses = dict(zip(sections, results))
+
         # Combine all responses
         result = {
             "token_address": token_address,
-            "network": network,
-            "top_holders": holders_response.data if holders_response.status == "success" else None,
-            "holder_statistics": stats_response.data if stats_response.status == "success" else None,
-            "recent_transfers": transfers_response.data if transfers_response.status == "success" else None,
-            "dex_trades": trades_response.data if trades_response.status == "success" else None,
-            "errors": []
+            "network": network
         }
-        
+        for section, response in responses.items():
+            result[section] = response.data if response.status == "success" else None
+
         # Collect any errors
-        if holders_response.status == "error":
-            result["errors"].append(f"Holders: {holders_response.error}")
-        if stats_response.status == "error":
-            result["errors"].append(f"Stats: {stats_response.error}")
-        if transfers_response.status == "error":
-            result["errors"].append(f"Transfers: {transfers_response.error}")
-        if trades_response.status == "error":
-            result["errors"].append(f"Trades: {trades_response.error}")
-        
+        result["errors"] = [
+            f"{TOKEN_SECTIONS[section][3]}: {response.error}"
+            for section, response in responses.items()
+            if response.status == "error"
+        ]
+
         return result
-        
+
     except Exception as e:
         return {
             "token_address": token_address,
             "network": network,
             "error": str(e),
             "status": "failed"
-        }
\ No newline at end of file
+        }
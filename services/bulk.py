@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.moralis import fetch_token_price_async
+from services.agents import bulk_crew, run_crew_analysis
+from services.prescreen import prescreen, PRESCREEN_ENABLED
+from services.report import REPORT_NETWORK
+from services.wallets import wallet_index
+
+load_dotenv()
+
+# Moralis fetches in flight at once for one bulk request
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "16"))
+# Tokens scored per LLM prompt
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "25"))
+BULK_MAX_TOKENS = int(os.getenv("BULK_MAX_TOKENS", "500"))
+
+
+def summarize_pair_stats(pair_address: str, data: Dict[str, Any], smart_money: Optional[float] = None) -> Dict[str, Any]:
+    """
+    The Moralis fields the screener prompt needs, to keep batches small, plus
+    the token's smart-money score if it is in the wallet index
+    """
+    def window(field: str) -> Optional[Any]:
+        return (data.get(field) or {}).get("24h")
+
+    summary = {
+        "pairAddress": pair_address,
+        "symbol": data.get("tokenSymbol"),
+        "priceUsd": data.get("currentUsdPrice"),
+        "liquidityUsd": data.get("totalLiquidityUsd"),
+        "priceChange": data.get("pricePercentChange"),
+        "volume24h": window("totalVolume"),
+        "buyVolume24h": window("buyVolume"),
+        "sellVolume24h": window("sellVolume"),
+        "buyers24h": window("buyers"),
+        "sellers24h": window("sellers"),
+    }
+    if smart_money is not None:
+        summary["smartMoneyScore"] = smart_money
+    return summary
+
+
+def parse_scores(output: Any) -> Dict[str, Dict[str, Any]]:
+    """Map pairAddress (lower-cased) to its entry in the screener's JSON answer"""
+    text = output if isinstance(output, str) else json.dumps(output, default=str)
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        entries = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return {
+        str(entry["pairAddress"]).lower(): entry
+        for entry in entries
+        if isinstance(entry, dict) and entry.get("pairAddress")
+    }
+
+
+def _event(pair_address: str, data: Any = None, error: Optional[str] = None) -> Dict[str, Any]:
+    return {"section": "token", "pair_address": pair_address, "data": data, "error": error}
+
+
+async def analyze_tokens(
+    pair_addresses: List[str],
+    batch_size: int = BULK_BATCH_SIZE,
+    max_concurrency: int = BULK_MAX_CONCURRENCY,
+    bypass_cache: bool = False,
+    use_prescreen: bool = PRESCREEN_ENABLED
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch Moralis stats for many pairs and score them with one LLM prompt per
+    batch of tokens
+
+    Fetched pairs first go through the numeric pre-screen in groups, with
+    their smart-money scores from the wallet index as it stands; pairs
+    that fail it are reported right away without an LLM call. A batch of
+    passing pairs is sent to the screener as soon as it fills, so results
+    stream back while the remaining pairs are still being fetched.
+
+    Args:
+        pair_addresses: Pair addresses to analyze (duplicates are dropped)
+        batch_size: Tokens scored per prompt
+        max_concurrency: Moralis fetches in flight at once
+        bypass_cache: Re-run the screener even if a cached answer matches the batch
+        use_prescreen: Skip the LLM for pairs that fail the numeric pre-screen
+
+    Yields:
+        One {"section": "token", "pair_address", "data", "error"} event per
+        pair, then {"section": "done", "data": counts}
+    """
+    pairs = list(dict.fromkeys(pair_addresses))
+    queue: asyncio.Queue = asyncio.Queue()
+    limit = asyncio.Semaphore(max_concurrency)
+    counts = {"tokens": len(pairs), "scored": 0, "screened_out": 0, "failed": 0, "batches": 0}
+
+    async def fetch(pair: str) -> Tuple[str, Dict[str, Any]]:
+        async with limit:
+            try:
+                return pair, await fetch_token_price_async(pair)
+            except Exception as e:
+                return pair, {"error": str(e)}
+
+    async def score(batch: List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]], Optional[float]]]) -> None:
+        counts["batches"] += 1
+        summaries = [summarize_pair_stats(pair, data, smart) for pair, data, _, smart in batch]
+        try:
+            output = await run_crew_analysis(bulk_crew, {"data": summaries}, bypass_cache=bypass_cache)
+            scores = parse_scores(output)
+            error = None if scores else "Screener returned no parsable scores"
+        except Exception as e:
+            scores, error = {}, f"Error scoring batch: {str(e)}"
+        for (pair, _, screen, _), summary in zip(batch, summaries):
+            entry = scores.get(pair.lower())
+            if entry is None:
+                counts["failed"] += 1
+                queue.put_nowait(_event(
+                    pair, {"token_data": summary, "prescreen": screen}, error or "Token missing from screener output"
+                ))
+            else:
+                counts["scored"] += 1
+                queue.put_nowait(_event(pair, {"token_data": summary, "prescreen": screen, "analysis": entry}))
+
+    async def produce() -> None:
+        scorers = []
+        batch = []
+
+        async def admit(arrived: List[Tuple[str, Dict[str, Any]]]) -> None:
+            nonlocal batch
+            smart_money = await asyncio.to_thread(
+                wallet_index.scores, [data.get("tokenAddress") for _, data in arrived], REPORT_NETWORK
+            )
+            screens = (
+                prescreen([data for _, data in arrived], smart_money=smart_money)
+                if use_prescreen else [None] * len(arrived)
+            )
+            for (pair, data), screen, smart in zip(arrived, screens, smart_money):
+                if screen is not None and not screen["passed"]:
+                    counts["screened_out"] += 1
+                    queue.put_nowait(_event(
+                        pair, {"token_data": summarize_pair_stats(pair, data, smart), "prescreen": screen, "analysis": None}
+                    ))
+                    continue
+                batch.append((pair, data, screen, smart))
+                if len(batch) >= batch_size:
+                    scorers.append(asyncio.create_task(score(batch)))
+                    batch = []
+
+        try:
+            arrived = []
+            for next_fetch in asyncio.as_completed([fetch(pair) for pair in pairs]):
+                pair, data = await next_fetch
+                if "error" in data:
+                    counts["failed"] += 1
+                    queue.put_nowait(_event(pair, error=f"Error fetching token data: {data['error']}"))
+                    continue
+                arrived.append((pair, data))
+                if len(arrived) >= batch_size:
+                    await admit(arrived)
+                    arrived = []
+            await admit(arrived)
+            if batch:
+                scorers.append(asyncio.create_task(score(batch)))
+            await asyncio.gather(*scorers)
+        finally:
+            for scorer in scorers:
+                scorer.cancel()
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(produce())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        await task
+        yield {"section": "done", "pair_address": None, "data": counts, "error": None}
+    finally:
+        task.cancel()
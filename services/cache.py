@@ -0,0 +1,438 @@
+import abc
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+load_dotenv()
+
+# memory: per-process dict; sqlite: file shared by all workers on the host;
+# redis: any Redis-protocol server shared across hosts
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(".cache", "hypescan.sqlite3"))
+CACHE_SQLITE_MMAP_SIZE = int(os.getenv("CACHE_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+_MISSING = object()
+
+# Every cache registers itself here so its counters can be reported
+_registry: List["ResponseCache"] = []
+
+
+# ----------------------------
+# Serialization
+# ----------------------------
+def serialize(value: Any) -> bytes:
+    """Encode a JSON-compatible value compactly (orjson, then msgpack, then json)"""
+    if orjson is not None:
+        return b"j" + orjson.dumps(value)
+    if msgpack is not None:
+        return b"m" + msgpack.packb(value, use_bin_type=True)
+    return b"j" + json.dumps(value, separators=(",", ":")).encode()
+
+
+def deserialize(data: bytes) -> Any:
+    tag, body = data[:1], data[1:]
+    if tag == b"m":
+        return msgpack.unpackb(body, raw=False)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def encode_key(key: Hashable) -> str:
+    """Stable string form of a cache key, shared by all processes"""
+    if isinstance(key, str):
+        return key
+    return json.dumps(key, separators=(",", ":"), default=str)
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class CacheBackend(abc.ABC):
+    """
+    Storage for one cache namespace
+
+    Backends that talk to another process or to disk set `blocking = True`
+    so async callers move their calls off the event loop.
+    """
+
+    blocking = False
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the stored value, or _MISSING if absent or expired"""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU dict
+
+    Values are stored serialized like in the shared backends, so every get
+    returns a fresh object and a caller mutating its result cannot change
+    the cached entry.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return deserialize(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, serialize(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "evictions": self.evictions}
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache namespace stored in a SQLite file
+
+    The database runs in WAL mode with memory-mapped reads, so every worker on
+    the host shares entries and they survive restarts. Entries are evicted
+    least-recently-used on every write that takes the namespace past maxsize
+    rows. Calls wait on disk and on other processes' write locks, so async
+    callers run them in a thread.
+    """
+
+    blocking = True
+
+    def __init__(self, namespace: str, path: str = CACHE_SQLITE_PATH, maxsize: int = 1024):
+        self.namespace = namespace
+        self.path = path
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={CACHE_SQLITE_MMAP_SIZE}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)"
+        )
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                return _MISSING
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+        return deserialize(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        data = serialize(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, data, now + ttl, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, now)
+        )
+        (size,) = self._conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        excess = size - self.maxsize
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                (self.namespace, self.namespace, excess),
+            )
+            self.evictions += excess
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (size,) = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return {"size": size, "maxsize": self.maxsize, "evictions": self.evictions, "path": self.path}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache namespace stored on a Redis-protocol server (Redis, Valkey, KeyDB...)
+
+    Expiry uses the server's key TTLs; size limits and eviction are left to
+    the server's maxmemory policy.
+    """
+
+    blocking = True
+
+    def __init__(self, namespace: str, url: str = CACHE_REDIS_URL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self.namespace = namespace
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"hypescan:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        data = self._client.get(self._key(key))
+        return _MISSING if data is None else deserialize(data)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(self._key(key), serialize(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._key(key))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._key("*")):
+            self._client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url}
+
+
+def create_backend(namespace: str, maxsize: int, backend: Optional[str] = None) -> CacheBackend:
+    """Build the backend selected by CACHE_BACKEND (or the explicit name) for a namespace"""
+    backend = backend or CACHE_BACKEND
+    if backend == "memory":
+        return MemoryBackend(maxsize=maxsize)
+    if backend == "sqlite":
+        return SQLiteBackend(namespace, path=CACHE_SQLITE_PATH, maxsize=maxsize)
+    if backend == "redis":
+        return RedisBackend(namespace, url=CACHE_REDIS_URL)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+# ----------------------------
+# Cache front-end
+# ----------------------------
+class ResponseCache:
+    """
+    Bounded cache with per-entry TTL in front of a pluggable backend
+
+    Concurrent get_or_fetch calls for the same key share one upstream call
+    (single-flight), so a burst of requests for a cold key costs one fetch.
+    The fetch runs as its own task, so cancelling any caller (a step timeout
+    or a client disconnect) leaves it running for the others. Cached values
+    must be JSON-compatible.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 1024,
+        backend: Optional[CacheBackend] = None
+    ):
+        """
+        Args:
+            name: Namespace of the cache, also reported in statistics
+            ttl: Seconds an entry stays fresh (0 disables caching)
+            maxsize: Maximum number of entries before the least recently used is evicted
+            backend: Storage backend (defaults to the one selected by CACHE_BACKEND)
+        """
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.backend = backend or create_backend(name, maxsize)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or default"""
+        value = self.backend.get(encode_key(key))
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self.backend.set(encode_key(key), value, self.ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.backend.delete(encode_key(key))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    async def _get_async(self, key: Hashable) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, key, _MISSING)
+        return self.get(key, _MISSING)
+
+    async def _set_async(self, key: Hashable, value: Any) -> None:
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True,
+        refresh: bool = False
+    ) -> Any:
+        """
+        Return the cached value for key, calling fetch on a miss
+
+        Args:
+            key: Cache key
+            fetch: Coroutine factory producing the value
+            should_cache: Predicate deciding whether a fetched value is stored
+                (e.g. to skip error payloads)
+            refresh: Ignore any cached value and fetch (the result still
+                replaces the cached entry)
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        if not refresh:
+            try:
+                value = await self._get_async(key)
+            except Exception:
+                # A broken shared backend should degrade to uncached calls
+                value = _MISSING
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            inflight = self._inflight[key] = asyncio.create_task(self._fetch(key, fetch, should_cache))
+            # Retrieve the exception even if every caller was cancelled
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        # Each caller gets its own copy of the shared result
+        return copy.deepcopy(await asyncio.shield(inflight))
+
+    async def _fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]], should_cache: Callable[[Any], bool]
+    ) -> Any:
+        try:
+            value = await fetch()
+            if should_cache(value):
+                try:
+                    await self._set_async(key, value)
+                except Exception:
+                    pass
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        try:
+            backend_stats = self.backend.stats()
+        except Exception as e:
+            backend_stats = {"error": str(e)}
+        return {
+            "name": self.name,
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            **backend_stats,
+        }
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Statistics for every cache created in this process"""
+    return [cache.stats() for cache in _registry]
@@ -0,0 +1,273 @@
+import math
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from services.addresses import AddressTable
+
+TX_HASH_BYTES = 32
+# Balances are stored as int64 counts of 10**-scale tokens, with the scale
+# chosen per snapshot so the largest balance keeps 18 significant digits
+BALANCE_DIGITS = 18
+
+
+def _number(value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+def _timestamp(value: Any) -> int:
+    if not value:
+        return 0
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+
+def _tx_hash(value: Any) -> bytes:
+    try:
+        raw = bytes.fromhex(value[2:])
+    except (TypeError, ValueError):
+        return bytes(TX_HASH_BYTES)
+    return raw if len(raw) == TX_HASH_BYTES else bytes(TX_HASH_BYTES)
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        number = Decimal(str(value))
+    except (ArithmeticError, TypeError, ValueError):
+        return Decimal(0)
+    return number if number.is_finite() else Decimal(0)
+
+
+def fixed_point(amounts: Iterable[Any]) -> Tuple[np.ndarray, int]:
+    """
+    Decimal amounts as int64 fixed-point values
+
+    The scale is chosen so the largest amount keeps BALANCE_DIGITS significant
+    digits, going negative for amounts of 10**18 and more. Amounts are rounded
+    to it, a non-zero amount never rounds to zero (so dust still counts as a
+    holding), and amounts that do not parse are zero.
+
+    Returns:
+        The values and their scale (value = round(amount * 10**scale))
+    """
+    decimals = [_decimal(amount) for amount in amounts]
+    largest = max((abs(number) for number in decimals), default=Decimal(0))
+    digits = largest.adjusted() + 1 if largest >= 1 else 0
+    scale = BALANCE_DIGITS - digits
+    with localcontext() as context:
+        # Enough precision that scaleb is exact for any amount we round
+        context.prec = 2 * BALANCE_DIGITS + 2
+        context.rounding = ROUND_HALF_EVEN
+        values = np.array(
+            [int(number.scaleb(scale).to_integral_value()) for number in decimals], dtype=np.int64
+        )
+    signs = np.array([number.compare(0) for number in decimals], dtype=np.int64)
+    dust = (values == 0) & (signs != 0)
+    values[dust] = signs[dust]
+    return values, scale
+
+
+def _to_numpy(column, arrow_type: pa.DataType) -> np.ndarray:
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pa.types.is_fixed_size_binary(arrow_type):
+        width = arrow_type.byte_width
+        raw = np.frombuffer(array.buffers()[1], dtype=np.uint8)
+        return raw[array.offset * width:(array.offset + len(array)) * width].reshape(-1, width)
+    if pa.types.is_timestamp(arrow_type):
+        array = array.cast(pa.int64())
+    if array.null_count:
+        array = pc.fill_null(array, math.nan if pa.types.is_floating(arrow_type) else 0)
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _to_arrow(values: np.ndarray, arrow_type: pa.DataType) -> pa.Array:
+    if pa.types.is_fixed_size_binary(arrow_type):
+        buffer = pa.py_buffer(np.ascontiguousarray(values).tobytes())
+        return pa.Array.from_buffers(arrow_type, len(values), [None, buffer])
+    return pa.array(values, type=arrow_type)
+
+
+class Columns:
+    """
+    Rows held as one NumPy array per field (struct of arrays)
+
+    Subclasses list their fields in FIELDS as attribute -> (stored column
+    name, Arrow type). Addresses are uint32 ids from an AddressTable, block
+    times Unix seconds and transaction hashes (n, 32) uint8 arrays, so a row
+    costs a few dozen bytes instead of a nested dict of strings.
+    """
+
+    __slots__ = ()
+    FIELDS: Dict[str, Tuple[str, pa.DataType]] = {}
+
+    def __init__(self, **arrays: np.ndarray):
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self) -> int:
+        return len(getattr(self, next(iter(self.FIELDS))))
+
+    @classmethod
+    def schema_fields(cls) -> List[pa.Field]:
+        return [pa.field(column, arrow_type) for column, arrow_type in cls.FIELDS.values()]
+
+    @classmethod
+    def columns(cls) -> List[str]:
+        return [column for column, _ in cls.FIELDS.values()]
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table):
+        """View a stored table's columns as arrays (zero-copy where Arrow allows)"""
+        return cls(**{
+            name: _to_numpy(table.column(column), arrow_type)
+            for name, (column, arrow_type) in cls.FIELDS.items()
+        })
+
+    @classmethod
+    def empty(cls):
+        return cls.from_arrow(pa.schema(cls.schema_fields()).empty_table())
+
+    @classmethod
+    def concat(cls, parts: Sequence["Columns"]):
+        return cls(**{name: np.concatenate([getattr(part, name) for part in parts]) for name in cls.FIELDS})
+
+    def arrow_columns(self) -> Dict[str, pa.Array]:
+        return {
+            column: _to_arrow(getattr(self, name), arrow_type)
+            for name, (column, arrow_type) in self.FIELDS.items()
+        }
+
+    def take(self, indices):
+        return type(self)(**{name: getattr(self, name)[indices] for name in self.FIELDS})
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+
+class TradeColumns(Columns):
+    """DEX trades (Bitquery DEXTrades rows)"""
+
+    __slots__ = (
+        "block_number", "time", "tx_hash", "buyer", "seller", "buy_currency", "sell_currency",
+        "buy_amount", "buy_amount_usd", "sell_amount", "sell_amount_usd", "price", "price_usd",
+    )
+    FIELDS = {
+        "block_number": ("block_number", pa.int64()),
+        "time": ("block_time", pa.timestamp("s", tz="UTC")),
+        "tx_hash": ("tx_hash", pa.binary(TX_HASH_BYTES)),
+        "buyer": ("buyer_id", pa.uint32()),
+        "seller": ("seller_id", pa.uint32()),
+        "buy_currency": ("buy_currency_id", pa.uint32()),
+        "sell_currency": ("sell_currency_id", pa.uint32()),
+        "buy_amount": ("buy_amount", pa.float64()),
+        "buy_amount_usd": ("buy_amount_usd", pa.float64()),
+        "sell_amount": ("sell_amount", pa.float64()),
+        "sell_amount_usd": ("sell_amount_usd", pa.float64()),
+        "price": ("price", pa.float64()),
+        "price_usd": ("price_usd", pa.float64()),
+    }
+
+    @classmethod
+    def from_bitquery(cls, rows: Sequence[Dict[str, Any]], addresses: AddressTable) -> "TradeColumns":
+        fields: Dict[str, list] = {name: [] for name in cls.FIELDS}
+        for row in rows:
+            block, trade = row.get("Block") or {}, row.get("Trade") or {}
+            buy, sell = trade.get("Buy") or {}, trade.get("Sell") or {}
+            fields["block_number"].append(int(block.get("Number") or 0))
+            fields["time"].append(_timestamp(block.get("Time")))
+            fields["tx_hash"].append(_tx_hash((row.get("Transaction") or {}).get("Hash")))
+            fields["buyer"].append(buy.get("Buyer"))
+            fields["seller"].append(sell.get("Seller"))
+            fields["buy_currency"].append((buy.get("Currency") or {}).get("SmartContract"))
+            fields["sell_currency"].append((sell.get("Currency") or {}).get("SmartContract"))
+            fields["buy_amount"].append(_number(buy.get("Amount")))
+            fields["buy_amount_usd"].append(_number(buy.get("AmountInUSD")))
+            fields["sell_amount"].append(_number(sell.get("Amount")))
+            fields["sell_amount_usd"].append(_number(sell.get("AmountInUSD")))
+            fields["price"].append(_number(buy.get("Price")))
+            fields["price_usd"].append(_number(buy.get("PriceInUSD")))
+        return cls(
+            block_number=np.array(fields["block_number"], dtype=np.int64),
+            time=np.array(fields["time"], dtype=np.int64),
+            tx_hash=np.frombuffer(b"".join(fields["tx_hash"]), dtype=np.uint8).reshape(-1, TX_HASH_BYTES),
+            **{
+                name: addresses.intern_many(fields[name])
+                for name in ("buyer", "seller", "buy_currency", "sell_currency")
+            },
+            **{
+                name: np.array(fields[name], dtype=np.float64)
+                for name in ("buy_amount", "buy_amount_usd", "sell_amount", "sell_amount_usd", "price", "price_usd")
+            },
+        )
+
+
+class TransferColumns(Columns):
+    """Token transfers (Bitquery Transfers rows)"""
+
+    __slots__ = ("block_number", "time", "tx_hash", "sender", "receiver", "amount", "amount_usd")
+    FIELDS = {
+        "block_number": ("block_number", pa.int64()),
+        "time": ("block_time", pa.timestamp("s", tz="UTC")),
+        "tx_hash": ("tx_hash", pa.binary(TX_HASH_BYTES)),
+        "sender": ("sender_id", pa.uint32()),
+        "receiver": ("receiver_id", pa.uint32()),
+        "amount": ("amount", pa.float64()),
+        "amount_usd": ("amount_usd", pa.float64()),
+    }
+
+    @classmethod
+    def from_bitquery(cls, rows: Sequence[Dict[str, Any]], addresses: AddressTable) -> "TransferColumns":
+        blocks = [row.get("Block") or {} for row in rows]
+        transfers = [row.get("Transfer") or {} for row in rows]
+        hashes = b"".join(_tx_hash((row.get("Transaction") or {}).get("Hash")) for row in rows)
+        return cls(
+            block_number=np.array([int(block.get("Number") or 0) for block in blocks], dtype=np.int64),
+            time=np.array([_timestamp(block.get("Time")) for block in blocks], dtype=np.int64),
+            tx_hash=np.frombuffer(hashes, dtype=np.uint8).reshape(-1, TX_HASH_BYTES),
+            sender=addresses.intern_many(transfer.get("Sender") for transfer in transfers),
+            receiver=addresses.intern_many(transfer.get("Receiver") for transfer in transfers),
+            amount=np.array([_number(transfer.get("Amount")) for transfer in transfers], dtype=np.float64),
+            amount_usd=np.array([_number(transfer.get("AmountInUSD")) for transfer in transfers], dtype=np.float64),
+        )
+
+
+class HolderColumns(Columns):
+    """Holder balances on one date (Bitquery TokenHolders rows) as int64 fixed-point"""
+
+    __slots__ = ("address", "balance", "scale")
+    FIELDS = {
+        "address": ("address_id", pa.uint32()),
+        "balance": ("balance", pa.int64()),
+    }
+
+    def __init__(self, scale: int = 0, **arrays: np.ndarray):
+        super().__init__(**arrays)
+        self.scale = scale
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> "HolderColumns":
+        holders = super().from_arrow(table)
+        holders.scale = int((table.schema.metadata or {}).get(b"scale", b"0"))
+        return holders
+
+    def take(self, indices) -> "HolderColumns":
+        holders = super().take(indices)
+        holders.scale = self.scale
+        return holders
+
+    @classmethod
+    def from_bitquery(cls, rows: Sequence[Dict[str, Any]], addresses: AddressTable) -> "HolderColumns":
+        balance, scale = fixed_point((row.get("Balance") or {}).get("Amount") for row in rows)
+        return cls(
+            address=addresses.intern_many(row["Holder"]["Address"] for row in rows),
+            balance=balance,
+            scale=scale,
+        )
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.addresses import NO_ADDRESS, AddressTable
+from services.columns import TradeColumns
+from services.ingest import trade_ingestor
+from services.models import DexAnalyticsResponse, LiquidityPool, WhaleTransaction
+from services.moralis import fetch_token_price_async
+
+load_dotenv()
+
+# Volume and trader counts cover this many seconds, compared with the window before
+DEX_ANALYTICS_WINDOW = float(os.getenv("DEX_ANALYTICS_WINDOW", "86400"))
+# A trade is a whale trade if its USD size is at or above this percentile of
+# the window's trades and at least DEX_WHALE_MIN_USD
+DEX_WHALE_PERCENTILE = float(os.getenv("DEX_WHALE_PERCENTILE", "99"))
+DEX_WHALE_MIN_USD = float(os.getenv("DEX_WHALE_MIN_USD", "10000"))
+DEX_MAX_WHALE_TRANSACTIONS = int(os.getenv("DEX_MAX_WHALE_TRANSACTIONS", "20"))
+
+
+def _unique(ids: np.ndarray) -> int:
+    """Distinct address ids, in O(n) with a bitmap over the id range"""
+    ids = ids[ids != NO_ADDRESS]
+    if not len(ids):
+        return 0
+    seen = np.zeros(int(ids.max()) + 1, dtype=bool)
+    seen[ids] = True
+    return int(seen.sum())
+
+
+def trade_usd(trades: TradeColumns) -> np.ndarray:
+    """USD size of each trade from whichever side Bitquery priced (0 if neither)"""
+    usd = np.where(np.isnan(trades.buy_amount_usd), trades.sell_amount_usd, trades.buy_amount_usd)
+    return np.nan_to_num(usd, nan=0.0)
+
+
+def _percent_change(current: float, previous: float) -> float:
+    return round((current - previous) / previous * 100, 2) if previous else 0.0
+
+
+def _time_ago(seconds: float) -> str:
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
+
+
+def compute_dex_analytics(
+    trades: TradeColumns,
+    token_id: Optional[int],
+    now: Optional[float] = None,
+    window: float = DEX_ANALYTICS_WINDOW,
+    whale_percentile: float = DEX_WHALE_PERCENTILE,
+    whale_min_usd: float = DEX_WHALE_MIN_USD,
+    max_whales: int = DEX_MAX_WHALE_TRANSACTIONS
+) -> Dict[str, Any]:
+    """
+    Volume, trader and whale statistics for a token's DEX trades
+
+    Args:
+        trades: The token's trades
+        token_id: Address id of the token; a trade is a buy when the token is
+            its buy currency and a sell otherwise
+        now: End of the current window as a Unix timestamp (defaults to now)
+        window: Window length in seconds
+        whale_percentile: USD-size percentile of the window's trades a whale trade reaches
+        whale_min_usd: Minimum USD size of a whale trade
+        max_whales: Most recent whale trades returned
+
+    Returns:
+        Stats for the current window and changes against the previous one,
+        plus the whale trades, newest first (addresses as ids)
+    """
+    times = trades.time
+    if len(times) > 1 and not np.all(times[1:] >= times[:-1]):
+        trades = trades.take(np.argsort(times, kind="stable"))
+        times = trades.time
+
+    now = time.time() if now is None else now
+    start, previous_start, end = np.searchsorted(times, [now - window, now - 2 * window, now], side="right")
+    usd = trade_usd(trades)
+
+    def traders(lo: int, hi: int) -> int:
+        return _unique(np.concatenate([trades.buyer[lo:hi], trades.seller[lo:hi]]))
+
+    volume = float(usd[start:end].sum())
+    previous_volume = float(usd[previous_start:start].sum())
+    unique_traders = traders(start, end)
+    previous_traders = traders(previous_start, start)
+
+    threshold = None
+    whales: List[Dict[str, Any]] = []
+    if end > start:
+        threshold = max(float(np.percentile(usd[start:end], whale_percentile)), whale_min_usd)
+        hits = start + np.flatnonzero(usd[start:end] >= threshold)
+        for i in hits[::-1][:max_whales]:
+            buy = token_id is not None and trades.buy_currency[i] == token_id
+            whales.append({
+                "type": "buy" if buy else "sell",
+                "address_id": int(trades.buyer[i] if buy else trades.seller[i]),
+                "amount": float(trades.buy_amount[i] if buy else -trades.sell_amount[i]),
+                "amount_usd": float(usd[i]),
+                "tx_hash": "0x" + trades.tx_hash[i].tobytes().hex(),
+                "timestamp": datetime.fromtimestamp(int(times[i]), timezone.utc),
+                "age_seconds": max(0.0, now - float(times[i])),
+            })
+
+    return {
+        "trades": int(end - start),
+        "volume_usd": volume,
+        "volume_change": _percent_change(volume, previous_volume),
+        "unique_traders": unique_traders,
+        "traders_change": _percent_change(unique_traders, previous_traders),
+        "unique_buyers": _unique(trades.buyer[start:end]),
+        "unique_sellers": _unique(trades.seller[start:end]),
+        "whale_threshold_usd": threshold,
+        "whales": whales,
+    }
+
+
+def build_dex_analytics_response(
+    stats: Dict[str, Any],
+    pair_address: str,
+    addresses: AddressTable,
+    pair_stats: Optional[Dict[str, Any]] = None,
+    errors: Optional[List[str]] = None
+) -> DexAnalyticsResponse:
+    """Shape engine stats and the pair's Moralis stats as the DEX analytics response"""
+    pair_stats = pair_stats or {}
+    liquidity = float(pair_stats.get("totalLiquidityUsd") or 0)
+    liquidity_change = float((pair_stats.get("liquidityPercentChange") or {}).get("24h") or 0)
+    pools = [
+        LiquidityPool(
+            pairAddress=pair_address,
+            totalLiquidityUsd=liquidity,
+            platform=pair_stats.get("exchange"),
+            pair=pair_stats.get("pairLabel"),
+            liquidity=round(liquidity / 1e6, 3),
+            change=round(liquidity_change, 2),
+        )
+    ] if pair_stats else []
+    return DexAnalyticsResponse(
+        total_dex_volume=round(stats["volume_usd"], 2),
+        dex_volume_change=stats["volume_change"],
+        total_liquidity=liquidity,
+        liquidity_change=round(liquidity_change, 2),
+        unique_traders=stats["unique_traders"],
+        traders_change=stats["traders_change"],
+        liquidity_pool=pools,
+        whale_transactions=[
+            WhaleTransaction(
+                transactionType=whale["type"],
+                amountUsd=round(whale["amount_usd"], 2),
+                address=addresses.address(whale["address_id"]),
+                amount=whale["amount"],
+                asset=pair_stats.get("tokenSymbol"),
+                txHash=whale["tx_hash"],
+                timestamp=whale["timestamp"],
+                time_ago=_time_ago(whale["age_seconds"]),
+            )
+            for whale in stats["whales"]
+        ],
+        trades=stats["trades"],
+        unique_buyers=stats["unique_buyers"],
+        unique_sellers=stats["unique_sellers"],
+        whale_threshold_usd=stats["whale_threshold_usd"],
+        errors=errors or [],
+    )
+
+
+async def get_dex_analytics(token_address: str, pair_address: str, network: str = "eth") -> DexAnalyticsResponse:
+    """
+    DEX analytics for a token from its stored trade history
+
+    New trades are ingested first (only blocks after the stored high-water
+    mark), concurrently with the pair's Moralis stats for liquidity. If
+    ingestion fails, the history stored so far is still analyzed and the
+    failure is listed under `errors`.
+    """
+    ingested, pair_stats = await asyncio.gather(
+        trade_ingestor.ingest(token_address, network, ["dex_trades"]),
+        fetch_token_price_async(pair_address, network),
+    )
+    errors = []
+    if ingested["dex_trades"]["error"]:
+        errors.append(f"Trades: {ingested['dex_trades']['error']}")
+    if "error" in pair_stats:
+        errors.append(f"Liquidity: {pair_stats['error']}")
+        pair_stats = None
+
+    addresses = trade_ingestor.store.addresses(network)
+
+    def analyze() -> Dict[str, Any]:
+        table = trade_ingestor.read(token_address, network, columns=TradeColumns.columns())
+        return compute_dex_analytics(TradeColumns.from_arrow(table), addresses.lookup(token_address))
+
+    stats = await asyncio.to_thread(analyze)
+    return build_dex_analytics_response(stats, pair_address, addresses, pair_stats, errors)
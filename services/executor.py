@@ -0,0 +1,55 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Maximum number of blocking jobs of each kind running at once. Extra jobs
+# wait in the pool's queue instead of occupying the event loop.
+POOL_SIZES: Dict[str, int] = {
+    "llm": int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    "browser": int(os.getenv("BROWSER_MAX_CONCURRENCY", "2")),
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def get_executor(pool: str) -> ThreadPoolExecutor:
+    """Return the bounded thread pool for the given kind of blocking work"""
+    if pool not in POOL_SIZES:
+        raise ValueError(f"Unknown executor pool: {pool}")
+    if pool not in _executors:
+        _executors[pool] = ThreadPoolExecutor(
+            max_workers=POOL_SIZES[pool],
+            thread_name_prefix=f"hypescan-{pool}",
+        )
+    return _executors[pool]
+
+
+async def run_blocking(pool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on a bounded pool without stalling the event loop
+
+    Args:
+        pool: Name of the pool ("llm", "browser")
+        func: The blocking callable
+        *args, **kwargs: Arguments passed to the callable
+
+    Returns:
+        Whatever the callable returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(pool), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    """Shut down all pools, e.g. from the application lifespan hook"""
+    for executor in _executors.values():
+        executor.shutdown(wait=wait, cancel_futures=True)
+    _executors.clear()
@@ -1,6 +1,8 @@
 import os
+import json
 import google.generativeai as genai
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, Union
+from services.gmgn_crawler import GMGNSecurity, extract_gmgn_security
 
 genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
@@ -18,17 +20,24 @@ model = genai.GenerativeModel(
   generation_config=generation_config,
 )
 
-async def analyze_gmgn_data(gmgn_data: str) -> Dict[str, Any]:
+# The structured GMGN fields are enough for most callers; set to 1 to also
+# have Gemini write up insights from them.
+GMGN_LLM_ANALYSIS = os.getenv("GMGN_LLM_ANALYSIS", "0") == "1"
 
-    prompt = f"""
+def _security_fields(gmgn_data: Union[GMGNSecurity, str]) -> Dict[str, Any]:
+    security = gmgn_data if isinstance(gmgn_data, GMGNSecurity) else extract_gmgn_security(gmgn_data)
+    return security.model_dump(exclude_none=True)
+
+def _gmgn_prompt(fields: Dict[str, Any]) -> str:
+    return f"""
 
     You are an expert in analyzing GMGN.ai data.
-    You are given a GMGN.ai data of a token.
-    Analyze this token data and provide detailed insights in the following areas:
+    You are given the security and holder metrics GMGN.ai reports for a token.
+    Analyze these metrics and provide detailed insights in the following areas:
 
             1. Top Holders Analysis:
                - Top 10 holder percentages
-               - Dev wallet status and transactions
+               - Dev wallet holdings
                - Sniper activity and counts
                - Blue chip holder percentage
 
@@ -40,15 +49,55 @@ async def analyze_gmgn_data(gmgn_data: str) -> Dict[str, Any]:
                - Renounced status
 
 
-            Raw Data:
-            {gmgn_data}
+            Metrics (fields that GMGN did not report are omitted):
+            {json.dumps(fields, separators=(",", ":"))}
+
+            Format the response as a clean JSON object without any markdown formatting or additional headers. """
+
+async def analyze_gmgn_data(
+    gmgn_data: Union[GMGNSecurity, str],
+    use_llm: bool = GMGN_LLM_ANALYSIS
+) -> Dict[str, Any]:
+    """
+    Analyze GMGN.ai token data
+
+    Args:
+        gmgn_data: Structured security fields, or raw page markdown to extract them from
+        use_llm: Also ask Gemini for insights, fed only the structured fields
+
+    Returns:
+        Dictionary with the structured fields, the optional analysis text and status
+    """
+    fields = _security_fields(gmgn_data)
+
+    if not use_llm:
+        return {
+            "security": fields,
+            "analysis": None,
+            "status": "success"
+        }
 
-            Format the response as a clean JSON object without any markdown formatting or additional headers. Include all available metrics and insights from the provided data. """
-    
     chat = model.start_chat(history=[])
-    response = chat.send_message(prompt)
+    response = chat.send_message(_gmgn_prompt(fields))
     
     return {
+        "security": fields,
         "analysis": response.text,
         "status": "success"
-    }
\ No newline at end of file
+    }
+
+async def stream_gmgn_analysis(gmgn_data: Union[GMGNSecurity, str]) -> AsyncIterator[str]:
+    """
+    Stream Gemini's GMGN analysis as it is generated
+
+    Args:
+        gmgn_data: Structured security fields, or raw page markdown to extract them from
+
+    Yields:
+        Text chunks in generation order
+    """
+    chat = model.start_chat(history=[])
+    response = await chat.send_message_async(_gmgn_prompt(_security_fields(gmgn_data)), stream=True)
+    async for chunk in response:
+        if chunk.text:
+            yield chunk.text
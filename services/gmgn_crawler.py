@@ -68,44 +68,211 @@
 
 import asyncio
 import os
+import re
 import json
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 import google.generativeai as genai
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from services.cache import ResponseCache
+
+GMGN_BASE_URL = os.getenv("GMGN_BASE_URL", "https://gmgn.ai")
+GMGN_MAX_PAGES = int(os.getenv("GMGN_MAX_PAGES", "4"))
+GMGN_CACHE_TTL = float(os.getenv("GMGN_CACHE_TTL", "300"))
+GMGN_CACHE_SIZE = int(os.getenv("GMGN_CACHE_SIZE", "512"))
+gmgn_cache = ResponseCache("gmgn_token_info", ttl=GMGN_CACHE_TTL, maxsize=GMGN_CACHE_SIZE)
+
+class GMGNSecurity(BaseModel):
+    price_usd: Optional[float] = None
+    market_cap_usd: Optional[float] = None
+    liquidity_usd: Optional[float] = None
+    holders: Optional[int] = None
+    top10_holder_pct: Optional[float] = None
+    dev_holding_pct: Optional[float] = None
+    snipers: Optional[int] = None
+    insiders_pct: Optional[float] = None
+    bluechip_pct: Optional[float] = None
+    buy_tax_pct: Optional[float] = None
+    sell_tax_pct: Optional[float] = None
+    honeypot: Optional[bool] = None
+    renounced: Optional[bool] = None
+    verified: Optional[bool] = None
+    lp_burnt_pct: Optional[float] = None
 
 class GMGNResponse(BaseModel):
     markdown: str
     status: str
     error: Optional[str] = None
+    security: Optional[GMGNSecurity] = None
+
+# ----------------------------
+# Structured extraction
+# ----------------------------
+# Labels as rendered on the token page, each starting a line or a markdown
+# table cell and followed by its value (possibly separated by table pipes or
+# a colon). A label inside a longer one ("Top 10 Holders") is not matched,
+# and counts followed by % are shares, not counts.
+_LABEL_START = r"(?:^|\|)[\s*]*"
+_SEPARATOR = r"[\s:|*]*"
+_AMOUNT = r"\$?\s*(\d[\d,]*(?:\.\d+)?|\.\d+)\s*([KMB])?\b"
+_PERCENT = r"(\d+(?:\.\d+)?)\s*%"
+_COUNT = r"(\d[\d,]*)\b(?![\d.,]*\s*%)"
+_FLAG = r"(yes|no|true|false)\b"
+_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+_SECURITY_FIELDS = {
+    "price_usd": (r"Price", _AMOUNT),
+    "market_cap_usd": (r"(?:Mkt\s*Cap|Market\s*Cap)", _AMOUNT),
+    "liquidity_usd": (r"Liquidity", _AMOUNT),
+    "holders": (r"Holders", _COUNT),
+    "top10_holder_pct": (r"Top\s*10(?:\s*Holders)?", _PERCENT),
+    "dev_holding_pct": (r"DEV", _PERCENT),
+    "snipers": (r"Snipers", _COUNT),
+    "insiders_pct": (r"Insiders", _PERCENT),
+    "bluechip_pct": (r"Blue\s*chip", _PERCENT),
+    "buy_tax_pct": (r"Buy\s*Tax", _PERCENT),
+    "sell_tax_pct": (r"Sell\s*Tax", _PERCENT),
+    "honeypot": (r"Honeypot", _FLAG),
+    "renounced": (r"Renounced", _FLAG),
+    "verified": (r"Verified", _FLAG),
+    "lp_burnt_pct": (r"Burnt", _PERCENT),
+}
+
+_SECURITY_PATTERNS = {
+    field: re.compile(rf"{_LABEL_START}{label}\b{_SEPARATOR}{value}", re.IGNORECASE | re.MULTILINE)
+    for field, (label, value) in _SECURITY_FIELDS.items()
+}
+
+def extract_gmgn_security(text: str) -> GMGNSecurity:
+    """
+    Pull the security and market fields out of a rendered GMGN token page
+
+    Args:
+        text: Page markdown (or plain text) as returned by the crawler
+
+    Returns:
+        GMGNSecurity with every field that was found; missing ones stay None
+    """
+    values: Dict[str, Any] = {}
+    for field, pattern in _SECURITY_PATTERNS.items():
+        match = pattern.search(text)
+        if not match:
+            continue
+        value_pattern = _SECURITY_FIELDS[field][1]
+        if value_pattern is _AMOUNT:
+            number, suffix = match.groups()
+            values[field] = float(number.replace(",", "")) * _SUFFIXES.get((suffix or "").upper(), 1)
+        elif value_pattern is _COUNT:
+            values[field] = int(match.group(1).replace(",", ""))
+        elif value_pattern is _FLAG:
+            values[field] = match.group(1).lower() in ("yes", "true")
+        else:
+            values[field] = float(match.group(1))
+    return GMGNSecurity(**values)
 
-async def get_gmgn_info(token_address: str) -> GMGNResponse:
+class GMGNCrawlerManager:
+    """
+    Long-lived crawler shared by all GMGN lookups
+
+    The browser is launched once (at application startup, or on first use)
+    and every lookup opens a page in it. At most max_pages pages are open at
+    a time; further lookups wait for a free slot.
+    """
+
+    def __init__(self, max_pages: int = GMGN_MAX_PAGES):
+        self.max_pages = max_pages
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._lock = asyncio.Lock()
+        self._pages = asyncio.Semaphore(max_pages)
+        self._run_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+        self.active = 0
+        self.lookups = 0
+        self.failures = 0
+
+    async def start(self) -> AsyncWebCrawler:
+        """Launch the shared browser if it is not running; returns it"""
+        async with self._lock:
+            if self._crawler is None:
+                crawler = AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+                await crawler.start()
+                self._crawler = crawler
+            return self._crawler
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._crawler is not None:
+                crawler, self._crawler = self._crawler, None
+                await crawler.close()
+
+    async def crawl(self, url: str):
+        """Render a page in the shared browser"""
+        async with self._pages:
+            # Checked after waiting for a page slot, since stop() may have
+            # run meanwhile; the local reference survives a later stop()
+            crawler = self._crawler or await self.start()
+            self.active += 1
+            self.lookups += 1
+            try:
+                return await crawler.arun(url, config=self._run_config)
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._crawler is not None,
+            "max_pages": self.max_pages,
+            "active": self.active,
+            "lookups": self.lookups,
+            "failures": self.failures,
+        }
+
+crawler_manager = GMGNCrawlerManager()
+
+async def get_gmgn_info(token_address: str, refresh: bool = False) -> GMGNResponse:
     """
     Fetch token information from GMGN.ai
     
+    Successful lookups are cached for GMGN_CACHE_TTL seconds.
+
     Args:
         token_address: The token address to look up
+        refresh: Skip the cached result and replace it
         
     Returns:
         GMGNResponse object containing the markdown data and status
     """
+    async def fetch():
+        return (await _crawl_gmgn(token_address)).model_dump()
+
+    data = await gmgn_cache.get_or_fetch(
+        token_address.lower(),
+        fetch,
+        should_cache=lambda result: result["status"] == "success",
+        refresh=refresh
+    )
+    return GMGNResponse(**data)
+
+async def _crawl_gmgn(token_address: str) -> GMGNResponse:
     try:
-        url = f"https://gmgn.ai/base/token/{token_address}"
-        async with AsyncWebCrawler() as crawler:
-            result = await crawler.arun(url)
-            
-            if not result or not result.markdown:
-                return GMGNResponse(
-                    markdown="",
-                    status="error",
-                    error="Failed to fetch data from GMGN.ai"
-                )
-            
+        url = f"{GMGN_BASE_URL}/base/token/{token_address}"
+        result = await crawler_manager.crawl(url)
+
+        if not result or not result.markdown:
             return GMGNResponse(
-                markdown=result.markdown,
-                status="success"
+                markdown="",
+                status="error",
+                error="Failed to fetch data from GMGN.ai"
             )
-            
+
+        return GMGNResponse(
+            markdown=result.markdown,
+            status="success",
+            security=extract_gmgn_security(result.markdown)
+        )
+
     except Exception as e:
         return GMGNResponse(
             markdown="",
@@ -115,8 +282,11 @@ async def get_gmgn_info(token_address: str) -> GMGNResponse:
 
 async def main():
     token_address = "0x4200000000000000000000000000000000000006"
-    response = await get_gmgn_info(token_address)
-    print(json.dumps(response.model_dump(), indent=4))
+    try:
+        response = await get_gmgn_info(token_address)
+        print(json.dumps(response.model_dump(), indent=4))
+    finally:
+        await crawler_manager.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
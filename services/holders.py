@@ -0,0 +1,241 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+from dotenv import load_dotenv
+
+from services.addresses import AddressTable, address_table
+from services.bitq import AsyncBitqueryAPI
+from services.columns import HolderColumns
+from services.ingest import INGEST_DIR, read_arrow, write_arrow
+
+load_dotenv()
+
+# Holders per Bitquery page, and the most pages one snapshot may take; a
+# token with more holders than that is not snapshotted
+HOLDER_PAGE_SIZE = int(os.getenv("HOLDER_PAGE_SIZE", "10000"))
+HOLDER_MAX_PAGES = int(os.getenv("HOLDER_MAX_PAGES", "100"))
+# Share of supply held by the top N holders is reported for each N
+HOLDER_TOP_N = tuple(int(n) for n in os.getenv("HOLDER_TOP_N", "10,100").split(","))
+
+
+def _yesterday() -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def concentration_metrics(balances: np.ndarray, scale: int = 0, top_n: Sequence[int] = HOLDER_TOP_N) -> Dict[str, Any]:
+    """
+    Holder concentration of one snapshot, in O(n log n)
+
+    Args:
+        balances: Fixed-point balances, one per holder
+        scale: Fixed-point scale of the balances
+        top_n: Holder counts to report the top-holders share for
+
+    Returns:
+        holders, supply, mean, median, gini, nakamoto (fewest holders with
+        more than 51% of supply), theil and top_<N>_share for each N
+    """
+    x = np.sort(balances[balances > 0]).astype(np.float64)
+    n = len(x)
+    metrics = {"holders": n, "supply": 0.0, "mean": 0.0, "median": 0.0, "gini": 0.0, "nakamoto": 0, "theil": 0.0}
+    metrics.update({f"top_{count}_share": 0.0 for count in top_n})
+    if n == 0:
+        return metrics
+
+    total = x.sum()
+    mean = total / n
+    ratio = x / mean
+    # Largest first, so cumulative[k - 1] is what the top k hold
+    cumulative = np.cumsum(x[::-1])
+    unit = 10.0 ** -scale
+    metrics.update({
+        "supply": float(total) * unit,
+        "mean": float(mean) * unit,
+        "median": float(np.median(x)) * unit,
+        "gini": float((2 * np.arange(1, n + 1) @ x) / (n * total) - (n + 1) / n),
+        "nakamoto": int(np.searchsorted(cumulative, 0.51 * total, side="right")) + 1,
+        "theil": float(np.mean(ratio * np.log(ratio))),
+    })
+    metrics["nakamoto"] = min(metrics["nakamoto"], n)
+    for count in top_n:
+        metrics[f"top_{count}_share"] = float(cumulative[min(count, n) - 1] / total)
+    return metrics
+
+
+# ----------------------------
+# Store
+# ----------------------------
+class HolderStore:
+    """
+    Daily holder snapshots per token under <root>/<network>/<token>/holders
+
+    A snapshot (<date>.arrow) holds HolderColumns: uint32 ids into the
+    network's AddressTable and int64 fixed-point balances, sorted by
+    balance, with the scale in the file's metadata. Holders can then be
+    compared across days, and with the trade store, as integer arrays.
+    """
+
+    def __init__(self, root: str = INGEST_DIR):
+        self.root = root
+
+    def addresses(self, network: str) -> AddressTable:
+        return address_table(self.root, network)
+
+    def _dir(self, network: str, token_address: str) -> str:
+        return os.path.join(self.root, network, token_address.lower(), "holders")
+
+    def _path(self, network: str, token_address: str, date: str) -> str:
+        return os.path.join(self._dir(network, token_address), f"{date}.arrow")
+
+    def dates(self, network: str, token_address: str) -> List[str]:
+        directory = self._dir(network, token_address)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-6] for name in os.listdir(directory) if name.endswith(".arrow"))
+
+    def has(self, network: str, token_address: str, date: str) -> bool:
+        return os.path.exists(self._path(network, token_address, date))
+
+    def write(self, network: str, token_address: str, date: str, rows: List[Dict[str, Any]]) -> int:
+        """Store one day's holders from Bitquery TokenHolders rows; returns the number of holders"""
+        holders = HolderColumns.from_bitquery(rows, self.addresses(network))
+        holders = holders.take(np.argsort(holders.balance, kind="stable"))
+        os.makedirs(self._dir(network, token_address), exist_ok=True)
+        table = pa.table(holders.arrow_columns()).replace_schema_metadata({"scale": str(holders.scale)})
+        write_arrow(self._path(network, token_address, date), table)
+        return len(holders)
+
+    def read(self, network: str, token_address: str, date: str) -> HolderColumns:
+        """One snapshot, balances ascending"""
+        return HolderColumns.from_arrow(read_arrow(self._path(network, token_address, date)))
+
+
+# ----------------------------
+# Snapshots and trends
+# ----------------------------
+class HolderTracker:
+    """
+    Takes one full holder snapshot per token per day from Bitquery and
+    computes concentration metrics and day-over-day changes locally
+    """
+
+    def __init__(
+        self,
+        store: Optional[HolderStore] = None,
+        page_size: int = HOLDER_PAGE_SIZE,
+        max_pages: int = HOLDER_MAX_PAGES
+    ):
+        self.store = store or HolderStore()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self.snapshots = 0
+        self.pages = 0
+        self.failures = 0
+
+    async def snapshot(
+        self,
+        token_address: str,
+        network: str = "eth",
+        date: Optional[str] = None,
+        client: Optional[AsyncBitqueryAPI] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch and store every holder of a token on a date, unless already stored
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, base, etc.)
+            date: Snapshot date (YYYY-MM-DD); yesterday by default, since a
+                finished day's holders do not change between pages
+            client: Bitquery client (a new AsyncBitqueryAPI by default)
+
+        Returns:
+            {"date", "holders", "pages", "stored", "error"}; stored is False
+            if the snapshot already existed or could not be completed
+        """
+        date = date or _yesterday()
+        result = {"date": date, "holders": None, "pages": 0, "stored": False, "error": None}
+        lock = self._locks.setdefault((network, token_address.lower()), asyncio.Lock())
+        async with lock:
+            if self.store.has(network, token_address, date):
+                return result
+            client = client or AsyncBitqueryAPI()
+            holders = []
+            while True:
+                if result["pages"] >= self.max_pages:
+                    result["error"] = f"More than {self.max_pages * self.page_size} holders"
+                    break
+                response = await client.get_token_holders_page(
+                    token_address, network, date, self.page_size, result["pages"] * self.page_size
+                )
+                result["pages"] += 1
+                self.pages += 1
+                errors = response.data.get("errors") if response.status == "success" else None
+                if response.status != "success" or errors:
+                    result["error"] = response.error or str(errors)
+                    break
+                rows = ((response.data.get("data") or {}).get("EVM") or {}).get("TokenHolders") or []
+                holders += rows
+                if len(rows) < self.page_size:
+                    break
+
+            if result["error"]:
+                # A partial snapshot would skew every metric; try again next time
+                self.failures += 1
+                return result
+            result["holders"] = await asyncio.to_thread(self.store.write, network, token_address, date, holders)
+            result["stored"] = True
+            self.snapshots += 1
+        return result
+
+    def metrics(self, token_address: str, network: str = "eth", date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Concentration metrics of a stored snapshot (the latest by default)"""
+        dates = self.store.dates(network, token_address)
+        date = date or (dates[-1] if dates else None)
+        if date is None or date not in dates:
+            return None
+        holders = self.store.read(network, token_address, date)
+        return {"date": date, **concentration_metrics(holders.balance, holders.scale)}
+
+    def trends(self, token_address: str, network: str = "eth", days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Metrics for the latest `days` snapshots, oldest first, each with
+        changes against the snapshot before it: holders_change,
+        new_holders, exited_holders, gini_change and nakamoto_change
+        """
+        dates = self.store.dates(network, token_address)[-(days + 1):]
+        trend, previous = [], None
+        for date in dates:
+            holders = self.store.read(network, token_address, date)
+            # Sorted unique ids; compared as sets, so ids interned by another
+            # worker since this process last read the address table are fine
+            held = np.unique(holders.address[holders.balance > 0])
+            entry = {"date": date, **concentration_metrics(holders.balance, holders.scale)}
+            if previous is not None:
+                previous_held, previous_entry = previous
+                entry.update({
+                    "holders_change": entry["holders"] - previous_entry["holders"],
+                    "new_holders": len(np.setdiff1d(held, previous_held, assume_unique=True)),
+                    "exited_holders": len(np.setdiff1d(previous_held, held, assume_unique=True)),
+                    "gini_change": entry["gini"] - previous_entry["gini"],
+                    "nakamoto_change": entry["nakamoto"] - previous_entry["nakamoto"],
+                })
+            previous = (held, entry)
+            trend.append(entry)
+        return trend[-days:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "root": self.store.root,
+            "snapshots": self.snapshots,
+            "pages": self.pages,
+            "failures": self.failures,
+        }
+
+
+holder_tracker = HolderTracker()
@@ -0,0 +1,354 @@
+import asyncio
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from dotenv import load_dotenv
+
+from services.addresses import AddressTable, address_table
+from services.bitq import AsyncBitqueryAPI, _days_ago
+from services.columns import Columns, TradeColumns, TransferColumns
+from services.locks import file_lock
+
+load_dotenv()
+
+# Root of the local trade store: <dir>/<network>/<token>/<dataset>/*.arrow
+INGEST_DIR = os.getenv("INGEST_DIR", os.path.join(".cache", "trades"))
+# Rows per Bitquery page, and pages fetched per dataset in one ingest run
+INGEST_PAGE_SIZE = int(os.getenv("INGEST_PAGE_SIZE", "1000"))
+INGEST_MAX_PAGES = int(os.getenv("INGEST_MAX_PAGES", "20"))
+# History fetched the first time a token is ingested
+INGEST_BACKFILL_DAYS = int(os.getenv("INGEST_BACKFILL_DAYS", "7"))
+# Parts of one dataset are merged into a single file past this count
+INGEST_COMPACT_PARTS = int(os.getenv("INGEST_COMPACT_PARTS", "32"))
+
+# Rows are stored as the struct-of-arrays fields of services.columns
+# (addresses as ids into the network's AddressTable) plus a few labels
+TRADE_SCHEMA = pa.schema(TradeColumns.schema_fields() + [
+    ("buy_symbol", pa.string()),
+    ("sell_symbol", pa.string()),
+    ("protocol", pa.string()),
+    ("protocol_family", pa.string()),
+])
+
+TRANSFER_SCHEMA = pa.schema(TransferColumns.schema_fields() + [
+    ("symbol", pa.string()),
+])
+
+PART_NAME = re.compile(r"^(\d+)-(\d+)\.arrow$")
+
+
+def _trade_labels(rows: Sequence[Dict[str, Any]]) -> Dict[str, List[Optional[str]]]:
+    trades = [row.get("Trade") or {} for row in rows]
+    return {
+        "buy_symbol": [((trade.get("Buy") or {}).get("Currency") or {}).get("Symbol") for trade in trades],
+        "sell_symbol": [((trade.get("Sell") or {}).get("Currency") or {}).get("Symbol") for trade in trades],
+        "protocol": [(trade.get("Dex") or {}).get("ProtocolName") for trade in trades],
+        "protocol_family": [(trade.get("Dex") or {}).get("ProtocolFamily") for trade in trades],
+    }
+
+
+def _transfer_labels(rows: Sequence[Dict[str, Any]]) -> Dict[str, List[Optional[str]]]:
+    return {
+        "symbol": [(((row.get("Transfer") or {}).get("Currency")) or {}).get("Symbol") for row in rows],
+    }
+
+
+# Dataset -> (Bitquery field, schema, columns container, label extractor, AsyncBitqueryAPI method)
+DATASETS: Dict[str, Tuple[str, pa.Schema, Type[Columns], Callable[[Sequence[Dict[str, Any]]], Dict[str, list]], str]] = {
+    "dex_trades": ("DEXTrades", TRADE_SCHEMA, TradeColumns, _trade_labels, "get_dex_trades_after"),
+    "transfers": ("Transfers", TRANSFER_SCHEMA, TransferColumns, _transfer_labels, "get_token_transfers_after"),
+}
+
+
+def page_table(dataset: str, rows: Sequence[Dict[str, Any]], addresses: AddressTable) -> pa.Table:
+    """Bitquery rows of a dataset as a table in its stored schema"""
+    _, schema, columns, labels, _ = DATASETS[dataset]
+    arrays = columns.from_bitquery(rows, addresses).arrow_columns()
+    arrays.update({name: pa.array(values, pa.string()) for name, values in labels(rows).items()})
+    return pa.table(arrays, schema=schema)
+
+
+# ----------------------------
+# Store
+# ----------------------------
+def read_arrow(path: str) -> pa.Table:
+    """Memory-map an Arrow IPC file; the table's buffers point into the mapping"""
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).read_all()
+
+
+def write_arrow(path: str, table: pa.Table) -> None:
+    """Write an Arrow IPC file atomically (readers never see a partial file)"""
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+class TradeStore:
+    """
+    Append-only columnar store of trades and transfers, one directory per
+    (network, token, dataset)
+
+    Each append is written as an Arrow IPC file named after the block range
+    it covers, so the newest part gives the high-water mark without a
+    separate index. Reads memory-map the parts, so scanning full history
+    does not copy it onto the heap. Once a dataset has more than
+    compact_parts files they are merged into one; a part whose range lies
+    inside another's (left over if compaction was interrupted) is ignored.
+    Appends and compactions hold a lock on the dataset directory shared by
+    all processes, so workers ingesting the same token never write
+    overlapping parts.
+    """
+
+    def __init__(self, root: str = INGEST_DIR, compact_parts: int = INGEST_COMPACT_PARTS):
+        self.root = root
+        self.compact_parts = compact_parts
+
+    def addresses(self, network: str) -> AddressTable:
+        """The network's address table, which the stored id columns refer to"""
+        return address_table(self.root, network)
+
+    def tokens(self, network: str, dataset: str = "dex_trades") -> List[str]:
+        """Addresses of the tokens with stored rows of a dataset"""
+        directory = os.path.join(self.root, network)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            name for name in os.listdir(directory)
+            if os.path.isdir(os.path.join(directory, name, dataset))
+        )
+
+    def _dir(self, network: str, token_address: str, dataset: str) -> str:
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        return os.path.join(self.root, network, token_address.lower(), dataset)
+
+    def parts(self, network: str, token_address: str, dataset: str) -> List[Tuple[int, int, str]]:
+        """(first block, last block, path) of every live part, oldest first"""
+        directory = self._dir(network, token_address, dataset)
+        if not os.path.isdir(directory):
+            return []
+        ranges = []
+        for name in os.listdir(directory):
+            match = PART_NAME.match(name)
+            if match:
+                ranges.append((int(match.group(1)), int(match.group(2)), os.path.join(directory, name)))
+        # Widest range first within the same start, so covered parts follow their cover
+        ranges.sort(key=lambda part: (part[0], -part[1]))
+        live, covered_to = [], -1
+        for first, last, path in ranges:
+            if last <= covered_to:
+                continue
+            live.append((first, last, path))
+            covered_to = last
+        return live
+
+    @staticmethod
+    def _write_part(directory: str, table: pa.Table, first: int, last: int) -> str:
+        path = os.path.join(directory, f"{first:012d}-{last:012d}.arrow")
+        write_arrow(path, table)
+        return path
+
+    def high_water(self, network: str, token_address: str, dataset: str) -> Optional[Dict[str, Any]]:
+        """Last stored block number and time, or None if nothing is stored yet"""
+        parts = self.parts(network, token_address, dataset)
+        if not parts:
+            return None
+        _, last, path = parts[-1]
+        times = read_arrow(path).column("block_time")
+        block_time = pc.max(times).as_py() if len(times) else None
+        return {"block_number": last, "block_time": block_time}
+
+    def append(self, network: str, token_address: str, dataset: str, table: pa.Table) -> int:
+        """
+        Write rows newer than the high-water mark as a new part
+
+        Rows at or below the mark (already stored by another worker's
+        ingest) are dropped; returns the number of rows written.
+        """
+        directory = self._dir(network, token_address, dataset)
+        with file_lock(directory):
+            parts = self.parts(network, token_address, dataset)
+            if parts:
+                table = table.filter(pc.greater(table.column("block_number"), parts[-1][1]))
+            if table.num_rows == 0:
+                return 0
+            os.makedirs(directory, exist_ok=True)
+            blocks = table.column("block_number")
+            self._write_part(directory, table, pc.min(blocks).as_py(), pc.max(blocks).as_py())
+            if len(parts) + 1 > self.compact_parts:
+                self._compact(network, token_address, dataset)
+        return table.num_rows
+
+    def compact(self, network: str, token_address: str, dataset: str) -> None:
+        """Merge all parts of a dataset into one file"""
+        with file_lock(self._dir(network, token_address, dataset)):
+            self._compact(network, token_address, dataset)
+
+    def _compact(self, network: str, token_address: str, dataset: str) -> None:
+        parts = self.parts(network, token_address, dataset)
+        if len(parts) < 2:
+            return
+        table = pa.concat_tables(read_arrow(path) for _, _, path in parts).combine_chunks()
+        self._write_part(self._dir(network, token_address, dataset), table, parts[0][0], parts[-1][1])
+        for _, _, path in parts:
+            os.remove(path)
+
+    def read(
+        self,
+        network: str,
+        token_address: str,
+        dataset: str,
+        columns: Optional[Sequence[str]] = None,
+        after_block: Optional[int] = None
+    ) -> pa.Table:
+        """
+        Stored rows, oldest first
+
+        Args:
+            network: Blockchain network
+            token_address: The token contract address
+            dataset: One of DATASETS
+            columns: Only these columns (all by default)
+            after_block: Only rows from later blocks
+        """
+        schema = DATASETS[dataset][1]
+        tables = []
+        for _, last, path in self.parts(network, token_address, dataset):
+            if after_block is not None and last <= after_block:
+                continue
+            table = read_arrow(path)
+            if after_block is not None:
+                table = table.filter(pc.greater(table.column("block_number"), after_block))
+            tables.append(table.select(list(columns)) if columns else table)
+        if not tables:
+            empty = schema.empty_table()
+            return empty.select(list(columns)) if columns else empty
+        return pa.concat_tables(tables)
+
+
+# ----------------------------
+# Ingestion
+# ----------------------------
+class TradeIngestor:
+    """
+    Incrementally pulls a token's DEX trades and transfers from Bitquery into
+    a TradeStore
+
+    Each run asks only for blocks after the stored high-water mark, oldest
+    first, and pages forward from the last block of each page. Rows of one
+    block can span two pages, so the last block of a full page is dropped
+    and fetched whole by the next page. Runs for the same token are
+    serialized so parts never overlap.
+    """
+
+    def __init__(
+        self,
+        store: Optional[TradeStore] = None,
+        page_size: int = INGEST_PAGE_SIZE,
+        max_pages: int = INGEST_MAX_PAGES,
+        backfill_days: int = INGEST_BACKFILL_DAYS
+    ):
+        self.store = store or TradeStore()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.backfill_days = backfill_days
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.runs = 0
+        self.pages = 0
+        self.rows = 0
+        self.failures = 0
+
+    async def ingest(
+        self,
+        token_address: str,
+        network: str = "eth",
+        datasets: Sequence[str] = tuple(DATASETS),
+        client: Optional[AsyncBitqueryAPI] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch and store everything newer than the high-water mark
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network (eth, bsc, polygon, base, etc.)
+            datasets: Keys of DATASETS to update
+            client: Bitquery client (a new AsyncBitqueryAPI by default)
+
+        Returns:
+            Per dataset: {"rows", "pages", "complete", "high_water", "error"};
+            complete is False when max_pages ran out before the newest rows
+        """
+        key = (network, token_address.lower())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        client = client or AsyncBitqueryAPI()
+        async with lock:
+            self.runs += 1
+            results = await asyncio.gather(
+                *[self._ingest_dataset(client, token_address, network, dataset) for dataset in datasets]
+            )
+        return dict(zip(datasets, results))
+
+    async def _ingest_dataset(
+        self, client: AsyncBitqueryAPI, token_address: str, network: str, dataset: str
+    ) -> Dict[str, Any]:
+        field, _, _, _, method = DATASETS[dataset]
+        addresses = self.store.addresses(network)
+        mark = await asyncio.to_thread(self.store.high_water, network, token_address, dataset)
+        after = mark["block_number"] if mark else 0
+        since = mark["block_time"].strftime("%Y-%m-%d") if mark and mark["block_time"] else _days_ago(self.backfill_days)
+        result = {"rows": 0, "pages": 0, "complete": False, "high_water": mark, "error": None}
+
+        while result["pages"] < self.max_pages:
+            response = await getattr(client, method)(token_address, network, after, self.page_size, since)
+            result["pages"] += 1
+            self.pages += 1
+            errors = response.data.get("errors") if response.status == "success" else None
+            if response.status != "success" or errors:
+                self.failures += 1
+                result["error"] = response.error or str(errors)
+                break
+
+            rows = ((response.data.get("data") or {}).get("EVM") or {}).get(field) or []
+            full = len(rows) >= self.page_size
+            table = await asyncio.to_thread(page_table, dataset, rows, addresses)
+            if full:
+                last = pc.max(table.column("block_number")).as_py()
+                trimmed = table.filter(pc.less(table.column("block_number"), last))
+                if trimmed.num_rows:
+                    table = trimmed
+                else:
+                    print(f"Ingest {dataset} for {token_address}: block {last} has more than {self.page_size} rows")
+            if table.num_rows:
+                written = await asyncio.to_thread(self.store.append, network, token_address, dataset, table)
+                after = pc.max(table.column("block_number")).as_py()
+                newest = pc.max(table.column("block_time")).as_py()
+                since = newest.strftime("%Y-%m-%d") if newest else since
+                result["rows"] += written
+                result["high_water"] = {"block_number": after, "block_time": newest}
+                self.rows += written
+            if not full:
+                result["complete"] = True
+                break
+        return result
+
+    def read(self, token_address: str, network: str = "eth", dataset: str = "dex_trades", **kwargs) -> pa.Table:
+        """Stored rows for a token (see TradeStore.read)"""
+        return self.store.read(network, token_address, dataset, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "root": self.store.root,
+            "runs": self.runs,
+            "pages": self.pages,
+            "rows": self.rows,
+            "failures": self.failures,
+        }
+
+
+trade_ingestor = TradeIngestor()
@@ -0,0 +1,538 @@
+import abc
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from services.cache import CACHE_SQLITE_PATH, deserialize, serialize
+
+load_dotenv()
+
+# Number of jobs running at once. Inside a job, browser and LLM work is
+# further bounded by BROWSER_MAX_CONCURRENCY / LLM_MAX_CONCURRENCY
+# (services.executor), GMGN pages by GMGN_MAX_PAGES and upstream HTTP by
+# HTTP_MAX_CONNECTIONS (services.http_client).
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# memory: jobs live in this process and are lost on restart; sqlite: jobs
+# are shared by every process using JOB_SQLITE_PATH and survive restarts
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_SQLITE_PATH = os.getenv("JOB_SQLITE_PATH", CACHE_SQLITE_PATH)
+# Seconds a finished job stays available for polling
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+# Seconds a claimed job stays owned by its worker without a heartbeat; a job
+# whose process died is claimed again once its lease expires
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+# Seconds between checks of the store for new jobs, and for status changes
+# made by other processes
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    key: str
+    status: str = QUEUED
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Worker that claimed the job, and until when its claim holds
+    owner: Optional[str] = None
+    lease_until: Optional[float] = None
+
+
+def job_key(kind: str, params: Dict[str, Any]) -> str:
+    """Identity of a job's work; identical unfinished jobs share one run"""
+    encoded = json.dumps([kind, params], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _claimable(job: Job, now: float) -> bool:
+    return job.status == QUEUED or (job.status == RUNNING and (job.lease_until or 0) < now)
+
+
+# ----------------------------
+# Stores
+# ----------------------------
+class JobStore(abc.ABC):
+    """
+    Where job records live between status changes
+
+    Every state change a worker makes is conditional on the record, so
+    several queues (e.g. one per uvicorn worker) can share one store and a
+    job is still run by one of them at a time.
+    """
+
+    @abc.abstractmethod
+    def add(self, job: Job) -> Tuple[Job, bool]:
+        """
+        Store a new job unless an identical one is unfinished
+
+        Returns:
+            The stored job, and whether it is an existing identical one
+        """
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abc.abstractmethod
+    def claim(self, owner: str, lease: float) -> Optional[Job]:
+        """
+        Take the oldest queued job, or a running one whose lease expired
+
+        Args:
+            owner: Id of the claiming worker
+            lease: Seconds the claim holds until renewed
+
+        Returns:
+            The job, now running and owned by owner, or None if there is none
+        """
+
+    @abc.abstractmethod
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Extend owner's claim on a running job; False if it lost the job"""
+
+    @abc.abstractmethod
+    def finish(self, job: Job, owner: str) -> bool:
+        """Store a finished job if owner still holds it; False otherwise"""
+
+    @abc.abstractmethod
+    def prune(self, finished_before: float) -> None:
+        ...
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> Tuple[Job, bool]:
+        with self._lock:
+            for existing in self._jobs.values():
+                if existing.key == job.key and existing.status not in FINISHED:
+                    return existing.model_copy(), True
+            self._jobs[job.id] = job.model_copy()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    def claim(self, owner: str, lease: float) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            jobs = sorted(
+                (job for job in self._jobs.values() if _claimable(job, now)),
+                key=lambda job: job.created_at
+            )
+            if not jobs:
+                return None
+            job = jobs[0]
+            job.status, job.owner, job.lease_until, job.started_at = RUNNING, owner, now + lease, now
+            return job.model_copy()
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != RUNNING or job.owner != owner:
+                return False
+            job.lease_until = time.time() + lease
+            return True
+
+    def finish(self, job: Job, owner: str) -> bool:
+        with self._lock:
+            stored = self._jobs.get(job.id)
+            if stored is None or stored.status != RUNNING or stored.owner != owner:
+                return False
+            self._jobs[job.id] = job.model_copy()
+            return True
+
+    def prune(self, finished_before: float) -> None:
+        with self._lock:
+            for job_id in [
+                job.id for job in self._jobs.values()
+                if job.finished_at is not None and job.finished_at < finished_before
+            ]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job records in a SQLite file, so queued and running jobs survive a
+    restart and every process on the host shares one queue. Results are
+    stored with the cache serializer.
+    """
+
+    _COLUMNS = {"key": "TEXT", "owner": "TEXT", "lease_until": "REAL"}
+
+    def __init__(self, path: str = JOB_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " finished_at REAL,"
+            " record BLOB NOT NULL,"
+            " key TEXT,"
+            " owner TEXT,"
+            " lease_until REAL)"
+        )
+        # Files written before jobs were claimed lack the claim columns
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, kind in self._COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Hold the thread lock and SQLite's write lock for the block"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: Tuple[bytes, Optional[float]]) -> Job:
+        # Heartbeats only touch the lease column, not the record
+        return Job(**{**deserialize(row[0]), "lease_until": row[1]})
+
+    def _write(self, job: Job) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, created_at, finished_at, record, key, owner, lease_until)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.status, job.created_at, job.finished_at, serialize(job.model_dump(mode="json")),
+             job.key, job.owner, job.lease_until),
+        )
+
+    def add(self, job: Job) -> Tuple[Job, bool]:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT record, lease_until FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (job.key, QUEUED, RUNNING),
+            ).fetchone()
+            if row:
+                return self._job(row), True
+            self._write(job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT record, lease_until FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def claim(self, owner: str, lease: float) -> Optional[Job]:
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT record, lease_until FROM jobs"
+                " WHERE status = ? OR (status = ? AND COALESCE(lease_until, 0) < ?)"
+                " ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._job(row)
+            job.status, job.owner, job.lease_until, job.started_at = RUNNING, owner, now + lease, now
+            self._write(job)
+        return job
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + lease, job_id, owner, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job: Job, owner: str) -> bool:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND owner = ? AND status = ?", (job.id, owner, RUNNING)
+            ).fetchone()
+            if row is None:
+                return False
+            self._write(job)
+        return True
+
+    def prune(self, finished_before: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            )
+
+
+def create_job_store(store: Optional[str] = None) -> JobStore:
+    """Build the store selected by JOB_STORE (or the explicit name)"""
+    store = store or JOB_STORE
+    if store == "memory":
+        return MemoryJobStore()
+    if store == "sqlite":
+        return SQLiteJobStore(JOB_SQLITE_PATH)
+    raise ValueError(f"Unknown job store: {store}")
+
+
+# ----------------------------
+# Handlers
+# ----------------------------
+async def _token_report_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    # Imported here so the queue and stores load without the crew, browser
+    # and LLM dependencies of the report
+    from services.report import build_token_report
+
+    report = await build_token_report(**params)
+    return report.model_dump(mode="json")
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    "token-report": _token_report_job,
+}
+
+
+# ----------------------------
+# Queue
+# ----------------------------
+class JobQueue:
+    """
+    Queue of analysis jobs drained by a fixed set of workers
+
+    Workers claim jobs from the store with a lease they renew while the job
+    runs, so queues in several processes can share a SQLite store: each job
+    runs once, and a job whose process died runs again after its lease
+    expires. Submitting a job identical to one still queued or running
+    returns the existing job instead of adding another.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        workers: int = JOB_WORKERS,
+        handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]]] = None,
+        retention: float = JOB_RETENTION,
+        lease: float = JOB_LEASE,
+        poll_interval: float = JOB_POLL_INTERVAL
+    ):
+        self.store = store
+        self.workers = workers
+        self.handlers = handlers or JOB_HANDLERS
+        self.retention = retention
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Dict[str, Job] = {}
+        self._changed: Dict[str, asyncio.Condition] = {}
+        self.submitted = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.lost = 0
+
+    async def start(self) -> None:
+        if self._wakeup is not None:
+            return
+        if self.store is None:
+            self.store = create_job_store()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are claimed again once their leases expire"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Tuple[Job, bool]:
+        """
+        Queue a job
+
+        Args:
+            kind: One of JOB_HANDLERS
+            params: Keyword arguments for the handler (JSON-compatible)
+
+        Returns:
+            The job, and whether an identical unfinished job was reused
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._wakeup is None:
+            await self.start()
+
+        job = Job(
+            id=uuid.uuid4().hex, kind=kind, params=params, key=job_key(kind, params), created_at=time.time()
+        )
+        job, deduplicated = await asyncio.to_thread(self.store.add, job)
+        if deduplicated:
+            self.deduplicated += 1
+        else:
+            self.submitted += 1
+            self._wakeup.set()
+        return job, deduplicated
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        if self.store is None:
+            return None
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _notify(self, job_id: str) -> None:
+        condition = self._changed.get(job_id)
+        if condition is not None:
+            async with condition:
+                condition.notify_all()
+
+    async def _idle(self) -> None:
+        """Wait for a local submit, or the poll interval for other processes' jobs"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _heartbeat(self, job: Job) -> None:
+        """Renew the job's lease until cancelled; returns if the job was lost"""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await asyncio.to_thread(self.store.renew, job.id, self.worker_id, self.lease):
+                    return
+            except Exception as e:
+                # A busy store is retried on the next beat, within the lease
+                print(f"Job heartbeat error: {str(e)}")
+
+    async def _run(self, job: Job) -> None:
+        self._running[job.id] = job
+        await self._notify(job.id)
+        handler = asyncio.create_task(self.handlers[job.kind](job.params))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await asyncio.wait((handler, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            heartbeat.cancel()
+            handler.cancel()
+            self._running.pop(job.id, None)
+
+        if not handler.done() or handler.cancelled():
+            # The lease expired and another worker has claimed the job
+            self.lost += 1
+            print(f"Job {job.id} lost its lease; leaving it to its new owner")
+            return
+        error = handler.exception()
+        if error is not None:
+            job.status, job.error = FAILED, str(error)
+        else:
+            job.status, job.result = SUCCEEDED, handler.result()
+        job.finished_at, job.lease_until = time.time(), None
+        if not await asyncio.to_thread(self.store.finish, job, self.worker_id):
+            self.lost += 1
+            return
+        if job.status == SUCCEEDED:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        await self._notify(job.id)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, self.worker_id, self.lease)
+                if job is None:
+                    await self._idle()
+                    continue
+                await self._run(job)
+                await asyncio.to_thread(self.store.prune, time.time() - self.retention)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job worker error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Return the job once finished, or as it stands when timeout expires"""
+        try:
+            return await asyncio.wait_for(self._wait_finished(job_id), timeout)
+        except asyncio.TimeoutError:
+            return await self.get(job_id)
+
+    async def _wait_finished(self, job_id: str) -> Optional[Job]:
+        async for job in self.watch(job_id):
+            if job.status in FINISHED:
+                return job
+        return None
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """
+        Yield the job now and after every status change until it finishes
+
+        Changes made by this process's workers are seen at once; the store is
+        polled every poll_interval for jobs run by other processes.
+        """
+        condition = self._changed.setdefault(job_id, asyncio.Condition())
+        status = None
+        try:
+            while True:
+                async with condition:
+                    job = await self.get(job_id)
+                    if job is None:
+                        return
+                    if job.status == status:
+                        try:
+                            await asyncio.wait_for(condition.wait(), self.poll_interval)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                status = job.status
+                yield job
+                if status in FINISHED:
+                    return
+        finally:
+            # Other watchers of a finished job have already been notified
+            if status in FINISHED or status is None:
+                self._changed.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "worker_id": self.worker_id,
+            "store": type(self.store).__name__ if self.store else None,
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "lost": self.lost,
+        }
+
+
+job_queue = JobQueue()
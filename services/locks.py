@@ -0,0 +1,25 @@
+import fcntl
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Exclusive lock on <path>.lock, held for the block
+
+    The lock is an flock on a separate file, so it coordinates every process
+    (e.g. uvicorn workers) that shares the directory, and is released if the
+    holder dies. It is not reentrant; threads of one process need their own
+    lock as well.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -15,10 +15,20 @@ from datetime import datetime
 class LiquidityPool(BaseModel):
     pairAddress: str
     totalLiquidityUsd: float
+    platform: Optional[str] = None
+    pair: Optional[str] = None
+    liquidity: Optional[float] = None  # USD millions
+    change: Optional[float] = None  # 24h percent change
 
 class WhaleTransaction(BaseModel):
     transactionType: str  # "buy" or "sell"
     amountUsd: float
+    address: Optional[str] = None
+    amount: Optional[float] = None  # Token amount, negative for sells
+    asset: Optional[str] = None
+    txHash: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    time_ago: Optional[str] = None
 
 class TokenData(BaseModel):
     tokenAddress: str
@@ -56,6 +66,11 @@ class DexAnalyticsResponse(BaseModel):
     traders_change: float
     liquidity_pool: List[LiquidityPool]
     whale_transactions: List[WhaleTransaction]
+    trades: Optional[int] = None
+    unique_buyers: Optional[int] = None
+    unique_sellers: Optional[int] = None
+    whale_threshold_usd: Optional[float] = None
+    errors: List[str] = []
 
 class FeatureEngineering(BaseModel):
     name: str
@@ -107,6 +122,38 @@ class RiskAssessmentResponse(BaseModel):
     concentrationRiskPercentage: int
     smartContractRisk: str
     smartContractRiskPercentage: int
+    # From the wallet index (see SmartMoneyResponse.risk_level / risk_percentage)
+    smartMoneyRisk: Optional[str] = None
+    smartMoneyRiskPercentage: Optional[int] = None
+
+class SmartMoneyWallet(BaseModel):
+    address: Optional[str] = None
+    smart: bool
+    holds: bool
+    bought_usd: float
+    sold_usd: float
+    early_tokens: int
+    other_tokens: int
+    realized_pnl_usd: float
+    closed_positions: int
+    hit_rate: Optional[float] = None
+
+class SmartMoneyResponse(BaseModel):
+    token_address: str
+    network: str
+    score: float
+    tracked_tokens: int
+    wallets: int
+    early_wallets: int
+    smart_wallets: int
+    smart_holders: int
+    smart_buy_usd: float
+    smart_net_flow_usd: float
+    top_wallets: List[SmartMoneyWallet]
+    signal: BlockchainRecognition
+    risk_level: str
+    risk_percentage: int
+    errors: List[str] = []
 
 class HistoricalResponse(BaseModel):
     roi: int
@@ -121,9 +168,15 @@ class HistoricalResponse(BaseModel):
     responseTime: float
 
 class CombinedTokenData(BaseModel):
-    token_price_data: dict
-    gmgn_info: dict
-    dex_analytics: DexAnalyticsResponse
-    ai_signals: AISignalsResponse
-    risk_assessment: RiskAssessmentResponse
-    historical_data: HistoricalResponse
+    token_price_data: Optional[dict] = None
+    gmgn_info: Optional[dict] = None
+    bitquery_info: Optional[dict] = None
+    twitter_data: Optional[dict] = None
+    analyses: Dict[str, Any] = {}
+    dex_analytics: Optional[DexAnalyticsResponse] = None
+    smart_money: Optional[SmartMoneyResponse] = None
+    ai_signals: Optional[AISignalsResponse] = None
+    risk_assessment: Optional[RiskAssessmentResponse] = None
+    historical_data: Optional[HistoricalResponse] = None
+    errors: Dict[str, str] = {}
+    timings: Dict[str, float] = {}
@@ -1,14 +1,24 @@
 import requests
+import httpx
 from dotenv import load_dotenv
 import os
 import json
 from pydantic import BaseModel
 from typing import Optional, Dict
+from services.http_client import get_async_client
+from services.cache import ResponseCache
+from services import upstream
 
 load_dotenv()
 MORALIS_API_KEY = os.getenv("MORALIS_API_KEY")
+MORALIS_BASE_URL = os.getenv("MORALIS_BASE_URL", "https://deep-index.moralis.io/api/v2.2")
 BASE_CHAIN = 'base'
 
+# Pair stats cache, keyed by (chain, pairAddress)
+MORALIS_CACHE_TTL = float(os.getenv("MORALIS_CACHE_TTL", "15"))
+MORALIS_CACHE_SIZE = int(os.getenv("MORALIS_CACHE_SIZE", "1024"))
+pair_stats_cache = ResponseCache("moralis_pair_stats", ttl=MORALIS_CACHE_TTL, maxsize=MORALIS_CACHE_SIZE)
+
 class PricePercentChange(BaseModel):
     five_min: float
     one_hour: float
@@ -52,16 +62,20 @@ class TokenData(BaseModel):
     buyers: Volume
     sellers: Volume
 
-def fetch_token_price(pairAddress)->TokenData :
-    url = f"https://deep-index.moralis.io/api/v2.2/pairs/{pairAddress}/stats?chain=base"
-    
+def _pair_stats_request(pairAddress, chain=BASE_CHAIN):
+    url = f"{MORALIS_BASE_URL}/pairs/{pairAddress}/stats?chain={chain}"
+
     headers = {
         "Accept": "application/json",
         "X-API-Key": MORALIS_API_KEY
     }
+    return url, headers
+
+def fetch_token_price(pairAddress)->TokenData :
+    url, headers = _pair_stats_request(pairAddress)
     
     try:
-        response = requests.get(url, headers=headers)
+        response = upstream.moralis.request_sync("GET", url, headers=headers)
         response.raise_for_status()
         
         return response.json()
@@ -72,6 +86,36 @@ def fetch_token_price(pairAddress)->TokenData :
         print(f"An error occurred: {err}")
         return {"error": str(err)}
 
+async def fetch_token_price_async(pairAddress, chain=BASE_CHAIN, refresh=False)->TokenData :
+    """
+    Non-blocking variant of fetch_token_price using the shared async client
+
+    Successful responses are served from pair_stats_cache for MORALIS_CACHE_TTL
+    seconds, and concurrent requests for the same pair share one upstream call.
+    refresh=True skips the cached entry and replaces it.
+    """
+    return await pair_stats_cache.get_or_fetch(
+        (chain, pairAddress.lower()),
+        lambda: _fetch_pair_stats(pairAddress, chain),
+        should_cache=lambda data: "error" not in data,
+        refresh=refresh
+    )
+
+async def _fetch_pair_stats(pairAddress, chain=BASE_CHAIN)->TokenData :
+    url, headers = _pair_stats_request(pairAddress, chain)
+
+    try:
+        response = await upstream.moralis.request(get_async_client(), "GET", url, headers=headers)
+        response.raise_for_status()
+
+        return response.json()
+    except httpx.HTTPStatusError as http_err:
+        print(f"HTTP error occurred: {http_err}")
+        return {"error": str(http_err)}
+    except Exception as err:
+        print(f"An error occurred: {err}")
+        return {"error": str(err)}
+
 # if __name__ == "__main__":
 #     token_address = "0x98c8f03094a9e65ccedc14c40130e4a5dd0ce14fb12ea58cbeac11f662b458b9"
 #     price_data = fetch_token_price(token_address)
@@ -0,0 +1,165 @@
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Set to 0 to send every token to the LLMs
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "1") == "1"
+PRESCREEN_MIN_LIQUIDITY_USD = float(os.getenv("PRESCREEN_MIN_LIQUIDITY_USD", "1000"))
+PRESCREEN_MIN_VOLUME_24H_USD = float(os.getenv("PRESCREEN_MIN_VOLUME_24H_USD", "100"))
+PRESCREEN_MIN_BUYERS_24H = float(os.getenv("PRESCREEN_MIN_BUYERS_24H", "1"))
+# Minimum composite score in [0, 1]; 0 leaves only the hard floors above
+PRESCREEN_MIN_SCORE = float(os.getenv("PRESCREEN_MIN_SCORE", "0"))
+# Weight of the smart-money score (services.wallets) in the composite, for
+# tokens in the wallet index
+PRESCREEN_SMART_MONEY_WEIGHT = float(os.getenv("PRESCREEN_SMART_MONEY_WEIGHT", "0.2"))
+
+# Moralis pair-stats windows, as returned by the API and as named in
+# services.moralis.TokenData
+WINDOWS = (("5min", "five_min"), ("1h", "one_hour"), ("4h", "four_hour"), ("24h", "twenty_four_hour"))
+# Shorter windows count more towards momentum and buy pressure
+WINDOW_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+WINDOWED_FIELDS = ("pricePercentChange", "buyVolume", "sellVolume", "totalVolume", "buyers", "sellers")
+
+
+def _number(value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+def _windows(stats: Dict[str, Any], field: str) -> List[float]:
+    values = stats.get(field) or {}
+    return [_number(values.get(api_key, values.get(model_key))) for api_key, model_key in WINDOWS]
+
+
+def pair_stats_arrays(pair_stats: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Stack Moralis pair stats into arrays: one (n, 4) array per windowed field
+    (5m, 1h, 4h, 24h) plus `liquidity` of shape (n,). Missing values are NaN.
+    """
+    arrays = {
+        field: np.array([_windows(stats, field) for stats in pair_stats], dtype=float).reshape(-1, len(WINDOWS))
+        for field in WINDOWED_FIELDS
+    }
+    arrays["liquidity"] = np.array([_number(stats.get("totalLiquidityUsd")) for stats in pair_stats], dtype=float)
+    return arrays
+
+
+def _weighted(values: np.ndarray) -> np.ndarray:
+    """Window-weighted mean per row, ignoring NaN windows"""
+    present = ~np.isnan(values)
+    weights = present * WINDOW_WEIGHTS
+    total = weights.sum(axis=1)
+    summed = np.where(present, values, 0.0) @ WINDOW_WEIGHTS
+    return np.divide(summed, total, out=np.zeros_like(summed), where=total > 0)
+
+
+def compute_features(
+    arrays: Dict[str, np.ndarray],
+    smart_money: Optional[np.ndarray] = None,
+    smart_money_weight: float = PRESCREEN_SMART_MONEY_WEIGHT
+) -> Dict[str, np.ndarray]:
+    """
+    Per-token features, each of shape (n,)
+
+    momentum: window-weighted price change in percent
+    buy_pressure: window-weighted (buy - sell) / (buy + sell) volume, in [-1, 1]
+    buyer_ratio: 24h buyers / (buyers + sellers), in [0, 1]
+    turnover: 24h volume / liquidity
+    liquidity_risk: 1 for liquidity at or below $1k, falling to 0 at $1M, log-scaled
+    smart_money: share of buy volume from smart-money wallets, in [0, 1]
+        (0 where smart_money is NaN, i.e. the token is not indexed)
+    score: composite in [0, 1] of the above; smart_money only counts, with
+        smart_money_weight, for tokens where it is known
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        buys, sells = arrays["buyVolume"], arrays["sellVolume"]
+        traded = buys + sells
+        pressure = np.where(traded > 0, (buys - sells) / traded, np.nan)
+
+        buyers, sellers = arrays["buyers"][:, 3], arrays["sellers"][:, 3]
+        participants = buyers + sellers
+        buyer_ratio = np.where(participants > 0, buyers / participants, 0.0)
+
+        liquidity = np.nan_to_num(arrays["liquidity"], nan=0.0)
+        volume_24h = np.nan_to_num(arrays["totalVolume"][:, 3], nan=0.0)
+        turnover = np.where(liquidity > 0, volume_24h / liquidity, 0.0)
+        liquidity_risk = np.clip((6 - np.log10(np.maximum(liquidity, 1.0))) / 3, 0.0, 1.0)
+
+    momentum = _weighted(arrays["pricePercentChange"])
+    buy_pressure = _weighted(pressure)
+
+    score = (
+        0.3 * (np.tanh(momentum / 20) + 1) / 2
+        + 0.3 * (buy_pressure + 1) / 2
+        + 0.2 * buyer_ratio
+        + 0.2 * (1 - liquidity_risk)
+    )
+    smart = np.full(len(score), np.nan) if smart_money is None else np.asarray(smart_money, dtype=float)
+    known = ~np.isnan(smart)
+    score = np.where(known, (1 - smart_money_weight) * score + smart_money_weight * np.nan_to_num(smart), score)
+    return {
+        "momentum": momentum,
+        "buy_pressure": buy_pressure,
+        "buyer_ratio": buyer_ratio,
+        "turnover": turnover,
+        "liquidity_risk": liquidity_risk,
+        "liquidity_usd": liquidity,
+        "volume_24h_usd": volume_24h,
+        "buyers_24h": np.nan_to_num(buyers, nan=0.0),
+        "smart_money": np.nan_to_num(smart, nan=0.0),
+        "score": score,
+    }
+
+
+def prescreen(
+    pair_stats: Sequence[Dict[str, Any]],
+    min_liquidity: float = PRESCREEN_MIN_LIQUIDITY_USD,
+    min_volume_24h: float = PRESCREEN_MIN_VOLUME_24H_USD,
+    min_buyers_24h: float = PRESCREEN_MIN_BUYERS_24H,
+    min_score: float = PRESCREEN_MIN_SCORE,
+    smart_money: Optional[Sequence[Optional[float]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score Moralis pair stats for many tokens at once and decide which are
+    worth an LLM analysis
+
+    Args:
+        pair_stats: Moralis pair stats responses
+        min_liquidity: Liquidity floor in USD
+        min_volume_24h: 24h volume floor in USD
+        min_buyers_24h: Minimum number of 24h buyers
+        min_score: Minimum composite score
+        smart_money: Smart-money score per input, None where unknown
+
+    Returns:
+        One {"passed", "reasons", "features"} dict per input, in order
+    """
+    if not pair_stats:
+        return []
+    smart = None if smart_money is None else np.array([np.nan if v is None else v for v in smart_money], dtype=float)
+    features = compute_features(pair_stats_arrays(pair_stats), smart)
+    checks = (
+        (features["liquidity_usd"] < min_liquidity, f"liquidity below ${min_liquidity:g}"),
+        (features["volume_24h_usd"] < min_volume_24h, f"24h volume below ${min_volume_24h:g}"),
+        (features["buyers_24h"] < min_buyers_24h, f"fewer than {min_buyers_24h:g} buyers in 24h"),
+        (features["score"] < min_score, f"score below {min_score:g}"),
+    )
+    failed = np.stack([mask for mask, _ in checks], axis=1)
+    rows = np.column_stack([features[name] for name in features]).round(4).tolist()
+
+    return [
+        {
+            "passed": not failed[i].any(),
+            "reasons": [reason for (_, reason), hit in zip(checks, failed[i]) if hit],
+            "features": dict(zip(features, rows[i])),
+        }
+        for i in range(len(pair_stats))
+    ]
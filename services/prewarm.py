@@ -0,0 +1,305 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from services.moralis import fetch_token_price_async
+from services.bitq import get_bitquery_info
+from services.gmgn_crawler import get_gmgn_info
+from services.ingest import trade_ingestor
+from services.holders import holder_tracker
+from services.wallets import wallet_index
+from services.report import REPORT_NETWORK
+
+load_dotenv()
+
+# Pairs kept warm regardless of traffic: "pair" or "pair:token", comma separated
+PREWARM_WATCHLIST = os.getenv("PREWARM_WATCHLIST", "")
+# Base refresh interval per source in seconds, kept below the cache TTLs so
+# hot entries are replaced before they expire. "ingest" appends new trades
+# and transfers to the local trade store (services.ingest) and folds the
+# new trades into the wallet index (services.wallets); "holders" takes
+# the day's holder snapshot if missing (services.holders). A source with an
+# interval of 0 is not refreshed.
+PREWARM_INTERVALS: Dict[str, float] = {
+    "moralis": float(os.getenv("PREWARM_MORALIS_INTERVAL", "10")),
+    "bitquery": float(os.getenv("PREWARM_BITQUERY_INTERVAL", "90")),
+    "gmgn": float(os.getenv("PREWARM_GMGN_INTERVAL", "240")),
+    "ingest": float(os.getenv("PREWARM_INGEST_INTERVAL", "0")),
+    "holders": float(os.getenv("PREWARM_HOLDERS_INTERVAL", "0")),
+}
+# Each interval is randomly stretched or shrunk by up to this fraction
+PREWARM_JITTER = float(os.getenv("PREWARM_JITTER", "0.1"))
+PREWARM_MAX_CONCURRENCY = int(os.getenv("PREWARM_MAX_CONCURRENCY", "4"))
+# Also watch pairs requested at least PREWARM_AUTO_MIN_REQUESTS times within
+# about one PREWARM_HALF_LIFE, up to PREWARM_MAX_TOKENS pairs in total. An
+# auto-watched pair is dropped, and not auto-watched again, as soon as a
+# refresh of it fails upstream.
+PREWARM_AUTO = os.getenv("PREWARM_AUTO", "0") == "1"
+PREWARM_AUTO_MIN_REQUESTS = int(os.getenv("PREWARM_AUTO_MIN_REQUESTS", "3"))
+PREWARM_MAX_TOKENS = int(os.getenv("PREWARM_MAX_TOKENS", "50"))
+# Request counts decay with this half-life (seconds). A pair requested at
+# least once per half-life refreshes at the base interval; colder pairs back
+# off up to PREWARM_MAX_BACKOFF times slower, and auto-watched pairs colder
+# than that are dropped.
+PREWARM_HALF_LIFE = float(os.getenv("PREWARM_HALF_LIFE", "600"))
+PREWARM_MAX_BACKOFF = float(os.getenv("PREWARM_MAX_BACKOFF", "8"))
+
+
+class WatchedPair:
+    def __init__(self, pair_address: str, token_address: Optional[str] = None, pinned: bool = False):
+        self.pair_address = pair_address
+        self.token_address = token_address
+        self.pinned = pinned
+        self.requests = 0
+        self.refreshes = 0
+        self.failures = 0
+        self._heat = 0.0
+        self._heat_at = time.monotonic()
+
+    def heat(self, now: float) -> float:
+        """Requests seen, each weighted down by half every PREWARM_HALF_LIFE seconds"""
+        return self._heat * math.pow(0.5, (now - self._heat_at) / PREWARM_HALF_LIFE)
+
+    def record_request(self, now: float) -> None:
+        self._heat = self.heat(now) + 1
+        self._heat_at = now
+        self.requests += 1
+
+
+def parse_watchlist(value: str) -> List[Tuple[str, Optional[str]]]:
+    entries = []
+    for item in value.split(","):
+        pair, _, token = item.strip().partition(":")
+        if pair:
+            entries.append((pair, token or None))
+    return entries
+
+
+class Prewarmer:
+    """
+    Background refresher that keeps the Moralis, Bitquery and GMGN caches
+    warm for watched pairs, so requests for them are served from cache
+
+    Pairs come from the static watchlist and, with auto=True, from repeated
+    requests; unwatched pairs' request counts and the pairs rejected after a
+    failed refresh are each kept for the max_tokens * 20 most recent pairs.
+    Each source is refreshed on its own interval, stretched for
+    pairs that are rarely requested, with jitter so refreshes do not line
+    up, and at most max_concurrency refreshes run at once.
+    """
+
+    def __init__(
+        self,
+        watchlist: str = PREWARM_WATCHLIST,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: float = PREWARM_JITTER,
+        max_concurrency: int = PREWARM_MAX_CONCURRENCY,
+        auto: bool = PREWARM_AUTO,
+        max_tokens: int = PREWARM_MAX_TOKENS,
+        max_backoff: float = PREWARM_MAX_BACKOFF,
+        auto_min_requests: int = PREWARM_AUTO_MIN_REQUESTS
+    ):
+        self.intervals = {
+            source: interval
+            for source, interval in {**PREWARM_INTERVALS, **(intervals or {})}.items()
+            if interval > 0
+        }
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.auto = auto
+        self.max_tokens = max_tokens
+        self.max_backoff = max_backoff
+        self.auto_min_requests = auto_min_requests
+        self.pairs: Dict[str, WatchedPair] = {}
+        self._candidates: "OrderedDict[str, WatchedPair]" = OrderedDict()
+        self._rejected: "OrderedDict[str, None]" = OrderedDict()
+        for pair, token in parse_watchlist(watchlist):
+            self.pairs[pair.lower()] = WatchedPair(pair, token, pinned=True)
+
+        self._due: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.dropped = 0
+        self.rejected = 0
+
+    # ----------------------------
+    # Request path
+    # ----------------------------
+    def record_request(self, pair_address: str, token_address: Optional[str] = None) -> None:
+        """
+        Count a request for a pair, watching it once it has been requested
+        often enough if auto-watching is on and there is room
+        """
+        now = time.monotonic()
+        key = pair_address.lower()
+        watched = self.pairs.get(key)
+        if watched is not None:
+            watched.token_address = watched.token_address or token_address
+            watched.record_request(now)
+            return
+        if not self.auto or key in self._rejected:
+            return
+
+        candidate = self._candidates.pop(key, None) or WatchedPair(pair_address, token_address)
+        candidate.token_address = candidate.token_address or token_address
+        candidate.record_request(now)
+        recent = candidate.heat(now) >= self.auto_min_requests / 2
+        if candidate.requests < self.auto_min_requests or not recent or len(self.pairs) >= self.max_tokens:
+            self._candidates[key] = candidate
+            if len(self._candidates) > self.max_tokens * 20:
+                self._candidates.popitem(last=False)
+            return
+
+        self.pairs[key] = candidate
+        # The request itself fills the caches, so the first refresh is one interval out
+        if self._loop_task is not None:
+            for source in self.intervals:
+                self._schedule(key, source, self.interval(candidate, source, now))
+
+    def _reject(self, key: str, watched: WatchedPair) -> None:
+        """Stop watching an auto-watched pair whose upstream refresh failed"""
+        if watched.pinned or self.pairs.get(key) is not watched:
+            return
+        del self.pairs[key]
+        self._rejected[key] = None
+        if len(self._rejected) > self.max_tokens * 20:
+            self._rejected.popitem(last=False)
+        self.rejected += 1
+
+    # ----------------------------
+    # Scheduling
+    # ----------------------------
+    def interval(self, watched: WatchedPair, source: str, now: float) -> float:
+        """Seconds until the next refresh of one source for a pair"""
+        heat = watched.heat(now)
+        backoff = max(1.0, min(self.max_backoff, 1 / heat)) if heat > 0 else self.max_backoff
+        return self.intervals[source] * backoff * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _schedule(self, key: str, source: str, delay: float) -> None:
+        heapq.heappush(self._due, (time.monotonic() + delay, next(self._seq), key, source))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _is_cold(self, watched: WatchedPair, now: float) -> bool:
+        return not watched.pinned and watched.heat(now) < 1 / self.max_backoff
+
+    async def start(self) -> None:
+        if self._loop_task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._limit = asyncio.Semaphore(self.max_concurrency)
+        for key in self.pairs:
+            # Spread the initial refreshes over the first interval
+            for source, interval in self.intervals.items():
+                self._schedule(key, source, random.uniform(0, interval) if source != "moralis" else 0)
+        self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        tasks = [task for task in [self._loop_task, *self._running] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._running.clear()
+        self._due.clear()
+
+    async def _loop(self) -> None:
+        while True:
+            now = time.monotonic()
+            while self._due and self._due[0][0] <= now:
+                _, _, key, source = heapq.heappop(self._due)
+                watched = self.pairs.get(key)
+                if watched is None:
+                    continue
+                if self._is_cold(watched, now):
+                    del self.pairs[key]
+                    self.dropped += 1
+                    continue
+                task = asyncio.create_task(self._refresh(key, watched, source))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            self._wakeup.clear()
+            timeout = self._due[0][0] - now if self._due else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, key: str, watched: WatchedPair, source: str) -> None:
+        try:
+            async with self._limit:
+                ok = await self._fetch(watched, source)
+            if ok:
+                watched.refreshes += 1
+            elif ok is False:
+                watched.failures += 1
+                self._reject(key, watched)
+        except Exception as e:
+            watched.failures += 1
+            self._reject(key, watched)
+            print(f"Prewarm {source} for {watched.pair_address} failed: {str(e)}")
+        finally:
+            if self.pairs.get(key) is watched:
+                self._schedule(key, source, self.interval(watched, source, time.monotonic()))
+
+    async def _fetch(self, watched: WatchedPair, source: str) -> Optional[bool]:
+        """Refresh one source; False if upstream failed, None if skipped"""
+        if source == "moralis":
+            data = await fetch_token_price_async(watched.pair_address, refresh=True)
+            if "error" in data:
+                return False
+            watched.token_address = watched.token_address or data.get("tokenAddress")
+            return True
+        if watched.token_address is None:
+            # Learned from the next Moralis refresh
+            return None
+        if source == "bitquery":
+            data = await get_bitquery_info(watched.token_address, REPORT_NETWORK, refresh=True)
+            return not data.get("errors") and "error" not in data
+        if source == "ingest":
+            results = await trade_ingestor.ingest(watched.token_address, REPORT_NETWORK)
+            await asyncio.to_thread(wallet_index.update, watched.token_address, REPORT_NETWORK)
+            return not any(result["error"] for result in results.values())
+        if source == "holders":
+            result = await holder_tracker.snapshot(watched.token_address, REPORT_NETWORK)
+            return result["error"] is None
+        response = await get_gmgn_info(watched.token_address, refresh=True)
+        return response.status == "success"
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "running": self._loop_task is not None,
+            "watched": len(self.pairs),
+            "refreshing": len(self._running),
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "candidates": len(self._candidates),
+            "pairs": [
+                {
+                    "pair_address": watched.pair_address,
+                    "token_address": watched.token_address,
+                    "pinned": watched.pinned,
+                    "requests": watched.requests,
+                    "heat": round(watched.heat(now), 3),
+                    "refreshes": watched.refreshes,
+                    "failures": watched.failures,
+                }
+                for watched in self.pairs.values()
+            ],
+        }
+
+
+prewarmer = Prewarmer()
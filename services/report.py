@@ -0,0 +1,284 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from services.moralis import fetch_token_price_async
+from services.bitq import get_bitquery_info
+from services.gmgn_crawler import get_gmgn_info
+from services.x import search_twitter, SearchType
+from services.wallets import get_smart_money
+from services.dex_analytics import get_dex_analytics
+from services.agents import crew, gngm_crew, moralis_crew, predict_crew, twitter_crew, run_crew_analysis
+from services.models import CombinedTokenData
+
+load_dotenv()
+
+# Per-step timeouts in seconds. A step that runs over is reported in
+# CombinedTokenData.errors and the rest of the report is still returned.
+SOURCE_TIMEOUTS: Dict[str, float] = {
+    "moralis": float(os.getenv("REPORT_MORALIS_TIMEOUT", "10")),
+    "bitquery": float(os.getenv("REPORT_BITQUERY_TIMEOUT", "20")),
+    "gmgn": float(os.getenv("REPORT_GMGN_TIMEOUT", "30")),
+    "twitter": float(os.getenv("REPORT_TWITTER_TIMEOUT", "60")),
+    "smart_money": float(os.getenv("REPORT_SMART_MONEY_TIMEOUT", "20")),
+    "dex_analytics": float(os.getenv("REPORT_DEX_ANALYTICS_TIMEOUT", "30")),
+    "analysis": float(os.getenv("REPORT_ANALYSIS_TIMEOUT", "90")),
+}
+
+REPORT_NETWORK = os.getenv("REPORT_NETWORK", "base")
+REPORT_MAX_TWEETS = int(os.getenv("REPORT_MAX_TWEETS", "20"))
+TWITTER_USERNAME = os.getenv("TWITTER_USERNAME")
+TWITTER_PASSWORD = os.getenv("TWITTER_PASSWORD")
+
+
+def _source_error(result: Any) -> Optional[str]:
+    """Error reported in-band by a data source, if any"""
+    if hasattr(result, "model_dump"):
+        result = result.model_dump()
+    if not isinstance(result, dict):
+        return None
+    if result.get("error"):
+        return str(result["error"])
+    if result.get("status") in ("error", "failed"):
+        return "failed"
+    return None
+
+
+class TokenReport:
+    """
+    Runs every data source for one token concurrently and starts each
+    analysis crew as soon as its own input has arrived.
+
+    Each step has its own timeout. Failed or timed-out steps are recorded in
+    `errors` and leave their section empty instead of failing the report.
+    stream() yields every section as soon as it is ready instead.
+    """
+
+    def __init__(
+        self,
+        pair_address: str,
+        token_address: Optional[str] = None,
+        query: Optional[str] = None,
+        network: str = REPORT_NETWORK,
+        bypass_cache: bool = False,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.pair_address = pair_address
+        self.token_address = token_address
+        self.query = query
+        self.network = network
+        self.bypass_cache = bypass_cache
+        self.timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+        self.results: Dict[str, Any] = {}
+        self.analyses: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._events: Optional[asyncio.Queue] = None
+
+    def _publish(self, section: str, data: Any) -> None:
+        if self._events is not None:
+            self._events.put_nowait({"section": section, "data": data, "error": self.errors.get(section)})
+
+    async def _step(self, name: str, timeout_key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one step under its timeout; returns None if it failed"""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(func(), self.timeouts[timeout_key])
+            error = _source_error(result)
+        except asyncio.TimeoutError:
+            result, error = None, f"timed out after {self.timeouts[timeout_key]:g}s"
+        except Exception as e:
+            result, error = None, str(e)
+        self.timings[name] = round(time.perf_counter() - start, 3)
+        if error:
+            self.errors[name] = error
+            return None
+        return result
+
+    async def _analyze(self, name: str, crew_obj, data: Any) -> None:
+        if data is None:
+            return
+        result = await self._step(
+            f"{name}_analysis", "analysis",
+            lambda: run_crew_analysis(crew_obj, {"data": data}, bypass_cache=self.bypass_cache)
+        )
+        if result is not None:
+            self.analyses[name] = result
+        self._publish(f"{name}_analysis", result)
+
+    async def _moralis(self) -> Optional[Dict[str, Any]]:
+        data = await self._step(
+            "moralis", "moralis", lambda: fetch_token_price_async(self.pair_address, self.network)
+        )
+        self.results["moralis"] = data
+        self._publish("moralis", data)
+        return data
+
+    async def _token_details(self, moralis_task: "asyncio.Task") -> None:
+        # Sources keyed on the token rather than the pair wait for Moralis
+        # only when the caller did not pass the token address / search query.
+        if self.token_address is None or self.query is None:
+            price_data = await moralis_task or {}
+            self.token_address = self.token_address or price_data.get("tokenAddress")
+            symbol = price_data.get("tokenSymbol")
+            self.query = self.query or (f"${symbol}" if symbol else self.token_address)
+
+    async def _bitquery(self, details: "asyncio.Task") -> Optional[Dict[str, Any]]:
+        await details
+        if not self.token_address:
+            self.errors["bitquery"] = "token address unknown"
+            self._publish("bitquery", None)
+            return None
+        data = await self._step(
+            "bitquery", "bitquery", lambda: get_bitquery_info(self.token_address, self.network)
+        )
+        self.results["bitquery"] = data
+        self._publish("bitquery", data)
+        return data
+
+    async def _gmgn(self, details: "asyncio.Task") -> Optional[Dict[str, Any]]:
+        await details
+        if not self.token_address:
+            self.errors["gmgn"] = "token address unknown"
+            self._publish("gmgn", None)
+            return None
+        response = await self._step("gmgn", "gmgn", lambda: get_gmgn_info(self.token_address))
+        data = response.model_dump(exclude={"markdown"}) if response is not None else None
+        self.results["gmgn"] = data
+        self._publish("gmgn", data)
+        return data
+
+    async def _twitter(self, details: "asyncio.Task") -> Optional[Dict[str, Any]]:
+        await details
+        if not self.query:
+            self.errors["twitter"] = "search query unknown"
+            self._publish("twitter", None)
+            return None
+        response = await self._step(
+            "twitter", "twitter",
+            lambda: search_twitter(
+                self.query, SearchType.LATEST, REPORT_MAX_TWEETS,
+                username=TWITTER_USERNAME, password=TWITTER_PASSWORD
+            )
+        )
+        data = response.model_dump(mode="json") if response is not None else None
+        self.results["twitter"] = data
+        self._publish("twitter", data)
+        return data
+
+    async def _smart_money(self, details: "asyncio.Task") -> Optional[Dict[str, Any]]:
+        # Scored from the local wallet index; the prediction crew sees it
+        # alongside the other sources
+        await details
+        if not self.token_address:
+            self.errors["smart_money"] = "token address unknown"
+            self._publish("smart_money", None)
+            return None
+        response = await self._step(
+            "smart_money", "smart_money", lambda: get_smart_money(self.token_address, self.network)
+        )
+        data = response.model_dump(mode="json") if response is not None else None
+        self.results["smart_money"] = data
+        self._publish("smart_money", data)
+        return data
+
+    async def _dex_analytics(self, details: "asyncio.Task") -> Optional[Dict[str, Any]]:
+        # Ingests the token's new trades into the local store first
+        await details
+        if not self.token_address:
+            self.errors["dex_analytics"] = "token address unknown"
+            self._publish("dex_analytics", None)
+            return None
+        response = await self._step(
+            "dex_analytics", "dex_analytics",
+            lambda: get_dex_analytics(self.token_address, self.pair_address, self.network)
+        )
+        data = response.model_dump(mode="json") if response is not None else None
+        self.results["dex_analytics"] = data
+        self._publish("dex_analytics", data)
+        return data
+
+    async def run(self) -> CombinedTokenData:
+        moralis = asyncio.create_task(self._moralis())
+        details = asyncio.create_task(self._token_details(moralis))
+        sources = {
+            "moralis": moralis,
+            "bitquery": asyncio.create_task(self._bitquery(details)),
+            "gmgn": asyncio.create_task(self._gmgn(details)),
+            "twitter": asyncio.create_task(self._twitter(details)),
+            "smart_money": asyncio.create_task(self._smart_money(details)),
+            "dex_analytics": asyncio.create_task(self._dex_analytics(details)),
+        }
+        crews = {"moralis": moralis_crew, "bitquery": crew, "gmgn": gngm_crew, "twitter": twitter_crew}
+
+        async def analyze_when_ready(name: str) -> None:
+            await self._analyze(name, crews[name], await sources[name])
+
+        async def predict_when_ready() -> None:
+            await asyncio.gather(*sources.values())
+            data = {name: result for name, result in self.results.items() if result is not None}
+            await self._analyze("prediction", predict_crew, data or None)
+
+        await asyncio.gather(*[analyze_when_ready(name) for name in crews], predict_when_ready())
+        self.timings["total"] = round(time.perf_counter() - self._started, 3)
+
+        return CombinedTokenData(
+            token_price_data=self.results.get("moralis"),
+            gmgn_info=self.results.get("gmgn"),
+            bitquery_info=self.results.get("bitquery"),
+            twitter_data=self.results.get("twitter"),
+            smart_money=self.results.get("smart_money"),
+            dex_analytics=self.results.get("dex_analytics"),
+            analyses=self.analyses,
+            errors=self.errors,
+            timings=self.timings
+        )
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the report, yielding {"section", "data", "error"} for each source
+        and analysis as it completes, then a final "done" event carrying the
+        errors and timings
+        """
+        self._events = asyncio.Queue()
+
+        async def produce():
+            try:
+                await self.run()
+            finally:
+                self._events.put_nowait(None)
+
+        task = asyncio.create_task(produce())
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+            await task
+            yield {"section": "done", "data": {"errors": self.errors, "timings": self.timings}, "error": None}
+        finally:
+            task.cancel()
+
+
+async def build_token_report(
+    pair_address: str,
+    token_address: Optional[str] = None,
+    query: Optional[str] = None,
+    network: str = REPORT_NETWORK,
+    bypass_cache: bool = False
+) -> CombinedTokenData:
+    """
+    Build the combined report for a token from all data sources and crews
+
+    Args:
+        pair_address: DEX pair address used for Moralis pair stats
+        token_address: Token contract address for Bitquery and GMGN (taken from Moralis if omitted)
+        query: Twitter search query (the token's $SYMBOL if omitted)
+        network: Blockchain network
+        bypass_cache: Re-run the crews even if a cached analysis matches
+
+    Returns:
+        CombinedTokenData with whatever sections succeeded
+    """
+    report = TokenReport(pair_address, token_address, query, network, bypass_cache)
+    return await report.run()
@@ -0,0 +1,331 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Responses worth retrying: rate limited or a transient server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Every provider registers itself here so its counters can be reported
+_registry: List["Provider"] = []
+
+
+def _env(provider: str, setting: str, default: str) -> str:
+    return os.getenv(f"{provider.upper()}_{setting}", default)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while a provider's circuit is open"""
+
+
+# ----------------------------
+# Rate limiting
+# ----------------------------
+class TokenBucket:
+    """
+    Token bucket whose rate adapts to the provider (AIMD)
+
+    A 429 halves the current rate (down to min_rate); every successful call
+    adds back a small step until the configured rate is reached again. A
+    rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: float, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """Take a token; returns how long the caller must wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            delay = -self._tokens / self.rate
+            self.throttled += 1
+            self.waited += delay
+            return delay
+
+    def on_rate_limited(self) -> None:
+        if self.rate > 0:
+            with self._lock:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        if 0 < self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "burst": self.burst,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited, 3),
+        }
+
+
+# ----------------------------
+# Circuit breaker
+# ----------------------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls and rejects calls for
+    `reset_timeout` seconds; then lets one trial call through (half-open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.state = "closed"
+                self._failures = 0
+                return
+            self._failures += 1
+            if self.state == "half-open" or self._failures >= self.threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give up an unfinished call without judging the upstream by it"""
+        with self._lock:
+            # Let the next call be the half-open trial instead
+            if self.state == "half-open":
+                self.state = "open"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# ----------------------------
+# Provider
+# ----------------------------
+def retry_after(headers) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date)"""
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Provider:
+    """
+    Shared call path for one upstream API: rate limit, timeouts, retries with
+    jittered exponential backoff (honoring Retry-After) and a circuit breaker
+
+    Settings are read from <NAME>_RATE_LIMIT (requests/s, 0 = unlimited),
+    <NAME>_BURST, <NAME>_CONNECT_TIMEOUT, <NAME>_READ_TIMEOUT,
+    <NAME>_TOTAL_TIMEOUT, <NAME>_MAX_RETRIES, <NAME>_BACKOFF_BASE,
+    <NAME>_BACKOFF_MAX, <NAME>_BREAKER_THRESHOLD and <NAME>_BREAKER_RESET.
+
+    TOTAL_TIMEOUT bounds a whole call, retries and backoff included: each
+    attempt's timeouts are cut to what is left of it, and no retry starts
+    once its backoff would pass it. Keep it below the caller's own timeout
+    (e.g. REPORT_MORALIS_TIMEOUT) so the call ends with its last response or
+    error instead of being cancelled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 10,
+        burst: float = 20,
+        read_timeout: float = 20,
+        total_timeout: float = 60
+    ):
+        self.name = name
+        self.limiter = TokenBucket(
+            float(_env(name, "RATE_LIMIT", str(rate))), float(_env(name, "BURST", str(burst)))
+        )
+        self.connect_timeout = float(_env(name, "CONNECT_TIMEOUT", "5"))
+        self.read_timeout = float(_env(name, "READ_TIMEOUT", str(read_timeout)))
+        self.total_timeout = float(_env(name, "TOTAL_TIMEOUT", str(total_timeout)))
+        self.max_retries = int(_env(name, "MAX_RETRIES", "3"))
+        self.backoff_base = float(_env(name, "BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(_env(name, "BACKOFF_MAX", "10"))
+        self.breaker = CircuitBreaker(
+            int(_env(name, "BREAKER_THRESHOLD", "5")), float(_env(name, "BREAKER_RESET", "30"))
+        )
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        _registry.append(self)
+
+    def _backoff(self, attempt: int, headers=None) -> float:
+        requested = retry_after(headers)
+        if requested is not None:
+            return min(requested, self.backoff_max)
+        # Full jitter: anywhere between 0 and the exponential ceiling
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open after repeated failures")
+
+    def _outcome(self, status_code: int, attempt: int) -> bool:
+        """Update limiter state for a response; True if it should be retried"""
+        if status_code == 429:
+            self.limiter.on_rate_limited()
+        elif status_code < 500:
+            self.limiter.on_success()
+        return status_code in RETRY_STATUSES and attempt < self.max_retries
+
+    def _can_retry(self, attempt: int, deadline: float, delay: float) -> bool:
+        return attempt < self.max_retries and time.monotonic() + delay < deadline
+
+    def _timeouts(self, deadline: float) -> Tuple[float, float]:
+        """Connect and read timeouts for an attempt, cut to the call's remaining budget"""
+        remaining = max(0.1, deadline - time.monotonic())
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _finish(self, ok: bool) -> None:
+        if not ok:
+            self.failures += 1
+        self.breaker.record(ok)
+
+    def request_sync(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Blocking call through requests; returns the last response or raises the last error"""
+        self._check_circuit()
+        self.calls += 1
+        timeout = kwargs.pop("timeout", None)
+        deadline = time.monotonic() + self.total_timeout
+        try:
+            attempt = 0
+            while True:
+                time.sleep(self.limiter.reserve())
+                self.attempts += 1
+                try:
+                    response = requests.request(method, url, timeout=timeout or self._timeouts(deadline), **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    delay = self._backoff(attempt)
+                    if not self._can_retry(attempt, deadline, delay):
+                        raise
+                else:
+                    retry = self._outcome(response.status_code, attempt)
+                    delay = self._backoff(attempt, response.headers) if retry else 0.0
+                    if not retry or not self._can_retry(attempt, deadline, delay):
+                        self._finish(response.status_code not in RETRY_STATUSES)
+                        return response
+                self.retries += 1
+                attempt += 1
+                time.sleep(delay)
+        except BaseException:
+            self._finish(False)
+            raise
+
+    async def request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        """Async call through an httpx client; returns the last response or raises the last error"""
+        self._check_circuit()
+        self.calls += 1
+        timeout = kwargs.pop("timeout", None)
+        deadline = time.monotonic() + self.total_timeout
+        try:
+            attempt = 0
+            while True:
+                await asyncio.sleep(self.limiter.reserve())
+                self.attempts += 1
+                if timeout is None:
+                    connect, read = self._timeouts(deadline)
+                    attempt_timeout = httpx.Timeout(read, connect=connect)
+                else:
+                    attempt_timeout = timeout
+                try:
+                    response = await client.request(method, url, timeout=attempt_timeout, **kwargs)
+                except httpx.TransportError:
+                    delay = self._backoff(attempt)
+                    if not self._can_retry(attempt, deadline, delay):
+                        raise
+                else:
+                    retry = self._outcome(response.status_code, attempt)
+                    delay = self._backoff(attempt, response.headers) if retry else 0.0
+                    if not retry or not self._can_retry(attempt, deadline, delay):
+                        self._finish(response.status_code not in RETRY_STATUSES)
+                        return response
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. a report step timeout), which says
+            # nothing about the upstream; a half-open trial is handed back
+            self.breaker.release()
+            raise
+        except BaseException:
+            self._finish(False)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "failures": self.failures,
+            "limiter": self.limiter.stats(),
+            "circuit": self.breaker.stats(),
+        }
+
+
+def upstream_stats() -> List[Dict[str, Any]]:
+    """Statistics for every upstream provider created in this process"""
+    return [provider.stats() for provider in _registry]
+
+
+# Total budgets sit just under REPORT_MORALIS_TIMEOUT / REPORT_BITQUERY_TIMEOUT
+moralis = Provider("moralis", rate=25, burst=50, read_timeout=4, total_timeout=9)
+bitquery = Provider("bitquery", rate=10, burst=20, read_timeout=20, total_timeout=19)
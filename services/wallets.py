@@ -0,0 +1,540 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+from dotenv import load_dotenv
+
+from services.addresses import NO_ADDRESS
+from services.columns import Columns, TradeColumns
+from services.dex_analytics import trade_usd
+from services.holders import HolderStore, holder_tracker
+from services.ingest import TradeStore, read_arrow, trade_ingestor, write_arrow
+from services.locks import file_lock
+from services.models import BlockchainRecognition, SmartMoneyResponse, SmartMoneyWallet
+
+load_dotenv()
+
+# A wallet is early in a token if it is among the token's first
+# WALLET_EARLY_BUYERS distinct buyers in the stored trade history
+WALLET_EARLY_BUYERS = int(os.getenv("WALLET_EARLY_BUYERS", "100"))
+# A wallet is smart money if, in other tokens, it was early at least once and
+# closed at least WALLET_SMART_MIN_CLOSED positions, at least
+# WALLET_SMART_HIT_RATE of them at a profit, for a positive realized PnL
+WALLET_SMART_MIN_CLOSED = int(os.getenv("WALLET_SMART_MIN_CLOSED", "2"))
+WALLET_SMART_HIT_RATE = float(os.getenv("WALLET_SMART_HIT_RATE", "0.5"))
+# Smart-money score (share of the token's buy volume from smart wallets) at
+# which the signal is reported as strong / moderate
+WALLET_STRONG_SCORE = float(os.getenv("WALLET_STRONG_SCORE", "0.25"))
+WALLET_MODERATE_SCORE = float(os.getenv("WALLET_MODERATE_SCORE", "0.1"))
+# Wallets listed per smart-money response
+WALLET_MAX_RESULTS = int(os.getenv("WALLET_MAX_RESULTS", "50"))
+# Smart-money requests fold in the requested token's new trades; every other
+# token's are folded in at most once per WALLET_REFRESH_INTERVAL seconds
+WALLET_REFRESH_INTERVAL = float(os.getenv("WALLET_REFRESH_INTERVAL", "300"))
+
+NEVER = np.iinfo(np.int64).max
+
+
+class PositionColumns(Columns):
+    """One wallet's totals in one token, from that token's DEX trades"""
+
+    __slots__ = ("token", "wallet", "buy_qty", "buy_usd", "sell_qty", "sell_usd", "first_buy", "early")
+    FIELDS = {
+        "token": ("token_id", pa.uint32()),
+        "wallet": ("wallet_id", pa.uint32()),
+        "buy_qty": ("buy_qty", pa.float64()),
+        "buy_usd": ("buy_usd", pa.float64()),
+        "sell_qty": ("sell_qty", pa.float64()),
+        "sell_usd": ("sell_usd", pa.float64()),
+        # Unix seconds of the wallet's first buy, 0 if it never bought
+        "first_buy": ("first_buy_time", pa.int64()),
+        "early": ("early", pa.bool_()),
+    }
+
+    def closed(self) -> np.ndarray:
+        """Positions the wallet both bought into and sold out of"""
+        return (self.buy_qty > 0) & (self.sell_qty > 0)
+
+    def realized_pnl(self) -> np.ndarray:
+        """
+        Average-cost PnL in USD of the tokens sold that the wallet was seen
+        buying; tokens received otherwise (transfers, airdrops) are left out
+        """
+        matched = np.minimum(self.buy_qty, self.sell_qty)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost = np.where(self.buy_qty > 0, self.buy_usd / self.buy_qty, 0.0)
+            proceeds = np.where(self.sell_qty > 0, self.sell_usd / self.sell_qty, 0.0)
+        return (proceeds - cost) * matched
+
+
+def token_positions(trades: TradeColumns, token_id: int) -> PositionColumns:
+    """Per-wallet totals of a token's trades (oldest first); early is not set"""
+    usd = trade_usd(trades)
+    bought = trades.buy_currency == token_id
+    sold = (trades.sell_currency == token_id) & ~bought
+    wallets = np.concatenate([trades.buyer[bought], trades.seller[sold]])
+    is_buy = np.arange(len(wallets)) < int(bought.sum())
+    qty = np.nan_to_num(np.concatenate([trades.buy_amount[bought], trades.sell_amount[sold]]), nan=0.0)
+    value = np.concatenate([usd[bought], usd[sold]])
+
+    ids, inverse = np.unique(wallets, return_inverse=True)
+    size = len(ids)
+    # Trades are oldest first, so a wallet's first buy is its first buy row
+    buyers, first_rows = np.unique(inverse[is_buy], return_index=True)
+    first_buy = np.zeros(size, dtype=np.int64)
+    first_buy[buyers] = trades.time[bought][first_rows]
+
+    positions = PositionColumns(
+        token=np.full(size, token_id, dtype=np.uint32),
+        wallet=ids.astype(np.uint32),
+        buy_qty=np.bincount(inverse, weights=np.where(is_buy, qty, 0.0), minlength=size),
+        buy_usd=np.bincount(inverse, weights=np.where(is_buy, value, 0.0), minlength=size),
+        sell_qty=np.bincount(inverse, weights=np.where(is_buy, 0.0, qty), minlength=size),
+        sell_usd=np.bincount(inverse, weights=np.where(is_buy, 0.0, value), minlength=size),
+        first_buy=first_buy,
+        early=np.zeros(size, dtype=bool),
+    )
+    return positions.take(positions.wallet != NO_ADDRESS)
+
+
+def merge_positions(old: PositionColumns, new: PositionColumns, early_buyers: int = WALLET_EARLY_BUYERS) -> PositionColumns:
+    """
+    Add one token's new per-wallet totals to its existing ones, then mark the
+    token's first early_buyers distinct buyers as early
+    """
+    both = PositionColumns.concat([old, new])
+    ids, inverse = np.unique(both.wallet, return_inverse=True)
+    size = len(ids)
+    first_buy = np.full(size, NEVER, dtype=np.int64)
+    np.minimum.at(first_buy, inverse, np.where(both.first_buy > 0, both.first_buy, NEVER))
+
+    # Earliest first buy first, ties by wallet id; wallets that never bought last
+    rank = np.lexsort((ids, first_buy))[:min(early_buyers, int((first_buy < NEVER).sum()))]
+    early = np.zeros(size, dtype=bool)
+    early[rank] = True
+    return PositionColumns(
+        token=np.full(size, both.token[0] if len(both) else 0, dtype=np.uint32),
+        wallet=ids.astype(np.uint32),
+        **{
+            name: np.bincount(inverse, weights=getattr(both, name), minlength=size)
+            for name in ("buy_qty", "buy_usd", "sell_qty", "sell_usd")
+        },
+        first_buy=np.where(first_buy < NEVER, first_buy, 0),
+        early=early,
+    )
+
+
+def _gather(values: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """values[ids], 0 for ids past the end"""
+    inside = ids < len(values)
+    out = np.zeros(len(ids), dtype=values.dtype)
+    out[inside] = values[ids[inside]]
+    return out
+
+
+# ----------------------------
+# Index
+# ----------------------------
+class WalletIndex:
+    """
+    Cross-token wallet positions, built from the trade store's DEX trades
+
+    One row per (token, wallet) holds buy and sell totals, the wallet's first
+    buy and whether it was one of the token's first buyers, keyed by the
+    network's address ids. Updates fold in only trades stored after the
+    block each token was last indexed at, and the index is persisted to
+    <root>/<network>/wallets.arrow with those blocks in its metadata.
+    Processes sharing the store update under a lock on that file, first
+    reloading it if another process saved it since.
+    Per-wallet totals across tokens are cached as arrays indexed by address
+    id, so a token's wallets are scored with a few gathers; they are built
+    under the network's lock and kept with the positions they were built
+    from, so a query never mixes totals and positions of two updates.
+
+    "Early" is relative to the stored history, which starts
+    INGEST_BACKFILL_DAYS before a token was first ingested.
+    """
+
+    def __init__(
+        self,
+        trade_store: Optional[TradeStore] = None,
+        holder_store: Optional[HolderStore] = None,
+        early_buyers: int = WALLET_EARLY_BUYERS,
+        refresh_interval: float = WALLET_REFRESH_INTERVAL
+    ):
+        self.trade_store = trade_store or trade_ingestor.store
+        self.holder_store = holder_store or holder_tracker.store
+        self.early_buyers = early_buyers
+        self.refresh_interval = refresh_interval
+        self._positions: Dict[str, PositionColumns] = {}
+        self._high_water: Dict[str, Dict[str, int]] = {}
+        self._mtimes: Dict[str, Optional[int]] = {}
+        self._totals: Dict[str, Tuple[PositionColumns, Dict[str, np.ndarray]]] = {}
+        self._refreshed: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self.updates = 0
+        self.refreshes = 0
+        self.trades = 0
+        self.queries = 0
+
+    def _path(self, network: str) -> str:
+        return os.path.join(self.trade_store.root, network, "wallets.arrow")
+
+    def _lock(self, network: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(network, threading.Lock())
+
+    def _mtime(self, network: str) -> Optional[int]:
+        path = self._path(network)
+        return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+    def _read(self, network: str) -> None:
+        """Replace the in-memory index with the saved one (lock held)"""
+        mtime = self._mtime(network)
+        if mtime is not None:
+            table = read_arrow(self._path(network))
+            self._high_water[network] = json.loads((table.schema.metadata or {}).get(b"high_water", b"{}"))
+            self._positions[network] = PositionColumns.from_arrow(table)
+        else:
+            self._high_water[network] = {}
+            self._positions[network] = PositionColumns.empty()
+        self._mtimes[network] = mtime
+
+    def _load(self, network: str) -> PositionColumns:
+        """The network's positions, read from disk on first use"""
+        with self._lock(network):
+            if network not in self._positions:
+                self._read(network)
+            return self._positions[network]
+
+    def _fold(self, token_address: str, network: str) -> int:
+        """Fold a token's new trades into the in-memory positions (lock held)"""
+        token_id = self.trade_store.addresses(network).lookup(token_address)
+        if token_id is None:
+            return 0
+        key = token_address.lower()
+        table = self.trade_store.read(
+            network, token_address, "dex_trades",
+            columns=TradeColumns.columns(), after_block=self._high_water[network].get(key)
+        )
+        if table.num_rows == 0:
+            return 0
+        trades = TradeColumns.from_arrow(table)
+        positions = self._positions[network]
+        mine = positions.token == token_id
+        merged = merge_positions(positions.take(mine), token_positions(trades, token_id), self.early_buyers)
+        self._positions[network] = PositionColumns.concat([positions.take(~mine), merged])
+        self._high_water[network][key] = int(trades.block_number.max())
+        self.updates += 1
+        self.trades += len(trades)
+        return len(trades)
+
+    def _save(self, network: str) -> None:
+        table = pa.table(self._positions[network].arrow_columns())
+        write_arrow(self._path(network), table.replace_schema_metadata({
+            "high_water": json.dumps(self._high_water[network]),
+        }))
+        self._mtimes[network] = self._mtime(network)
+
+    def update(self, token_address: str, network: str = "eth") -> int:
+        """
+        Fold a token's trades stored since its last update into the index
+
+        Returns:
+            The number of trades read
+        """
+        return self.update_many([token_address], network)
+
+    def update_many(self, token_addresses: Sequence[str], network: str = "eth") -> int:
+        """Update several tokens, saving the index once; returns the number of trades read"""
+        with self._lock(network), file_lock(self._path(network)):
+            if network not in self._positions or self._mtimes.get(network) != self._mtime(network):
+                self._read(network)
+            read = sum(self._fold(token, network) for token in token_addresses)
+            if read:
+                self._save(network)
+            return read
+
+    def update_all(self, network: str = "eth") -> int:
+        """Update every token in the trade store; returns the number of trades read"""
+        return self.update_many(self.trade_store.tokens(network), network)
+
+    def refresh(self, token_address: str, network: str = "eth") -> int:
+        """
+        Update a token before it is queried, and every token if the last
+        full update is refresh_interval seconds old
+
+        Only one caller per interval takes the full update; the rest update
+        just their token. Returns the number of trades read.
+        """
+        now = time.monotonic()
+        with self._locks_lock:
+            due = now - self._refreshed.get(network, -math.inf) >= self.refresh_interval
+            if due:
+                self._refreshed[network] = now
+        if not due:
+            return self.update(token_address, network)
+        self.refreshes += 1
+        return self.update_all(network)
+
+    def _snapshot(self, network: str) -> Tuple[PositionColumns, Dict[str, np.ndarray]]:
+        """The network's positions and their per-wallet totals across tokens, indexed by address id"""
+        with self._lock(network):
+            if network not in self._positions:
+                self._read(network)
+            positions = self._positions[network]
+            cached = self._totals.get(network)
+            if cached is not None and cached[0] is positions:
+                return cached
+            size = int(positions.wallet.max()) + 1 if len(positions) else 0
+            pnl, closed = positions.realized_pnl(), positions.closed()
+            totals = {
+                "tokens": np.bincount(positions.wallet, minlength=size),
+                "early": np.bincount(positions.wallet, weights=positions.early, minlength=size),
+                "pnl": np.bincount(positions.wallet, weights=pnl, minlength=size),
+                "closed": np.bincount(positions.wallet, weights=closed, minlength=size),
+                "wins": np.bincount(positions.wallet, weights=closed & (pnl > 0), minlength=size),
+            }
+            self._totals[network] = positions, totals
+            return positions, totals
+
+    def _holder_ids(self, token_address: str, network: str) -> np.ndarray:
+        """Address ids with a balance in the token's latest holder snapshot"""
+        dates = self.holder_store.dates(network, token_address)
+        if not dates:
+            return np.zeros(0, dtype=np.uint32)
+        holders = self.holder_store.read(network, token_address, dates[-1])
+        return np.unique(holders.address[holders.balance > 0])
+
+    def smart_money(
+        self,
+        token_address: str,
+        network: str = "eth",
+        limit: int = WALLET_MAX_RESULTS,
+        min_closed: int = WALLET_SMART_MIN_CLOSED,
+        min_hit_rate: float = WALLET_SMART_HIT_RATE
+    ) -> Dict[str, Any]:
+        """
+        Wallets that trade or hold a token, scored on their record in the
+        other indexed tokens
+
+        Args:
+            token_address: The token contract address
+            network: Blockchain network
+            limit: Most wallets listed
+            min_closed: Closed positions in other tokens a smart wallet needs
+            min_hit_rate: Share of those closed at a profit a smart wallet needs
+
+        Returns:
+            Counts, the smart-money score (share of the token's buy volume
+            from smart wallets) and the smart wallets' net flow, plus the
+            wallets early in other tokens: smart ones first, then by PnL
+            (addresses as ids)
+        """
+        self.queries += 1
+        positions, totals = self._snapshot(network)
+        token_id = self.trade_store.addresses(network).lookup(token_address)
+        mine = positions.take(positions.token == token_id) if token_id is not None else PositionColumns.empty()
+        mine = mine.take(np.argsort(mine.wallet))
+        holder_ids = self._holder_ids(token_address, network)
+        wallets = np.union1d(mine.wallet, holder_ids).astype(np.uint32)
+
+        # This token's position of each wallet, if it traded
+        at = np.minimum(np.searchsorted(mine.wallet, wallets), max(len(mine) - 1, 0))
+        traded = (mine.wallet[at] == wallets) if len(mine) else np.zeros(len(wallets), dtype=bool)
+
+        def own(values: np.ndarray) -> np.ndarray:
+            return np.where(traded, values[at], 0) if len(mine) else np.zeros(len(wallets))
+
+        pnl, closed = mine.realized_pnl(), mine.closed()
+        other_tokens = _gather(totals["tokens"], wallets) - own(np.ones(len(mine)))
+        other_early = _gather(totals["early"], wallets) - own(mine.early)
+        other_pnl = _gather(totals["pnl"], wallets) - own(pnl)
+        other_closed = _gather(totals["closed"], wallets) - own(closed)
+        other_wins = _gather(totals["wins"], wallets) - own(closed & (pnl > 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hit_rate = np.where(other_closed > 0, other_wins / other_closed, np.nan)
+
+        early_elsewhere = other_early >= 1
+        smart = early_elsewhere & (other_closed >= min_closed) & (hit_rate >= min_hit_rate) & (other_pnl > 0)
+        bought, sold = own(mine.buy_usd), own(mine.sell_usd)
+        holds = np.isin(wallets, holder_ids)
+        volume = float(bought.sum())
+
+        listed = np.flatnonzero(early_elsewhere)
+        listed = listed[np.lexsort((-other_pnl[listed], ~smart[listed]))][:limit]
+        return {
+            "token_address": token_address,
+            "network": network,
+            "score": round(float(bought[smart].sum()) / volume, 4) if volume > 0 else 0.0,
+            "tracked_tokens": len(self._high_water.get(network, {})),
+            "wallets": len(wallets),
+            "early_wallets": int(early_elsewhere.sum()),
+            "smart_wallets": int(smart.sum()),
+            "smart_holders": int((smart & holds).sum()),
+            "smart_buy_usd": float(bought[smart].sum()),
+            "smart_net_flow_usd": float((bought - sold)[smart].sum()),
+            "top_wallets": [
+                {
+                    "address_id": int(wallets[i]),
+                    "smart": bool(smart[i]),
+                    "holds": bool(holds[i]),
+                    "bought_usd": float(bought[i]),
+                    "sold_usd": float(sold[i]),
+                    "early_tokens": int(other_early[i]),
+                    "other_tokens": int(other_tokens[i]),
+                    "realized_pnl_usd": float(other_pnl[i]),
+                    "closed_positions": int(other_closed[i]),
+                    "hit_rate": None if np.isnan(hit_rate[i]) else float(hit_rate[i]),
+                }
+                for i in listed
+            ],
+        }
+
+    def scores(self, token_addresses: Sequence[Optional[str]], network: str = "eth") -> List[Optional[float]]:
+        """Smart-money score per token from the index as it stands (None if the token is not indexed)"""
+        self._load(network)
+        indexed = self._high_water.get(network, {})
+        return [
+            self.smart_money(token, network, limit=0)["score"] if token and token.lower() in indexed else None
+            for token in token_addresses
+        ]
+
+    def wallet(self, address: str, network: str = "eth") -> Optional[Dict[str, Any]]:
+        """
+        A wallet's realized PnL and hit rate across indexed tokens, with its
+        position in each; None if the wallet has never traded one
+        """
+        addresses = self.trade_store.addresses(network)
+        wallet_id = addresses.lookup(address)
+        positions = self._load(network)
+        if wallet_id is None:
+            return None
+        held = positions.take(positions.wallet == wallet_id)
+        if not len(held):
+            return None
+        pnl, closed = held.realized_pnl(), held.closed()
+        wins = int((closed & (pnl > 0)).sum())
+        return {
+            "address": address,
+            "network": network,
+            "tokens": len(held),
+            "early_tokens": int(held.early.sum()),
+            "realized_pnl_usd": float(pnl.sum()),
+            "closed_positions": int(closed.sum()),
+            "hit_rate": wins / int(closed.sum()) if closed.any() else None,
+            "positions": [
+                {
+                    "token_address": addresses.address(held.token[i]),
+                    "early": bool(held.early[i]),
+                    "bought_usd": float(held.buy_usd[i]),
+                    "sold_usd": float(held.sell_usd[i]),
+                    "realized_pnl_usd": float(pnl[i]),
+                    "closed": bool(closed[i]),
+                }
+                for i in np.argsort(-pnl)
+            ],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "networks": {
+                network: {"tokens": len(self._high_water.get(network, {})), "positions": len(positions)}
+                for network, positions in self._positions.items()
+            },
+            "updates": self.updates,
+            "refreshes": self.refreshes,
+            "trades": self.trades,
+            "queries": self.queries,
+        }
+
+
+wallet_index = WalletIndex()
+
+
+# ----------------------------
+# Response
+# ----------------------------
+def smart_money_signal(result: Dict[str, Any]) -> BlockchainRecognition:
+    """The smart-money result as the AI-signals "Smart Money Movement" entry"""
+    score, flow = result["score"], result["smart_net_flow_usd"]
+    if not result["smart_wallets"]:
+        level, color = "No Signal", "gray"
+    elif score >= WALLET_STRONG_SCORE:
+        level, color = "Strong Signal", "green"
+    elif score >= WALLET_MODERATE_SCORE:
+        level, color = "Moderate Signal", "yellow"
+    else:
+        level, color = "Weak Signal", "gray"
+    phase = "Accumulation Phase" if flow > 0 else "Distribution Phase" if flow < 0 else "No Net Flow"
+    return BlockchainRecognition(
+        name="Smart Money Movement",
+        timeFrame=phase,
+        riskColor=color,
+        riskLevel=level,
+        riskPercentage=int(round(score * 100)),
+    )
+
+
+def smart_money_risk(result: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    The smart-money result as the risk-assessment "smartMoneyRisk" level and
+    percentage: the score counts as risk only while smart wallets are net
+    sellers of the token
+    """
+    score, flow = result["score"], result["smart_net_flow_usd"]
+    if not result["smart_wallets"] or flow >= 0:
+        return "Low", 0
+    if score >= WALLET_STRONG_SCORE:
+        level = "High"
+    elif score >= WALLET_MODERATE_SCORE:
+        level = "Medium"
+    else:
+        level = "Low"
+    return level, int(round(score * 100))
+
+
+def build_smart_money_response(result: Dict[str, Any], network: str, errors: Optional[List[str]] = None) -> SmartMoneyResponse:
+    addresses = wallet_index.trade_store.addresses(network)
+    wallets = [
+        SmartMoneyWallet(address=addresses.address(wallet.pop("address_id")), **wallet)
+        for wallet in (dict(wallet) for wallet in result["top_wallets"])
+    ]
+    risk_level, risk_percentage = smart_money_risk(result)
+    return SmartMoneyResponse(
+        **{**result, "top_wallets": wallets},
+        signal=smart_money_signal(result),
+        risk_level=risk_level,
+        risk_percentage=risk_percentage,
+        errors=errors or [],
+    )
+
+
+async def get_smart_money(token_address: str, network: str = "eth", limit: int = WALLET_MAX_RESULTS) -> SmartMoneyResponse:
+    """
+    Smart-money wallets of a token from the wallet index
+
+    The token's new trades are ingested first and folded into the index
+    (with every other token's, at most once per WALLET_REFRESH_INTERVAL)
+    before it is queried. If
+    ingestion fails, the index as stored is still queried and the failure
+    is listed under `errors`.
+    """
+    ingested = await trade_ingestor.ingest(token_address, network, ["dex_trades"])
+    errors = []
+    if ingested["dex_trades"]["error"]:
+        errors.append(f"Trades: {ingested['dex_trades']['error']}")
+
+    def query() -> Dict[str, Any]:
+        wallet_index.refresh(token_address, network)
+        return wallet_index.smart_money(token_address, network, limit)
+
+    result = await asyncio.to_thread(query)
+    return build_smart_money_response(result, network, errors)
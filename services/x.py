@@ -7,15 +7,59 @@ from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
 import logging
 import time
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 import urllib.parse
 from enum import Enum
 import os
+from services.executor import run_blocking
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TWITTER_BASE_URL = os.getenv("TWITTER_BASE_URL", "https://twitter.com")
+TWITTER_POOL_SIZE = int(os.getenv("TWITTER_POOL_SIZE", "2"))
+TWITTER_SESSION_MAX_USES = int(os.getenv("TWITTER_SESSION_MAX_USES", "50"))
+# Seconds a search waits for a free pooled session before failing
+TWITTER_LEASE_TIMEOUT = float(os.getenv("TWITTER_LEASE_TIMEOUT", "60"))
+
+# A search that found no tweets in time; the session itself is still usable
+TWEETS_TIMEOUT_ERROR = "Timeout waiting for tweets"
+
+# Reads the fields of every tweet not yet marked as processed, marking only
+# the ones whose text and user have rendered so the rest are read again on
+# the next pass. Mirrors the selectors previously used per element from Python.
+EXTRACT_TWEETS_SCRIPT = """
+const rows = [];
+for (const el of document.querySelectorAll('[data-testid="tweet"]:not([data-hs-seen])')) {
+  const textEl = el.querySelector('[data-testid="tweetText"]') || el.querySelector('div[lang]');
+  const text = textEl ? textEl.innerText : '';
+  const stats = el.querySelectorAll('[role="group"] [data-testid$="-count"]');
+  const userEl = el.querySelector('[data-testid="User-Name"]');
+  const userLines = userEl ? userEl.innerText.split('\\n') : [];
+  const name = userLines[0] || '';
+  const handle = (userLines[1] || '').replace('@', '');
+  const timeEl = el.querySelector('time');
+  if (text && (name || handle)) {
+    el.setAttribute('data-hs-seen', '1');
+    rows.push({
+      text: text,
+      created_at: timeEl ? (timeEl.getAttribute('datetime') || '') : '',
+      reply_count: stats.length > 0 ? stats[0].innerText : '0',
+      retweet_count: stats.length > 1 ? stats[1].innerText : '0',
+      favorite_count: stats.length > 2 ? stats[2].innerText : '0',
+      name: name,
+      screen_name: handle
+    });
+  }
+}
+return rows;
+"""
+
 class SearchType(str, Enum):
     """Available search types for Twitter search"""
     LATEST = "live"
@@ -43,14 +87,22 @@ class TwitterSearchResponse(BaseModel):
     error: Optional[str] = None
 
 class TwitterScraper:
-    def __init__(self, headless: bool = True):
+    def __init__(
+        self,
+        headless: bool = True,
+        user_data_dir: Optional[str] = None,
+        base_url: str = TWITTER_BASE_URL
+    ):
         """Initialize the Twitter scraper with Chrome profile support."""
+        self.base_url = base_url.rstrip('/')
+        self.logged_in_as: Optional[str] = None
         self.options = webdriver.ChromeOptions()
         if headless:
             self.options.add_argument('--headless=new')
         
-        # Set up Chrome profile and cookies directory
-        self.user_data_dir = os.path.join(os.getcwd(), "chrome_profile")
+        # Set up Chrome profile and cookies directory. Browsers running at the
+        # same time need separate profile directories.
+        self.user_data_dir = user_data_dir or os.path.join(os.getcwd(), "chrome_profile")
         if not os.path.exists(self.user_data_dir):
             os.makedirs(self.user_data_dir)
 
@@ -97,7 +149,7 @@ class TwitterScraper:
                 logger.error("Password is required for login")
                 return False
 
-            self.driver.get("https://twitter.com/login")
+            self.driver.get(f"{self.base_url}/login")
             time.sleep(3)
 
             username_input = self.wait.until(
@@ -122,62 +174,40 @@ class TwitterScraper:
             login_button.click()
             time.sleep(5)
 
-            return "login" not in self.driver.current_url.lower()
+            success = "login" not in self.driver.current_url.lower()
+            if success:
+                self.logged_in_as = username
+            return success
 
         except Exception as e:
             logger.error(f"Failed to login: {str(e)}")
             return False
 
-    def _extract_tweet_data(self, tweet_element) -> Optional[Dict]:
-        """Extract tweet data from a tweet element."""
-        try:
-            WebDriverWait(self.driver, 5).until(
-                EC.visibility_of(tweet_element)
-            )
-            
-            try:
-                text_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                text = text_element.text
-            except:
-                text_element = tweet_element.find_element(By.CSS_SELECTOR, 'div[lang]')
-                text = text_element.text
-
-            stats = tweet_element.find_elements(By.CSS_SELECTOR, '[role="group"] [data-testid$="-count"]')
-            reply_count = stats[0].text if len(stats) > 0 else "0"
-            retweet_count = stats[1].text if len(stats) > 1 else "0"
-            like_count = stats[2].text if len(stats) > 2 else "0"
-
-            try:
-                user_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]')
-                user_texts = user_element.text.split('\n')
-                user_name = user_texts[0]
-                user_handle = user_texts[1].replace('@', '') if len(user_texts) > 1 else ""
-            except:
-                user_name = tweet_element.find_element(By.CSS_SELECTOR, 'div[data-testid="User-Name"] span').text
-                user_handle = tweet_element.find_element(By.CSS_SELECTOR, 'div[data-testid="User-Name"] div span').text.replace('@', '')
+    def _extract_visible_tweets(self) -> List[Dict]:
+        """
+        Extract every tweet rendered since the previous call in one WebDriver
+        round-trip.
 
-            try:
-                time_element = tweet_element.find_element(By.TAG_NAME, 'time')
-                timestamp = time_element.get_attribute('datetime')
-            except:
-                timestamp = ""
-
-            if text and (user_name or user_handle):
-                return {
-                    'text': text,
-                    'created_at': timestamp,
-                    'reply_count': reply_count,
-                    'retweet_count': retweet_count,
-                    'favorite_count': like_count,
-                    'user': {
-                        'name': user_name,
-                        'screen_name': user_handle
-                    },
-                    '_scrape_timestamp': datetime.now().isoformat()
-                }
-        except Exception as e:
-            logger.error(f"Error extracting tweet data: {str(e)}")
-        return None
+        Extracted elements are marked in the DOM, so each scroll pass only
+        reads tweets that are new on the page or were still rendering.
+        """
+        rows = self.driver.execute_script(EXTRACT_TWEETS_SCRIPT) or []
+        scraped_at = datetime.now().isoformat()
+        return [
+            {
+                'text': row['text'],
+                'created_at': row['created_at'],
+                'reply_count': row['reply_count'],
+                'retweet_count': row['retweet_count'],
+                'favorite_count': row['favorite_count'],
+                'user': {
+                    'name': row['name'],
+                    'screen_name': row['screen_name']
+                },
+                '_scrape_timestamp': scraped_at
+            }
+            for row in rows
+        ]
 
     def search_tweets(
         self, 
@@ -185,17 +215,24 @@ class TwitterScraper:
         search_type: SearchType = SearchType.TOP,
         max_tweets: int = 20,
         username: str = None,
-        password: str = None
+        password: str = None,
+        close: bool = True
     ) -> TwitterSearchResponse:
-        """Search tweets based on query."""
+        """
+        Search tweets based on query.
+
+        With close=False the browser stays open afterwards so the scraper
+        can serve further searches (see TwitterScraperPool).
+        """
         try:
-            if username and password:
+            if username and password and self.logged_in_as != username:
                 login_success = self.login(username, password)
                 if not login_success:
                     return TwitterSearchResponse(tweets=[], status="error", error="Login failed")
 
             encoded_query = urllib.parse.quote(query)
-            search_url = f"https://twitter.com/search?q={encoded_query}&f={search_type}"
+            search_filter = getattr(search_type, "value", search_type)
+            search_url = f"{self.base_url}/search?q={encoded_query}&f={search_filter}"
             
             logger.info(f"Searching tweets with query: {query}")
             self.driver.get(search_url)
@@ -207,30 +244,18 @@ class TwitterScraper:
             try:
                 self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]')))
             except TimeoutException:
-                return TwitterSearchResponse(tweets=[], status="error", error="Timeout waiting for tweets")
+                return TwitterSearchResponse(tweets=[], status="error", error=TWEETS_TIMEOUT_ERROR)
             
             tweets = []
+            seen = set()
             last_height = 0
             retry_count = 0
             
             while len(tweets) < max_tweets and retry_count < 5:
-                tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
-                
-                if not tweet_elements:
-                    retry_count += 1
-                    time.sleep(2)
-                    continue
-                
-                for tweet_element in tweet_elements:
-                    if len(tweets) >= max_tweets:
-                        break
-                        
-                    tweet_data = self._extract_tweet_data(tweet_element)
-                    if tweet_data and not any(
-                        t['text'] == tweet_data['text'] and 
-                        t['user']['screen_name'] == tweet_data['user']['screen_name'] 
-                        for t in tweets
-                    ):
+                for tweet_data in self._extract_visible_tweets():
+                    key = (tweet_data['user']['screen_name'], tweet_data['text'])
+                    if key not in seen:
+                        seen.add(key)
                         tweets.append(tweet_data)
                 
                 if len(tweets) >= max_tweets:
@@ -254,7 +279,200 @@ class TwitterScraper:
             return TwitterSearchResponse(tweets=[], status="error", error=str(e))
             
         finally:
-            self.cleanup()
+            if close:
+                self.cleanup()
+
+class TwitterScraperPool:
+    """
+    Pool of warm, optionally logged-in browser sessions leased to searches.
+
+    Each session is recycled after max_uses searches or as soon as a search
+    on it fails, and a replacement is started in the background.
+    """
+
+    def __init__(
+        self,
+        size: int = TWITTER_POOL_SIZE,
+        max_uses: int = TWITTER_SESSION_MAX_USES,
+        headless: bool = True,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        base_url: str = TWITTER_BASE_URL,
+        profile_root: Optional[str] = None
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.profile_root = profile_root or os.path.join(os.getcwd(), "chrome_profile", "pool")
+
+        self._idle: "queue.Queue[TwitterScraper]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._sessions = 0
+        self._free_profiles = deque(range(size))
+        self._closed = False
+
+        self.leases = 0
+        self.recycled = 0
+        self.failures = 0
+        self._waits = deque(maxlen=1000)
+
+    def start(self) -> None:
+        """Launch and log in all sessions up front."""
+        threads = [threading.Thread(target=self._add_session, daemon=True) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _add_session(self, raise_errors: bool = False) -> None:
+        with self._lock:
+            if self._closed or self._sessions >= self.size:
+                return
+            self._sessions += 1
+            profile = self._free_profiles.popleft()
+        try:
+            scraper = self._new_session(profile)
+        except Exception as e:
+            logger.error(f"Failed to start pooled browser session: {str(e)}")
+            with self._lock:
+                self._sessions -= 1
+                self._free_profiles.append(profile)
+            if raise_errors:
+                raise
+            return
+        self._idle.put(scraper)
+
+    def _new_session(self, profile: int) -> TwitterScraper:
+        scraper = TwitterScraper(
+            headless=self.headless,
+            user_data_dir=os.path.join(self.profile_root, f"session-{profile}"),
+            base_url=self.base_url
+        )
+        scraper.pool_profile = profile
+        scraper.uses = 0
+        scraper.broken = False
+        if self.username and self.password and not scraper.login(self.username, self.password):
+            scraper.cleanup()
+            raise RuntimeError("Login failed")
+        return scraper
+
+    def _retire(self, scraper: TwitterScraper) -> None:
+        scraper.cleanup()
+        with self._lock:
+            self._sessions -= 1
+            self._free_profiles.append(scraper.pool_profile)
+        self.recycled += 1
+        if not self._closed:
+            threading.Thread(target=self._add_session, daemon=True).start()
+
+    @contextmanager
+    def lease(self, timeout: float = TWITTER_LEASE_TIMEOUT):
+        """
+        Borrow a session for the duration of the with-block.
+
+        Exceptions raised inside the block recycle the session. Waiting for a
+        free session re-checks every second whether the pool can grow (e.g.
+        after a background replacement failed to start), and raises
+        TimeoutError after timeout seconds.
+        """
+        started = time.perf_counter()
+        deadline = started + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("Scraper pool is closed")
+            with self._lock:
+                grow = self._sessions < self.size and self._idle.empty()
+            if grow:
+                self._add_session(raise_errors=True)
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError("Timed out waiting for a browser session")
+            try:
+                scraper = self._idle.get(timeout=min(remaining, 1.0))
+                break
+            except queue.Empty:
+                continue
+        self._waits.append(time.perf_counter() - started)
+        self.leases += 1
+
+        failed = False
+        try:
+            yield scraper
+        except Exception:
+            failed = True
+            raise
+        finally:
+            failed = failed or scraper.broken
+            scraper.uses += 1
+            if failed:
+                self.failures += 1
+            if self._closed or failed or scraper.uses >= self.max_uses:
+                self._retire(scraper)
+            else:
+                self._idle.put(scraper)
+
+    def search(
+        self,
+        query: str,
+        search_type: SearchType = SearchType.TOP,
+        max_tweets: int = 20,
+        timeout: float = TWITTER_LEASE_TIMEOUT
+    ) -> TwitterSearchResponse:
+        """Run a search on a leased session."""
+        with self.lease(timeout=timeout) as scraper:
+            response = scraper.search_tweets(
+                query, search_type, max_tweets, self.username, self.password, close=False
+            )
+            # Login and WebDriver errors recycle the session; a search that
+            # merely found nothing in time does not
+            if response.status == "error" and response.error != TWEETS_TIMEOUT_ERROR:
+                scraper.broken = True
+            return response
+
+    def stats(self) -> Dict:
+        waits = sorted(self._waits)
+        return {
+            "size": self.size,
+            "sessions": self._sessions,
+            "idle": self._idle.qsize(),
+            "leases": self.leases,
+            "recycled": self.recycled,
+            "failures": self.failures,
+            "lease_wait_avg": sum(waits) / len(waits) if waits else 0.0,
+            "lease_wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "lease_wait_max": waits[-1] if waits else 0.0,
+        }
+
+    def close(self) -> None:
+        """Shut down every idle session; leased ones close when returned."""
+        self._closed = True
+        while True:
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            scraper.cleanup()
+
+_pools: Dict[Optional[str], TwitterScraperPool] = {}
+_pools_lock = threading.Lock()
+
+def get_scraper_pool(username: str = None, password: str = None) -> TwitterScraperPool:
+    """Return the shared pool for a set of credentials, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(username)
+        if pool is None or pool._closed:
+            pool = TwitterScraperPool(username=username, password=password)
+            _pools[username] = pool
+        return pool
+
+def close_scraper_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
 
 async def search_twitter(
     query: str,
@@ -263,7 +481,13 @@ async def search_twitter(
     username: str = None,
     password: str = None
 ) -> TwitterSearchResponse:
-    """Async wrapper for Twitter search functionality."""
+    """
+    Async wrapper for Twitter search functionality.
+
+    The Selenium work (page loads, scroll waits) runs on the bounded
+    "browser" executor pool, so the event loop stays free and up to
+    BROWSER_MAX_CONCURRENCY searches run side by side on leased sessions.
+    """
     if isinstance(search_type, str):
         try:
             search_type = SearchType[search_type.upper()]
@@ -271,5 +495,5 @@ async def search_twitter(
             logger.warning(f"Invalid search type: {search_type}. Using TOP.")
             search_type = SearchType.TOP
     
-    scraper = TwitterScraper(headless=True)
-    return scraper.search_tweets(query, search_type, max_tweets, username, password) 
\ No newline at end of file
+    pool = get_scraper_pool(username, password)
+    return await run_blocking("browser", pool.search, query, search_type, max_tweets) 
\ No newline at end of file
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+
+from services.addresses import ADDRESS_BYTES, AddressTable
+
+
+def address(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+def intern_range(path: str, start: int, stop: int) -> None:
+    table = AddressTable(path)
+    for i in range(start, stop, 10):
+        table.intern_many(address(j) for j in range(i, min(i + 10, stop)))
+
+
+def test_partial_record_is_truncated_before_appending(tmp_path):
+    path = str(tmp_path / "addresses.bin")
+    AddressTable(path).intern_many([address(1), address(2)])
+    with open(path, "ab") as f:
+        f.write(b"\x33" * 7)  # interrupted append
+
+    table = AddressTable(path)
+    assert os.path.getsize(path) == 2 * ADDRESS_BYTES
+    new_id = table.intern(address(3))
+
+    reloaded = AddressTable(path)
+    assert reloaded.address(new_id) == address(3)
+    assert reloaded.lookup(address(3)) == new_id
+
+
+def test_processes_sharing_a_file_agree_on_ids(tmp_path):
+    path = str(tmp_path / "addresses.bin")
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=intern_range, args=(path, start, start + 300)) for start in (0, 150)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    table = AddressTable(path)
+    assert len(table) == 450
+    assert sorted(table.addresses(range(len(table)))) == [address(i) for i in range(450)]
+
+
+def test_lookup_sees_addresses_interned_by_another_table(tmp_path):
+    path = str(tmp_path / "addresses.bin")
+    reader, writer = AddressTable(path), AddressTable(path)
+    new_id = writer.intern(address(9))
+    assert reader.lookup(address(9)) == new_id
+    assert reader.address(new_id) == address(9)
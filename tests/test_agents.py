@@ -0,0 +1,73 @@
+import copy
+
+import pytest
+
+from services.agents import input_fingerprint
+
+INPUTS = {
+    "data": {
+        "tokenAddress": "0x4200000000000000000000000000000000000006",
+        "pairAddress": "0x00000000000000000000000000000000000000aa",
+        "tokenSymbol": "WETH",
+        "tokenDecimals": 18,
+        "blockNumber": 21_000_001,
+        "currentUsdPrice": "3412.5678",
+        "totalLiquidityUsd": 245_612.34,
+        "pricePercentChange": {"24h": 4.2137},
+        "buyVolume": {"24h": 51_234.9},
+        "buyers": {"24h": 57},
+        "verified": True,
+        "exchange": None,
+    },
+    "query": "$WETH",
+}
+
+# (path, noisy value that rounds to the same 3 significant digits)
+NOISE = [
+    (("data", "currentUsdPrice"), "3412.4999"),
+    (("data", "totalLiquidityUsd"), 245_698.0),
+    (("data", "pricePercentChange", "24h"), 4.2149),
+    (("data", "buyVolume", "24h"), 51_249.0),
+]
+
+# (path, changed value)
+CHANGES = [
+    (("data", "tokenAddress"), "0x4200000000000000000000000000000000000007"),
+    (("data", "pairAddress"), "0x00000000000000000000000000000000000000ab"),
+    (("data", "tokenSymbol"), "WETH2"),
+    (("data", "tokenDecimals"), 6),
+    (("data", "blockNumber"), 21_000_002),
+    (("data", "currentUsdPrice"), "3422.5678"),
+    (("data", "totalLiquidityUsd"), 246_612.34),
+    (("data", "pricePercentChange", "24h"), 4.2237),
+    (("data", "buyVolume", "24h"), 51_334.9),
+    (("data", "buyers", "24h"), 58),
+    (("data", "verified"), False),
+    (("data", "exchange"), "uniswap-v3"),
+    (("query",), "$ETH"),
+]
+
+
+def with_value(path, value):
+    inputs = copy.deepcopy(INPUTS)
+    target = inputs
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    return inputs
+
+
+def test_equal_inputs_hash_equal():
+    reordered = {"query": INPUTS["query"], "data": dict(reversed(list(INPUTS["data"].items())))}
+    assert input_fingerprint(copy.deepcopy(INPUTS)) == input_fingerprint(INPUTS)
+    assert input_fingerprint(reordered) == input_fingerprint(INPUTS)
+
+
+@pytest.mark.parametrize("path, value", NOISE, ids=["/".join(path) for path, _ in NOISE])
+def test_rounding_noise_in_price_and_volume_hashes_equal(path, value):
+    assert input_fingerprint(with_value(path, value)) == input_fingerprint(INPUTS)
+
+
+@pytest.mark.parametrize("path, value", CHANGES, ids=["/".join(path) for path, _ in CHANGES])
+def test_any_other_change_gives_a_new_fingerprint(path, value):
+    assert input_fingerprint(with_value(path, value)) != input_fingerprint(INPUTS)
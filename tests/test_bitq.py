@@ -0,0 +1,149 @@
+import pytest
+
+from services.bitq import TOKEN_SECTIONS, BitqueryAPI, BitqueryResponse, build_combined_query
+
+TOKEN = "0x4200000000000000000000000000000000000006"
+
+
+def api_answering(respond):
+    api = BitqueryAPI(api_key="key", oauth_token="token")
+    api.payloads = []
+
+    def post(payload):
+        api.payloads.append(payload)
+        return respond(payload)
+
+    api._post = post
+    return api
+
+
+def api_returning(data, status="success", error=None):
+    return api_answering(lambda payload: BitqueryResponse(data=data, status=status, error=error))
+
+
+def test_combined_query_declares_only_the_requested_sections():
+    query = build_combined_query(["dex_trades", "holder_statistics"])
+    assert "archive: EVM(dataset: archive" in query and "combined: EVM(dataset: combined" in query
+    assert "holder_statistics: TokenHolders(" in query and "dex_trades: DEXTrades(" in query
+    assert "top_holders" not in query and "recent_transfers" not in query
+    # holder_statistics uses $date, dex_trades $limit and $since
+    assert query.startswith("query ($network: evm_network!, $token: String!, $date: String!, $limit: Int!, $since: String!)")
+
+    query = build_combined_query(["recent_transfers"])
+    assert "archive" not in query and "$date" not in query
+
+    with pytest.raises(ValueError):
+        build_combined_query(["top_holders", "prices"])
+
+
+def test_combined_response_is_split_into_single_section_shapes():
+    holders = [{"Holder": {"Address": "0x1"}, "Balance": {"Amount": "10"}}]
+    trades = [{"Trade": {"Buy": {"Amount": "1"}}}]
+    api = api_returning({"data": {
+        "archive": {"top_holders": holders, "holder_statistics": [{"uniq": "42"}]},
+        "combined": {"recent_transfers": [], "dex_trades": trades},
+    }})
+    result = api.get_token_info(TOKEN, "base", date="2026-01-01", since_date="2025-12-25")
+
+    assert len(api.payloads) == 1
+    variables = api.payloads[0]["variables"]
+    assert variables == {"network": "base", "token": TOKEN, "limit": 100, "date": "2026-01-01", "since": "2025-12-25"}
+    assert set(result) == set(TOKEN_SECTIONS)
+    assert all(response.status == "success" for response in result.values())
+    assert result["top_holders"].data == {"data": {"EVM": {"TokenHolders": holders}}}
+    assert result["holder_statistics"].data == {"data": {"EVM": {"TokenHolders": [{"uniq": "42"}]}}}
+    assert result["recent_transfers"].data == {"data": {"EVM": {"Transfers": []}}}
+    assert result["dex_trades"].data == {"data": {"EVM": {"DEXTrades": trades}}}
+
+
+def test_partial_errors_fail_only_their_section():
+    api = api_returning({
+        "data": {
+            "archive": {"top_holders": [], "holder_statistics": None},
+            "combined": {"dex_trades": []},
+        },
+        "errors": [
+            {"message": "date out of range", "path": ["archive", "holder_statistics"]},
+            {"message": "query cost exceeded"},
+        ],
+    })
+    result = api.get_token_info(TOKEN, sections=["top_holders", "holder_statistics", "dex_trades", "recent_transfers"])
+
+    assert result["top_holders"].status == "success"
+    assert result["dex_trades"].status == "success"
+    assert result["holder_statistics"].status == "error"
+    assert result["holder_statistics"].error == "date out of range"
+    # No data and no error of its own: the unattributed errors explain it
+    assert result["recent_transfers"].status == "error"
+    assert result["recent_transfers"].error == "query cost exceeded"
+
+
+def test_failed_request_fails_every_section():
+    api = api_returning({}, status="error", error="HTTP 500: boom")
+    result = api.get_token_info(TOKEN, sections=["top_holders", "dex_trades"])
+    assert {section: response.error for section, response in result.items()} == {
+        "top_holders": "HTTP 500: boom",
+        "dex_trades": "HTTP 500: boom",
+    }
+
+
+def trade(contract):
+    return {"Trade": {"Buy": {"Currency": {"SmartContract": contract}}}}
+
+
+def test_batch_rows_demux_to_tokens_whatever_the_case():
+    upper, lower, absent = "0xAbCd" + "0" * 36, "0x" + "e" * 40, "0x" + "f" * 40
+    api = api_returning({"data": {"EVM": {"DEXTrades": [
+        trade(upper.lower()), trade("0x" + "E" * 40), trade(upper), trade("0x" + "9" * 40),
+    ]}}})
+    result = api.get_dex_trades_batch([upper, lower, absent], "base", limit=5)
+
+    variables = api.payloads[0]["variables"]
+    assert variables["tokens"] == [upper, lower, absent]
+    assert variables["total"] == 15
+    # Keyed by the addresses as passed; rows of untracked contracts are dropped
+    assert list(result) == [upper, lower, absent]
+    assert len(result[upper].data["data"]["EVM"]["DEXTrades"]) == 2
+    assert len(result[lower].data["data"]["EVM"]["DEXTrades"]) == 1
+    # A token missing from the response simply had no rows
+    assert result[absent].status == "success"
+    assert result[absent].data == {"data": {"EVM": {"DEXTrades": []}}}
+
+
+def test_batch_transfers_are_chunked():
+    tokens = [f"0x{i:040x}" for i in range(5)]
+
+    def respond(payload):
+        rows = [{"Transfer": {"Currency": {"SmartContract": token}}} for token in payload["variables"]["tokens"]]
+        return BitqueryResponse(data={"data": {"EVM": {"Transfers": rows}}}, status="success")
+
+    api = api_answering(respond)
+    result = api.get_token_transfers_batch(tokens, chunk_size=2)
+    assert [payload["variables"]["tokens"] for payload in api.payloads] == [tokens[0:2], tokens[2:4], tokens[4:]]
+    assert all(len(result[token].data["data"]["EVM"]["Transfers"]) == 1 for token in tokens)
+
+
+def test_batch_failure_is_reported_for_every_token():
+    api = api_returning({"errors": [{"message": "invalid network"}]})
+    result = api.get_dex_trades_batch(["0x1", "0x2"])
+    assert {token: response.error for token, response in result.items()} == {
+        "0x1": "invalid network",
+        "0x2": "invalid network",
+    }
+
+
+def test_batch_holder_stats_demux_by_alias():
+    tokens = ["0xA", "0xB", "0xC"]
+    api = api_returning({
+        "data": {"EVM": {"t0": [{"uniq": "7"}], "t1": None}},
+        "errors": [{"message": "contract not found", "path": ["EVM", "t1"]}],
+    })
+    result = api.get_token_holder_stats_batch(tokens, date="2026-01-01")
+
+    variables = api.payloads[0]["variables"]
+    assert (variables["token0"], variables["token1"], variables["token2"]) == tuple(tokens)
+    assert result["0xA"].data == {"data": {"EVM": {"TokenHolders": [{"uniq": "7"}]}}}
+    assert result["0xB"].error == "contract not found"
+    # Missing from the response without an error of its own
+    assert result["0xC"].status == "error"
+    assert result["0xC"].error == "No data returned"
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from services.cache import _MISSING, CacheBackend, MemoryBackend, ResponseCache, SQLiteBackend
+
+
+def memory_cache(ttl: float = 60) -> ResponseCache:
+    return ResponseCache("test", ttl=ttl, backend=MemoryBackend(maxsize=16))
+
+
+def test_cancelled_leader_does_not_fail_coalesced_callers():
+    cache = memory_cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"price": 1.0}
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_fetch("pair", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_fetch("pair", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == {"price": 1.0}
+    assert len(calls) == 1
+    assert cache.get("pair") == {"price": 1.0}
+
+
+def test_fetch_error_reaches_every_caller_and_is_not_cached():
+    cache = memory_cache()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_fetch("pair", fetch), cache.get_or_fetch("pair", fetch), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get("pair") is None
+
+
+def test_callers_cannot_mutate_cached_or_shared_values():
+    cache = memory_cache()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return {"price": 1.0, "pools": ["a"]}
+
+    async def main():
+        first, second = await asyncio.gather(cache.get_or_fetch("pair", fetch), cache.get_or_fetch("pair", fetch))
+        first["price"] = 2.0
+        first["pools"].append("b")
+        return second, await cache.get_or_fetch("pair", fetch)
+
+    second, cached = asyncio.run(main())
+    assert second == {"price": 1.0, "pools": ["a"]}
+    assert cached == {"price": 1.0, "pools": ["a"]}
+
+
+def test_entries_expire_after_ttl():
+    cache = memory_cache(ttl=0.01)
+    cache.set("pair", {"price": 1.0})
+    assert cache.get("pair") == {"price": 1.0}
+    asyncio.run(asyncio.sleep(0.02))
+    assert cache.get("pair") is None
+
+
+def test_sqlite_entries_expire_after_ttl(tmp_path):
+    backend = SQLiteBackend("test", str(tmp_path / "cache.db"))
+    backend.set("pair", {"price": 1.0}, ttl=0.01)
+    assert backend.get("pair") == {"price": 1.0}
+    asyncio.run(asyncio.sleep(0.02))
+    assert backend.get("pair") is _MISSING
+    assert backend.stats()["size"] == 0
+
+
+def test_sqlite_evicts_least_recently_used_on_every_write(tmp_path):
+    backend = SQLiteBackend("test", str(tmp_path / "cache.db"), maxsize=2)
+    for n in range(10):
+        backend.set(f"pair-{n}", n, ttl=60)
+        # Reading a key makes it the most recently used
+        assert backend.get("pair-0") == 0
+    assert backend.stats()["size"] == 2
+    assert backend.get("pair-0") == 0 and backend.get("pair-9") == 9
+    assert backend.evictions == 8
+
+
+def test_sqlite_entries_are_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = SQLiteBackend("test", path), SQLiteBackend("test", path)
+    other = SQLiteBackend("other", path)
+    first.set("pair", {"price": 1.0}, ttl=60)
+    assert second.get("pair") == {"price": 1.0}
+    assert other.get("pair") is _MISSING
+    second.delete("pair")
+    assert first.get("pair") is _MISSING
+
+
+def test_sqlite_backed_cache_runs_off_the_event_loop(tmp_path):
+    cache = ResponseCache("test", ttl=60, backend=SQLiteBackend("test", str(tmp_path / "cache.db")))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"price": 1.0}
+
+    async def main():
+        return [await cache.get_or_fetch("pair", fetch) for _ in range(3)]
+
+    assert asyncio.run(main()) == [{"price": 1.0}] * 3
+    assert len(calls) == 1 and cache.backend.blocking
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoDelete(CacheBackend):
+        def get(self, key):
+            return _MISSING
+
+        def set(self, key, value, ttl):
+            pass
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
@@ -0,0 +1,28 @@
+import numpy as np
+
+from services.columns import BALANCE_DIGITS, fixed_point
+
+
+def test_fixed_point_rounds_extra_fractional_digits():
+    values, scale = fixed_point(["1.1234567890123456789012345", "0.5"])
+    assert scale == BALANCE_DIGITS - 1
+    assert values.tolist() == [112345678901234568, 50000000000000000]
+
+
+def test_fixed_point_uses_a_negative_scale_for_huge_balances():
+    values, scale = fixed_point(["123456789012345678901234.5", "1000000"])
+    assert scale == BALANCE_DIGITS - 24
+    assert values[0] == 123456789012345679
+    assert values[1] * 10.0 ** -scale == 1000000
+
+
+def test_fixed_point_keeps_dust_and_zeroes_unparseable_amounts():
+    values, scale = fixed_point(["5000000000000000000000", "0.000000000000000000001", "abc", None, "nan", "0"])
+    assert values[1] == 1
+    assert values[2:].tolist() == [0, 0, 0, 0]
+    assert np.count_nonzero(values > 0) == 2
+
+
+def test_fixed_point_of_no_amounts():
+    values, scale = fixed_point([])
+    assert len(values) == 0 and values.dtype == np.int64
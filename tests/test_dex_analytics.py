@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from services.columns import TX_HASH_BYTES, TradeColumns
+from services.dex_analytics import compute_dex_analytics
+
+NOW = 1_000_000
+WINDOW = 100
+TOKEN, WETH = 1, 2
+
+
+def trades(rows) -> TradeColumns:
+    """rows of (seconds before NOW, buyer, seller, buy_usd, sell_usd, token bought)"""
+    n = len(rows)
+    ago, buyer, seller, buy_usd, sell_usd, is_buy = (np.array(column) for column in zip(*rows))
+    return TradeColumns(
+        block_number=np.arange(n, dtype=np.int64),
+        time=(NOW - ago).astype(np.int64),
+        tx_hash=np.repeat(np.arange(n, dtype=np.uint8)[:, None], TX_HASH_BYTES, axis=1),
+        buyer=buyer.astype(np.uint32),
+        seller=seller.astype(np.uint32),
+        buy_currency=np.where(is_buy, TOKEN, WETH).astype(np.uint32),
+        sell_currency=np.where(is_buy, WETH, TOKEN).astype(np.uint32),
+        buy_amount=np.nan_to_num(buy_usd) / 2,
+        buy_amount_usd=buy_usd.astype(float),
+        sell_amount=sell_usd / 4,
+        sell_amount_usd=sell_usd.astype(float),
+        price=np.full(n, 2.0),
+        price_usd=np.full(n, 2.0),
+    )
+
+
+# Out of time order on purpose; one trade is older than both windows and one is after NOW
+TRADES = trades([
+    (10, 16, 17, np.nan, 250.0, False),
+    (150, 10, 11, 100.0, 100.0, True),
+    (50, 14, 15, 20_000.0, 20_000.0, True),
+    (-5, 18, 19, 1e9, 1e9, True),
+    (120, 10, 12, 100.0, 100.0, False),
+    (90, 10, 13, 50.0, 50.0, True),
+    (300, 20, 21, 1e9, 1e9, True),
+])
+
+
+def analyze(**kwargs):
+    return compute_dex_analytics(TRADES, TOKEN, now=NOW, window=WINDOW, **kwargs)
+
+
+def test_window_totals_and_changes_against_the_previous_window():
+    stats = analyze()
+    assert stats["trades"] == 3
+    # 50 + 20,000 + 250 (priced on the sell side only) against 100 + 100
+    assert stats["volume_usd"] == 20_300.0
+    assert stats["volume_change"] == 10_050.0
+    # {10, 13, 14, 15, 16, 17} against {10, 11, 12}
+    assert stats["unique_traders"] == 6
+    assert stats["traders_change"] == 100.0
+    assert stats["unique_buyers"] == 3
+    assert stats["unique_sellers"] == 3
+
+
+def test_empty_previous_window_reports_no_change():
+    stats = compute_dex_analytics(TRADES, TOKEN, now=NOW - 100, window=WINDOW)
+    assert stats["trades"] == 2
+    assert stats["volume_change"] == 0.0
+    assert stats["traders_change"] == 0.0
+
+
+def test_whales_above_the_percentile_and_floor():
+    stats = analyze(whale_percentile=99, whale_min_usd=10_000)
+    # Linear 99th percentile of [50, 250, 20,000]
+    assert stats["whale_threshold_usd"] == pytest.approx(19_605.0)
+    [whale] = stats["whales"]
+    assert whale["type"] == "buy"
+    assert whale["address_id"] == 14
+    assert whale["amount"] == 10_000.0
+    assert whale["amount_usd"] == 20_000.0
+    assert whale["age_seconds"] == 50
+    assert whale["tx_hash"] == "0x" + "02" * TX_HASH_BYTES
+
+    stats = analyze(whale_percentile=99, whale_min_usd=30_000)
+    assert stats["whale_threshold_usd"] == 30_000
+    assert stats["whales"] == []
+
+
+def test_whales_are_newest_first_and_capped():
+    stats = analyze(whale_percentile=0, whale_min_usd=0, max_whales=2)
+    assert [whale["age_seconds"] for whale in stats["whales"]] == [10, 50]
+    sell = stats["whales"][0]
+    assert sell["type"] == "sell"
+    assert sell["address_id"] == 17
+    assert sell["amount"] == -62.5
+
+
+def test_no_trades_in_window():
+    stats = compute_dex_analytics(TRADES, TOKEN, now=NOW + 1_000, window=WINDOW)
+    assert stats["trades"] == 0
+    assert stats["volume_usd"] == 0.0
+    assert stats["whale_threshold_usd"] is None
+    assert stats["whales"] == []
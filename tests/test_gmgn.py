@@ -0,0 +1,45 @@
+from benchmarks.gmgn_extraction import FIXTURE, PageText
+from services.gmgn_crawler import GMGNSecurity, extract_gmgn_security
+
+
+def fixture_text() -> str:
+    with open(FIXTURE, encoding="utf-8") as f:
+        parser = PageText()
+        parser.feed(f.read())
+    return parser.text()
+
+
+def test_extracts_every_field_from_the_saved_page():
+    assert extract_gmgn_security(fixture_text()) == GMGNSecurity(
+        price_usd=0.001234,
+        market_cap_usd=1_230_000.0,
+        liquidity_usd=245_600.0,
+        holders=3482,
+        top10_holder_pct=18.4,
+        dev_holding_pct=0.6,
+        snipers=12,
+        insiders_pct=2.1,
+        bluechip_pct=3.5,
+        buy_tax_pct=0.0,
+        sell_tax_pct=0.0,
+        honeypot=False,
+        renounced=True,
+        verified=True,
+        lp_burnt_pct=100.0,
+    )
+
+
+def test_labels_must_start_a_cell_or_line():
+    security = extract_gmgn_security("| Top 10 Holders | 35% |\n| Holders | 1,234 |")
+    assert security.top10_holder_pct == 35.0
+    assert security.holders == 1234
+
+    security = extract_gmgn_security("Dev wallet sold 40%\nUnverified: yes\nDevelopers | 12%")
+    assert security.dev_holding_pct is None
+    assert security.verified is None
+
+
+def test_counts_reject_percentages():
+    assert extract_gmgn_security("| Holders | 35% |").holders is None
+    assert extract_gmgn_security("Snipers: 4.5 %").snipers is None
+    assert extract_gmgn_security("**Snipers** 7").snipers == 7
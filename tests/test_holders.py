@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.addresses import AddressTable
+from services.holders import HolderStore, HolderTracker, concentration_metrics
+
+
+def rows(balances):
+    return [
+        {"Holder": {"Address": f"0x{i:040x}"}, "Balance": {"Amount": str(amount)}}
+        for i, amount in balances.items()
+    ]
+
+
+def test_concentration_of_equal_balances():
+    metrics = concentration_metrics(np.array([5, 5, 5, 5]), top_n=[1, 2])
+    assert metrics["holders"] == 4 and metrics["supply"] == 20
+    assert metrics["gini"] == pytest.approx(0) and metrics["theil"] == pytest.approx(0)
+    assert metrics["nakamoto"] == 3
+    assert metrics["top_1_share"] == pytest.approx(0.25) and metrics["top_2_share"] == pytest.approx(0.5)
+
+
+def test_concentration_known_values():
+    # Zero balances are not holders; scale 2 means balances are in hundredths
+    metrics = concentration_metrics(np.array([0, 3, 1, 4, 2]), scale=2, top_n=[1, 2, 100])
+    assert metrics["holders"] == 4
+    assert metrics["supply"] == pytest.approx(0.1)
+    assert metrics["mean"] == pytest.approx(0.025) and metrics["median"] == pytest.approx(0.025)
+    assert metrics["gini"] == pytest.approx(0.25)
+    ratios = np.array([1, 2, 3, 4]) / 2.5
+    assert metrics["theil"] == pytest.approx(float(np.mean(ratios * np.log(ratios))))
+    assert metrics["theil"] == pytest.approx(0.10644, abs=1e-5)
+    # The top two hold 70%, the first set with more than 51%
+    assert metrics["nakamoto"] == 2
+    assert metrics["top_1_share"] == pytest.approx(0.4)
+    assert metrics["top_2_share"] == pytest.approx(0.7)
+    assert metrics["top_100_share"] == pytest.approx(1.0)
+
+
+def test_concentration_of_no_holders():
+    metrics = concentration_metrics(np.array([0, 0], dtype=np.int64), top_n=[10])
+    assert metrics["holders"] == 0 and metrics["gini"] == 0 and metrics["top_10_share"] == 0
+
+
+def test_trends_with_addresses_interned_by_another_worker(tmp_path):
+    root = str(tmp_path)
+    tracker = HolderTracker(HolderStore(root))
+    # This process has read the address table before the other worker wrote
+    tracker.store.addresses("eth").intern_many(["0x" + "00" * 20])
+
+    other_table = AddressTable(tracker.store.addresses("eth").path)
+
+    class OtherWorker(HolderStore):
+        def addresses(self, network):
+            return other_table
+
+    other = OtherWorker(root)
+    token = "0x" + "ab" * 20
+    other.write("eth", token, "2026-10-01", rows({1: 10, 2: 20, 3: 30}))
+    other.write("eth", token, "2026-10-02", rows({2: 25, 3: 30, 4: 5, 5: 1, 6: 0}))
+
+    trend = tracker.trends(token, "eth", days=7)
+    assert [entry["date"] for entry in trend] == ["2026-10-01", "2026-10-02"]
+    assert trend[1]["holders"] == 4
+    assert trend[1]["holders_change"] == 1
+    assert trend[1]["new_holders"] == 2 and trend[1]["exited_holders"] == 1
+    assert math.isclose(trend[1]["gini_change"], trend[1]["gini"] - trend[0]["gini"])
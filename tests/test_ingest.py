@@ -0,0 +1,31 @@
+import pyarrow as pa
+
+from services.ingest import TRANSFER_SCHEMA, TradeStore
+
+TOKEN = "0x" + "ab" * 20
+
+
+def transfers(first_block: int, last_block: int) -> pa.Table:
+    blocks = list(range(first_block, last_block + 1))
+    columns = {field.name: pa.nulls(len(blocks), field.type) for field in TRANSFER_SCHEMA}
+    columns["block_number"] = pa.array(blocks, pa.int64())
+    return pa.table(columns, schema=TRANSFER_SCHEMA)
+
+
+def test_append_drops_blocks_already_stored(tmp_path):
+    store = TradeStore(str(tmp_path))
+    assert store.append("eth", TOKEN, "transfers", transfers(1, 10)) == 10
+    # Another worker ingested the same token from the same high-water mark
+    assert store.append("eth", TOKEN, "transfers", transfers(1, 15)) == 5
+    assert store.append("eth", TOKEN, "transfers", transfers(5, 15)) == 0
+
+    blocks = store.read("eth", TOKEN, "transfers").column("block_number").to_pylist()
+    assert blocks == list(range(1, 16))
+
+
+def test_compaction_keeps_every_row(tmp_path):
+    store = TradeStore(str(tmp_path), compact_parts=3)
+    for first in range(0, 50, 10):
+        store.append("eth", TOKEN, "transfers", transfers(first + 1, first + 10))
+    assert len(store.parts("eth", TOKEN, "transfers")) <= 3
+    assert store.read("eth", TOKEN, "transfers").num_rows == 50
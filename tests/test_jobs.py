@@ -0,0 +1,179 @@
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+from services.jobs import (
+    FAILED, QUEUED, RUNNING, SUCCEEDED, Job, JobQueue, JobStore, MemoryJobStore, SQLiteJobStore, job_key
+)
+
+
+def new_job(params) -> Job:
+    return Job(id=f"job-{params['n']}", kind="t", params=params, key=job_key("t", params), created_at=time.time())
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryJobStore() if request.param == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def test_add_reuses_an_unfinished_identical_job(store):
+    job, reused = store.add(new_job({"n": 1}))
+    assert not reused
+    again, reused = store.add(Job(**{**new_job({"n": 1}).model_dump(), "id": "other"}))
+    assert reused and again.id == job.id
+
+
+def test_a_job_is_claimed_once_until_its_lease_expires(store):
+    store.add(new_job({"n": 1}))
+    job = store.claim("a", lease=0.05)
+    assert job.status == RUNNING and job.owner == "a"
+    assert store.claim("b", lease=60) is None
+
+    time.sleep(0.1)
+    assert not store.renew(job.id, "b", 60)
+    taken = store.claim("b", lease=60)
+    assert taken.id == job.id and taken.owner == "b"
+    # The first owner lost the job and can no longer renew or finish it
+    assert not store.renew(job.id, "a", 60)
+    job.status, job.finished_at = SUCCEEDED, time.time()
+    assert not store.finish(job, "a")
+    taken.status, taken.finished_at = SUCCEEDED, time.time()
+    assert store.finish(taken, "b")
+    assert store.get(job.id).status == SUCCEEDED
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first, second = SQLiteJobStore(path), SQLiteJobStore(path)
+    for n in range(4):
+        first.add(new_job({"n": n}))
+    claimed = [first.claim("a", 60), second.claim("b", 60), first.claim("a", 60), second.claim("b", 60)]
+    assert sorted(job.id for job in claimed) == [f"job-{n}" for n in range(4)]
+    assert first.claim("a", 60) is None and second.claim("b", 60) is None
+    assert second.get("job-0").owner == "a"
+
+
+def test_queues_sharing_a_store_run_each_job_once(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    runs = []
+
+    async def handler(params):
+        runs.append(params["n"])
+        await asyncio.sleep(0.02)
+        if params["n"] == 0:
+            raise RuntimeError("boom")
+        return {"n": params["n"]}
+
+    async def main():
+        queues = [
+            JobQueue(store=SQLiteJobStore(path), workers=2, handlers={"t": handler}, poll_interval=0.05)
+            for _ in range(2)
+        ]
+        for queue in queues:
+            await queue.start()
+        jobs = [(await queues[n % 2].submit("t", {"n": n}))[0] for n in range(8)]
+        # A queue waits on jobs the other queue's workers run
+        finished = [await queues[0].wait(job.id, 5) for job in jobs]
+        for queue in queues:
+            await queue.stop()
+        return finished
+
+    finished = asyncio.run(main())
+    assert sorted(runs) == list(range(8))
+    assert [job.status for job in finished] == [FAILED] + [SUCCEEDED] * 7
+    assert finished[0].error == "boom" and finished[3].result == {"n": 3}
+
+
+def test_watch_follows_a_job_run_by_another_queue():
+    store = MemoryJobStore()
+
+    async def handler(params):
+        await asyncio.sleep(0.05)
+        return params
+
+    async def statuses(queue, job_id):
+        return [job.status async for job in queue.watch(job_id)]
+
+    async def main():
+        submitter = JobQueue(store=store, workers=0, handlers={"t": handler}, poll_interval=0.02)
+        job, _ = await submitter.submit("t", {"n": 1})
+        watched = asyncio.create_task(statuses(submitter, job.id))
+        await asyncio.sleep(0.05)
+        runner = JobQueue(store=store, workers=1, handlers={"t": handler}, poll_interval=0.02)
+        await runner.start()
+        result = await watched
+        await runner.stop()
+        return result
+
+    assert asyncio.run(main()) == [QUEUED, RUNNING, SUCCEEDED]
+
+
+def test_a_running_job_is_reclaimed_after_its_worker_stops(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    runs = []
+
+    async def handler(params):
+        runs.append(params["n"])
+        await asyncio.sleep(0.2 if len(runs) == 1 else 0)
+        return params
+
+    async def main():
+        first = JobQueue(store=SQLiteJobStore(path), workers=1, handlers={"t": handler}, lease=0.1, poll_interval=0.02)
+        job, _ = await first.submit("t", {"n": 1})
+        await asyncio.sleep(0.05)
+        await first.stop()
+        second = JobQueue(store=SQLiteJobStore(path), workers=1, handlers={"t": handler}, lease=0.1, poll_interval=0.02)
+        await second.start()
+        assert (await second.get(job.id)).status == RUNNING
+        finished = await second.wait(job.id, 2)
+        await second.stop()
+        return finished
+
+    assert asyncio.run(main()).status == SUCCEEDED
+    assert runs == [1, 1]
+
+
+def test_default_token_report_handler_runs_the_report(monkeypatch):
+    calls = []
+
+    class Report:
+        def __init__(self, params):
+            self.params = params
+
+        def model_dump(self, mode=None):
+            return {"pair_address": self.params["pair_address"], "mode": mode}
+
+    async def build_token_report(**params):
+        calls.append(params)
+        return Report(params)
+
+    report = types.ModuleType("services.report")
+    report.build_token_report = build_token_report
+    monkeypatch.setitem(sys.modules, "services.report", report)
+
+    async def main():
+        queue = JobQueue(store=MemoryJobStore(), workers=1, poll_interval=0.02)
+        job, _ = await queue.submit("token-report", {"pair_address": "0xpair"})
+        finished = await queue.wait(job.id, 2)
+        await queue.stop()
+        return finished
+
+    finished = asyncio.run(main())
+    assert finished.status == SUCCEEDED, finished.error
+    assert finished.result == {"pair_address": "0xpair", "mode": "json"}
+    assert calls == [{"pair_address": "0xpair"}]
+
+
+def test_incomplete_store_fails_when_created():
+    class NoRenew(JobStore):
+        add = MemoryJobStore.add
+        get = MemoryJobStore.get
+        claim = MemoryJobStore.claim
+        finish = MemoryJobStore.finish
+        prune = MemoryJobStore.prune
+
+    with pytest.raises(TypeError, match="renew"):
+        NoRenew()
@@ -0,0 +1,96 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.prescreen import compute_features, pair_stats_arrays, prescreen
+
+WINDOW_KEYS = ("5min", "1h", "4h", "24h")
+
+
+def windows(*values):
+    return dict(zip(WINDOW_KEYS, values))
+
+
+def stats(liquidity=1_000_000, price_change=0.0, buy_volume=500.0, sell_volume=500.0,
+          buyers=50, sellers=50, **overrides):
+    data = {
+        "totalLiquidityUsd": str(liquidity),
+        "pricePercentChange": windows(*[price_change] * 4),
+        "buyVolume": windows(*[buy_volume] * 4),
+        "sellVolume": windows(*[sell_volume] * 4),
+        "totalVolume": windows(*[buy_volume + sell_volume] * 4),
+        "buyers": windows(*[buyers] * 4),
+        "sellers": windows(*[sellers] * 4),
+    }
+    data.update(overrides)
+    return data
+
+
+def test_balanced_token_scores_its_known_value():
+    [result] = prescreen([stats()])
+    assert result["passed"] and result["reasons"] == []
+    features = result["features"]
+    # 0.3 * 0.5 (flat price) + 0.3 * 0.5 (even buys/sells) + 0.2 * 0.5 (buyer ratio) + 0.2 * 1 ($1M liquidity)
+    assert features["score"] == 0.6
+    assert features["turnover"] == 0.001
+    assert features["liquidity_risk"] == 0.0
+
+
+@pytest.mark.parametrize("overrides, reason", [
+    ({"liquidity": 999}, "liquidity below $1000"),
+    ({"buy_volume": 40.0, "sell_volume": 40.0}, "24h volume below $100"),
+    ({"buyers": 0}, "fewer than 1 buyers in 24h"),
+])
+def test_each_floor_rejects_on_its_own(overrides, reason):
+    [result] = prescreen([stats(**overrides)], min_liquidity=1000, min_volume_24h=100, min_buyers_24h=1)
+    assert not result["passed"]
+    assert result["reasons"] == [reason]
+
+
+def test_min_score_rejects_weak_tokens():
+    weak = stats(price_change=-50.0, buy_volume=100.0, sell_volume=900.0, buyers=5, sellers=95)
+    results = prescreen([stats(), weak], min_score=0.5)
+    assert [result["passed"] for result in results] == [True, False]
+    assert results[1]["reasons"] == ["score below 0.5"]
+
+
+def test_failures_are_all_listed_and_results_keep_input_order():
+    dead = stats(liquidity=0, buy_volume=0.0, sell_volume=0.0, buyers=0, sellers=0)
+    results = prescreen([dead, stats()], min_score=0.5)
+    assert [result["passed"] for result in results] == [False, True]
+    assert len(results[0]["reasons"]) == 4
+    assert prescreen([]) == []
+
+
+def test_missing_and_nan_windows_are_ignored():
+    only_24h = stats(pricePercentChange={"24h": 12.0, "5min": "NaN", "1h": None})
+    arrays = pair_stats_arrays([only_24h, {}])
+    assert np.isnan(arrays["pricePercentChange"][0, :3]).all()
+    assert np.isnan(arrays["liquidity"][1])
+
+    features = compute_features(arrays)
+    assert features["momentum"][0] == pytest.approx(12.0)
+    # A token with no stats at all still gets finite features
+    empty = {name: values[1] for name, values in features.items()}
+    assert all(math.isfinite(value) for value in empty.values())
+    assert empty["momentum"] == 0.0
+    assert empty["buy_pressure"] == 0.0
+    assert empty["liquidity_risk"] == 1.0
+
+
+def test_windows_without_volume_do_not_count_towards_buy_pressure():
+    # Only the 5-minute window traded (all buys); the others are empty, not even
+    token = stats(buyVolume=windows(100.0, 0, 0, 0), sellVolume=windows(0, 0, 0, 0))
+    assert compute_features(pair_stats_arrays([token]))["buy_pressure"][0] == 1.0
+
+
+def test_smart_money_is_weighted_in_only_where_known():
+    arrays = pair_stats_arrays([stats(), stats()])
+    features = compute_features(arrays, np.array([0.5, np.nan]), smart_money_weight=0.2)
+    assert features["score"][0] == pytest.approx(0.8 * 0.6 + 0.2 * 0.5)
+    assert features["score"][1] == pytest.approx(0.6)
+    assert features["smart_money"].tolist() == [0.5, 0.0]
+
+    results = prescreen([stats(), stats()], smart_money=[1.0, None], min_score=0.65)
+    assert [result["passed"] for result in results] == [True, False]
@@ -0,0 +1,129 @@
+import asyncio
+import functools
+import json
+import sys
+import types
+
+import httpx
+import pytest
+from crewai import LLM
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fake_llm_server import ANSWER, serve_fake_llm
+from services import agents, http_client
+from services.gmgn_crawler import GMGNResponse, GMGNSecurity
+
+MESSAGES = [{"role": "user", "content": "Analyze"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    # The shared client is bound to the loop it was first used on; each test runs its own
+    monkeypatch.setattr(http_client, "_client", None)
+
+
+def collect(iterator) -> list:
+    async def run():
+        try:
+            return [chunk async for chunk in iterator]
+        finally:
+            await http_client.close_async_client()
+
+    return asyncio.run(run())
+
+
+def stream_events(client: TestClient, url: str) -> list:
+    with client.stream("GET", url, params={"format": "ndjson"}) as response:
+        assert response.status_code == 200
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stream_completion_yields_chunks_in_order():
+    with serve_fake_llm(delay=0) as url:
+        chunks = collect(agents.stream_completion(LLM(model="openai/fake", api_key="key"), MESSAGES, url))
+
+    assert chunks == [word + " " for word in ANSWER.split(" ")]
+    assert "".join(chunks).strip() == ANSWER
+
+
+def test_stream_completion_raises_on_error_status():
+    with serve_fake_llm(delay=0, status=500) as url:
+        with pytest.raises(httpx.HTTPStatusError):
+            collect(agents.stream_completion(LLM(model="openai/fake", api_key="key"), MESSAGES, url))
+
+
+def test_analyze_token_stream_sends_tokens_then_analysis(monkeypatch):
+    async def fetch_token_price_async(token_address):
+        return {"pairAddress": token_address, "tokenSymbol": "STUB", "currentUsdPrice": "1.0"}
+
+    monkeypatch.setattr(main, "fetch_token_price_async", fetch_token_price_async)
+    monkeypatch.setattr(main, "PRESCREEN_ENABLED", False)
+    with serve_fake_llm(delay=0) as url:
+        monkeypatch.setattr(main, "stream_crew_analysis",
+                            functools.partial(agents.stream_crew_analysis, base_url=url))
+        events = stream_events(TestClient(main.app), "/api/analyze-token/0xstream/stream?bypass_cache=true")
+
+    sections = [event["section"] for event in events]
+    assert sections[0] == "token_data" and sections[-1] == "analysis"
+    tokens = [event["data"] for event in events if event["section"] == "token"]
+    assert tokens == [word + " " for word in ANSWER.split(" ")]
+    assert events[-1]["data"] == "".join(tokens)
+
+
+def test_analyze_token_stream_reports_llm_failure(monkeypatch):
+    async def fetch_token_price_async(token_address):
+        return {"pairAddress": token_address, "tokenSymbol": "STUB", "currentUsdPrice": "1.0"}
+
+    monkeypatch.setattr(main, "fetch_token_price_async", fetch_token_price_async)
+    monkeypatch.setattr(main, "PRESCREEN_ENABLED", False)
+    with serve_fake_llm(delay=0, status=503) as url:
+        monkeypatch.setattr(main, "stream_crew_analysis",
+                            functools.partial(agents.stream_crew_analysis, base_url=url))
+        events = stream_events(TestClient(main.app), "/api/analyze-token/0xfailing/stream?bypass_cache=true")
+
+    assert [event["section"] for event in events] == ["token_data", "analysis"]
+    assert events[-1]["data"] is None
+    assert "503" in events[-1]["error"]
+
+
+def stub_gemini(monkeypatch, chunks, fail_after=None):
+    async def stream_gmgn_analysis(gmgn_data):
+        assert isinstance(gmgn_data, GMGNSecurity)
+        for i, chunk in enumerate(chunks):
+            if i == fail_after:
+                raise RuntimeError("quota exceeded")
+            yield chunk
+
+    monkeypatch.setitem(sys.modules, "services.gemini",
+                        types.SimpleNamespace(stream_gmgn_analysis=stream_gmgn_analysis))
+
+
+def stub_gmgn(monkeypatch, response: GMGNResponse):
+    async def get_gmgn_info(token_address, refresh=False):
+        return response
+
+    monkeypatch.setattr(main, "get_gmgn_info", get_gmgn_info)
+
+
+def test_gmgn_analysis_stream_sends_security_then_chunks(monkeypatch):
+    stub_gmgn(monkeypatch, GMGNResponse(markdown="", status="success", security=GMGNSecurity(holders=1234)))
+    stub_gemini(monkeypatch, ["Holders ", "look ", "spread."])
+    events = stream_events(TestClient(main.app), "/api/gmgn-analysis/0xtoken/stream")
+
+    assert events[0] == {"section": "security", "data": {"holders": 1234}, "error": None}
+    assert [event["data"] for event in events[1:-1]] == ["Holders ", "look ", "spread."]
+    assert events[-1] == {"section": "analysis", "data": "Holders look spread.", "error": None}
+
+
+def test_gmgn_analysis_stream_reports_errors(monkeypatch):
+    stub_gmgn(monkeypatch, GMGNResponse(markdown="", status="error", error="timeout"))
+    stub_gemini(monkeypatch, ["unused"])
+    events = stream_events(TestClient(main.app), "/api/gmgn-analysis/0xtoken/stream")
+    assert events == [{"section": "security", "data": None, "error": "Error fetching GMGN data: timeout"}]
+
+    stub_gmgn(monkeypatch, GMGNResponse(markdown="", status="success", security=GMGNSecurity()))
+    stub_gemini(monkeypatch, ["Partial ", "answer"], fail_after=1)
+    events = stream_events(TestClient(main.app), "/api/gmgn-analysis/0xtoken/stream")
+    assert [event["section"] for event in events] == ["security", "token", "analysis"]
+    assert events[-1]["error"] == "Error processing GMGN analysis: quota exceeded"
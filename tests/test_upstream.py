@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.upstream import Provider
+
+
+def provider(**settings) -> Provider:
+    p = Provider("test", rate=0)
+    p.backoff_base, p.backoff_max = 0.01, 0.01
+    for name, value in settings.items():
+        setattr(p, name, value)
+    return p
+
+
+def client(handler) -> httpx.AsyncClient:
+    async def respond(request):
+        return await handler(request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(respond))
+
+
+def test_cancelled_calls_do_not_count_as_failures():
+    p = provider()
+    p.breaker.threshold = 1
+
+    async def hang(request):
+        await asyncio.sleep(10)
+
+    async def main():
+        async with client(hang) as c:
+            for _ in range(3):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(p.request(c, "GET", "http://upstream/"), 0.01)
+
+    asyncio.run(main())
+    assert p.failures == 0 and p.breaker.state == "closed"
+
+
+def test_a_cancelled_half_open_trial_lets_the_next_call_through():
+    p = provider()
+    p.breaker.threshold, p.breaker.reset_timeout = 1, 0
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) == 2:
+            await asyncio.sleep(10)
+        return httpx.Response(200 if len(calls) > 2 else 400)
+
+    async def main():
+        async with client(handler) as c:
+            await p.request(c, "GET", "http://upstream/")
+            p.breaker.record(False)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(p.request(c, "GET", "http://upstream/"), 0.01)
+            return await p.request(c, "GET", "http://upstream/")
+
+    assert asyncio.run(main()).status_code == 200
+    assert p.breaker.state == "closed"
+
+
+def test_retries_stop_within_the_total_timeout():
+    p = provider(max_retries=10, total_timeout=0.2)
+    seen = []
+
+    async def handler(request):
+        seen.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(503)
+
+    async def main():
+        async with client(handler) as c:
+            start = time.monotonic()
+            response = await p.request(c, "GET", "http://upstream/")
+            return response, time.monotonic() - start
+
+    response, elapsed = asyncio.run(main())
+    assert response.status_code == 503
+    assert elapsed < 0.3 and 1 < len(seen) < 10
+    # Each attempt's timeout is cut to what is left of the budget
+    assert all(timeout <= 0.2 for timeout in seen)
+    assert p.failures == 1
@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+
+from benchmarks.dex_analytics import synthetic_trades
+from services.holders import HolderStore
+from services.ingest import TradeStore
+from services.wallets import WalletIndex, smart_money_risk
+
+TOKENS = [f"0x{0xab << 152 | i:040x}" for i in range(3)]
+
+
+def index_with_trades(root, refresh_interval: float = 300) -> WalletIndex:
+    store = TradeStore(str(root))
+    for i, token in enumerate(TOKENS):
+        table = synthetic_trades(500, store.addresses("eth"), 200, time.time(), seed=i, token_address=token)
+        store.append("eth", token, "dex_trades", table)
+    return WalletIndex(store, HolderStore(str(root)), early_buyers=10, refresh_interval=refresh_interval)
+
+
+def add_trades(index: WalletIndex, token: str, seed: int) -> None:
+    table = synthetic_trades(100, index.trade_store.addresses("eth"), 200, time.time(), seed=seed,
+                             token_address=token, first_block=10_000)
+    index.trade_store.append("eth", token, "dex_trades", table)
+
+
+def test_refresh_updates_every_token_once_per_interval(tmp_path):
+    index = index_with_trades(tmp_path)
+    assert index.refresh(TOKENS[0], "eth") == 1500
+    add_trades(index, TOKENS[1], seed=10)
+    add_trades(index, TOKENS[2], seed=11)
+    # Within the interval only the queried token is folded in
+    assert index.refresh(TOKENS[1], "eth") == 100
+    assert index.refresh(TOKENS[0], "eth") == 0
+    assert index.refreshes == 1
+
+    index.refresh_interval = 0
+    assert index.refresh(TOKENS[0], "eth") == 100
+    assert index.refreshes == 2
+
+
+def test_totals_follow_the_positions_they_were_built_from(tmp_path):
+    index = index_with_trades(tmp_path)
+    index.update_all("eth")
+    positions, totals = index._snapshot("eth")
+    assert index._snapshot("eth")[1] is totals
+
+    add_trades(index, TOKENS[0], seed=10)
+    index.update(TOKENS[0], "eth")
+    positions, totals = index._snapshot("eth")
+    assert totals["tokens"].sum() == len(positions)
+    assert np.isclose(totals["pnl"].sum(), positions.realized_pnl().sum())
+
+
+def test_smart_money_score_is_a_risk_only_while_smart_wallets_sell():
+    result = {"score": 0.4, "smart_wallets": 3, "smart_net_flow_usd": -5_000.0}
+    assert smart_money_risk(result) == ("High", 40)
+    assert smart_money_risk({**result, "score": 0.12}) == ("Medium", 12)
+    assert smart_money_risk({**result, "score": 0.05}) == ("Low", 5)
+    assert smart_money_risk({**result, "smart_net_flow_usd": 5_000.0}) == ("Low", 0)
+    assert smart_money_risk({**result, "smart_wallets": 0}) == ("Low", 0)